@@ -14,6 +14,90 @@ gemini_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"), vertexai=False
 google_storage_client = storage.Client()
 gemini_client_vertex_ai = genai.Client()
 
+# Load job embeddings into an in-process index instead of querying ChromaDB
+RECOMMENDATION_INDEX_ENABLED = (
+    os.getenv("RECOMMENDATION_INDEX_ENABLED", "false").lower() == "true"
+)
+# Storage of the in-process index (float32, float16 or int8) and how many of the
+# closest quantized candidates are rescored exactly in float32
+RECOMMENDATION_INDEX_DTYPE = os.getenv("RECOMMENDATION_INDEX_DTYPE", "float32")
+RECOMMENDATION_INDEX_RESCORE_CANDIDATES = int(
+    os.getenv("RECOMMENDATION_INDEX_RESCORE_CANDIDATES", "0")
+)
+# Directory of the float32 copy rescored from disk, unset for the system temp
+# directory, which is memory-backed on Cloud Run
+RECOMMENDATION_INDEX_SPILL_DIR = os.getenv("RECOMMENDATION_INDEX_SPILL_DIR")
+# Number of shards the job matrix is split into and scored on parallel threads
+RECOMMENDATION_INDEX_SHARDS = int(os.getenv("RECOMMENDATION_INDEX_SHARDS", "1"))
+
+# Directory of the job corpus snapshot written by export_corpus_snapshot.py,
+# memory-mapped at startup instead of loading the index from ChromaDB
+RECOMMENDATION_SNAPSHOT_PATH = os.getenv("RECOMMENDATION_SNAPSHOT_PATH")
+
+# Keep every CV embedding in an in-process matrix for /candidates instead of
+# querying ChromaDB per request
+CANDIDATE_INDEX_ENABLED = (
+    os.getenv("CANDIDATE_INDEX_ENABLED", "false").lower() == "true"
+)
+
+# Seconds between lookups of the indexed CVs dropping those deleted from
+# ChromaDB, 0 to never prune the candidate index
+CANDIDATE_INDEX_PRUNE_SECONDS = float(
+    os.getenv("CANDIDATE_INDEX_PRUNE_SECONDS", "3600")
+)
+
+# Per-user recommendation cache bounds
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "10000"))
+RECOMMENDATION_CACHE_TTL_SECONDS = float(
+    os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", "900")
+)
+
+# Directory of precomputed recommendation feeds, unset to always score live
+RECOMMENDATION_FEED_STORE_PATH = os.getenv("RECOMMENDATION_FEED_STORE_PATH")
+
+# Directory of the similar jobs graph kept up to date by ingest_jobs.py,
+# unset to answer /similar_jobs with ChromaDB queries
+SIMILAR_JOBS_GRAPH_PATH = os.getenv("SIMILAR_JOBS_GRAPH_PATH")
+
+# Seconds between checks of the job corpus version bumped by ingestion syncs,
+# 0 to only load job indexes at startup
+RECOMMENDATION_CORPUS_POLL_SECONDS = float(
+    os.getenv("RECOMMENDATION_CORPUS_POLL_SECONDS", "60")
+)
+
+# Directory of the BM25 index written by ingest_jobs.py and fused into /search,
+# unset for semantic search only
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH")
+
+# Source of job postings for ingestion and recommendation filters: "mongo" to
+# read from MONGO_URI, a JSON export of it, a data directory holding the CSV
+# exports, or unset to disable filters
+JOB_SOURCE = os.getenv("JOB_SOURCE")
+
+# Job categories suggested by /autocomplete alongside job titles
+JOB_CATEGORIES_PATH = os.getenv(
+    "JOB_CATEGORIES_PATH", "data/cleaned_data/final_json/unique_job_categories.json"
+)
+
+# Number of CVs converted to text at once by a bulk CV ingestion job
+CV_INGESTION_CONCURRENCY = int(os.getenv("CV_INGESTION_CONCURRENCY", "8"))
+
+# Bucket holding the status records of bulk CV ingestion jobs, read by every
+# instance to report on and resume the jobs (unset disables bulk ingestion)
+CV_INGESTION_JOBS_BUCKET = os.getenv("CV_INGESTION_JOBS_BUCKET")
+
+# Number of normalized search queries whose embeddings are kept in memory,
+# 0 to embed every search
+SEARCH_QUERY_CACHE_SIZE = int(os.getenv("SEARCH_QUERY_CACHE_SIZE", "10000"))
+
+# Micro-batching window for concurrent embedding requests
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_BATCH_DELAY_MS = float(os.getenv("EMBEDDING_BATCH_DELAY_MS", "5"))
+
+# SQLite file caching embeddings by model, task type, title and text,
+# unset to always call the embedding model
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")
+
 
 # Async factory function for ChromaDB client
 async def create_chroma_client():
@@ -4,7 +4,7 @@ API data models.
 This module defines Pydantic models for request/response data validation and serialization.
 """
 
-from typing import List, Dict, Union
+from typing import List, Dict, Literal, Optional, Union
 from pydantic import BaseModel, HttpUrl, Field
 
 
@@ -216,6 +216,55 @@ class RecommendationsResponse(BaseModel):
 
     recommendations: List[JobRecommendation]
     metrics: Dict[str, float]
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, or null on the last page"
+    )
+
+
+class SearchResult(JobRecommendation):
+    """
+    Model representing a job search result with its match scores.
+    """
+
+    fusion_score: Optional[float] = Field(
+        None,
+        description=(
+            "Reciprocal rank fusion score of the semantic and keyword rankings, "
+            "100 when ranked first by both; null for semantic search only"
+        ),
+    )
+
+
+class SearchResponse(BaseModel):
+    """
+    Response model for job search results.
+    """
+
+    recommendations: List[SearchResult]
+    metrics: Dict[str, float]
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, or null on the last page"
+    )
+    total_results: int = Field(
+        ..., description="Number of jobs reachable through the cursors"
+    )
+    result_cap: Optional[int] = Field(
+        None,
+        description=(
+            "Number of top semantic and of top keyword matches fused into the "
+            "ranking, which bounds `total_results`; null when every job is ranked"
+        ),
+    )
+
+
+class SimilarJobsResponse(BaseModel):
+    """
+    Response model for the jobs most similar to a given job.
+    """
+
+    job_id: str
+    similar_jobs: List[JobRecommendation]
+    metrics: Dict[str, float]
 
 
 class GeneralCVAnalysisResponse(BaseModel):
@@ -230,3 +279,177 @@ class GeneralCVAnalysisResponse(BaseModel):
     section_analysis: Dict[str, Dict[str, Union[int, str]]]
     processing_time_seconds: float
     model: str
+
+
+class BatchRecommendationsRequest(BaseModel):
+    """
+    Request model for job recommendations for many users in one call.
+    """
+
+    user_ids: List[str] = Field(
+        ..., min_length=1, max_length=1000, description="User IDs"
+    )
+    limit: int = Field(20, ge=1, description="Number of recommendations per user")
+    mode: Literal["description", "hybrid"] = Field(
+        "description",
+        description="Score on job descriptions only, or fuse title and description",
+    )
+    title_weight: float = Field(
+        0.6, ge=0, le=1, description="Weight of the job title score in hybrid mode"
+    )
+
+    class Config:
+        """
+        Configuration for the BatchRecommendationsRequest model with example data.
+        """
+
+        json_schema_extra = {
+            "example": {
+                "user_ids": ["123", "456"],
+                "limit": 20,
+                "mode": "description",
+                "title_weight": 0.6,
+            }
+        }
+
+
+class BulkCVEmbeddingsRequest(BaseModel):
+    """
+    Request model for embedding many CVs in one background job.
+    """
+
+    items: List[PostCVEmbeddingsRequest] = Field(
+        ..., min_length=1, max_length=10000, description="CV URL of every user"
+    )
+
+    class Config:
+        """
+        Configuration for the BulkCVEmbeddingsRequest model with example data.
+        """
+
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {
+                        "cv_storage_url": "https://storage.googleapis.com/main-storage-hireon/user_cv/fake_cv.pdf",
+                        "user_id": "123",
+                    }
+                ]
+            }
+        }
+
+
+class CVIngestionItem(BaseModel):
+    """
+    Model representing the progress of one CV in a bulk ingestion job.
+    """
+
+    user_id: str
+    status: Literal[
+        "pending", "converting", "embedding", "completed", "unchanged", "failed"
+    ]
+    error: Optional[str] = None
+
+
+class CVIngestionJobResponse(BaseModel):
+    """
+    Response model for the status of a bulk CV ingestion job.
+    """
+
+    job_id: str
+    status: Literal["pending", "running", "completed", "failed"]
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
+    abandoned: bool = False
+    total: int
+    counts: Dict[str, int]
+    items: Optional[List[CVIngestionItem]] = None
+
+
+class BatchCVEmbeddingsRequest(BaseModel):
+    """
+    Request model for the CV embeddings of many users in one call.
+    """
+
+    user_ids: List[str] = Field(
+        ..., min_length=1, max_length=1000, description="User IDs"
+    )
+    encoding: Literal["list", "base64"] = Field(
+        "list",
+        description="JSON encoding of the vectors, ignored for binary responses",
+    )
+
+    class Config:
+        """
+        Configuration for the BatchCVEmbeddingsRequest model with example data.
+        """
+
+        json_schema_extra = {
+            "example": {
+                "user_ids": ["123", "456"],
+                "encoding": "base64",
+            }
+        }
+
+
+class CandidatesRequest(BaseModel):
+    """
+    Request model for the best matching candidates of a job.
+    """
+
+    job_id: Optional[str] = Field(None, description="ID of an indexed job")
+    job_text: Optional[str] = Field(
+        None, min_length=1, description="Job description, for jobs not indexed yet"
+    )
+    limit: int = Field(20, ge=1, le=1000, description="Number of candidates to return")
+
+    class Config:
+        """
+        Configuration for the CandidatesRequest model with example data.
+        """
+
+        json_schema_extra = {
+            "example": {
+                "job_id": "68341f06d64eecb3953d5c3b",
+                "limit": 20,
+            }
+        }
+
+
+class CandidateMatch(BaseModel):
+    """
+    Model representing a candidate with their match score for a job.
+    """
+
+    user_id: str
+    similarity_score: float
+
+
+class CandidatesResponse(BaseModel):
+    """
+    Response model for the best matching candidates of a job.
+    """
+
+    candidates: List[CandidateMatch]
+    metrics: Dict[str, float]
+
+
+class AutocompleteSuggestion(BaseModel):
+    """
+    Model representing a job title or category suggested for a prefix.
+    """
+
+    text: str
+    kind: Literal["title", "category"]
+    count: int = Field(..., description="Number of job postings it appears in")
+
+
+class AutocompleteResponse(BaseModel):
+    """
+    Response model for search box autocomplete suggestions.
+    """
+
+    prefix: str
+    suggestions: List[AutocompleteSuggestion]
+    metrics: Dict[str, float]
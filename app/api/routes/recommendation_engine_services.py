@@ -6,36 +6,150 @@ based on user CV and search criteria using semantic search and embeddings.
 """
 
 from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+import asyncio
+import json
 import logging
+import os
 import time
 
-from fastapi import APIRouter, Request, Depends
-from fastapi.responses import JSONResponse
+import numpy as np
+from fastapi import APIRouter, Request, Depends, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi import status
 
 from app.api.models.models import (
     RecommendationsResponse,
     JobRecommendation,
+    SearchResponse,
+    SearchResult,
     PostCVEmbeddingsRequest,
+    BatchRecommendationsRequest,
+    BatchCVEmbeddingsRequest,
+    BulkCVEmbeddingsRequest,
+    CVIngestionJobResponse,
+    SimilarJobsResponse,
+    CandidatesRequest,
+    CandidateMatch,
+    CandidatesResponse,
+    AutocompleteSuggestion,
+    AutocompleteResponse,
 )
 
 from app.api.core.core import (
     create_chroma_client,
     google_storage_client,
     gemini_client_vertex_ai,
+    RECOMMENDATION_INDEX_ENABLED,
+    RECOMMENDATION_INDEX_DTYPE,
+    RECOMMENDATION_INDEX_RESCORE_CANDIDATES,
+    RECOMMENDATION_INDEX_SPILL_DIR,
+    RECOMMENDATION_INDEX_SHARDS,
+    RECOMMENDATION_CACHE_SIZE,
+    RECOMMENDATION_CACHE_TTL_SECONDS,
+    RECOMMENDATION_FEED_STORE_PATH,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_DELAY_MS,
+    EMBEDDING_CACHE_PATH,
+    JOB_SOURCE,
+    JOB_CATEGORIES_PATH,
+    RECOMMENDATION_CORPUS_POLL_SECONDS,
+    RECOMMENDATION_SNAPSHOT_PATH,
+    SIMILAR_JOBS_GRAPH_PATH,
+    CANDIDATE_INDEX_ENABLED,
+    CANDIDATE_INDEX_PRUNE_SECONDS,
+    SEARCH_QUERY_CACHE_SIZE,
+    LEXICAL_INDEX_PATH,
+    CV_INGESTION_CONCURRENCY,
+    CV_INGESTION_JOBS_BUCKET,
 )
 from app.api.core.auth import get_api_key
-from app.utils.utils import change_link_storage_to_gs
+from app.utils.utils import change_link_storage_to_gs, get_cv_content_hash
 from app.utils.ai.gen_ai_utils import generate_text_representation_from_cv
+from app.utils.ingestion.cv_ingestion import (
+    CVIngestionJob,
+    CVIngestionJobStore,
+    ingest_cvs,
+)
 from app.utils.recommendation.recommendation_utils import (
-    create_embedding,
     query_collection,
-    create_dataframe_from_results,
+    query_collection_many,
+    distances_to_match_scores,
+    select_top_ranks,
+    select_top_k_per_row,
+    results_to_distance_matrix,
+    rank_jobs,
+    lookup_rows,
+    align_distances,
+    fuse_distances,
+    encode_cursor,
+    decode_cursor,
+)
+from app.utils.recommendation.vector_index import EmbeddingIndex
+from app.utils.recommendation.autocomplete import (
+    MAX_SUGGESTIONS,
+    AutocompleteIndex,
+    load_job_categories,
+)
+from app.utils.recommendation.candidate_index import CandidateIndex
+from app.utils.recommendation.cv_chunks import (
+    MAX_CV_CHUNKS,
+    aggregate_chunk_distances,
+    build_cv_records,
+    cv_chunk_ids,
+    is_cv_chunk_id,
+    split_cv_sections,
+)
+from app.utils.recommendation.corpus_snapshot import (
+    load_snapshot_index,
+    snapshot_is_current,
+)
+from app.utils.recommendation.recommendation_cache import RecommendationCache
+from app.utils.recommendation.query_embedding_cache import (
+    QueryEmbeddingCache,
+    normalize_query,
+)
+from app.utils.recommendation.embedding_cache import EmbeddingCache
+from app.utils.recommendation.embedding_service import EmbeddingBatcher
+from app.utils.recommendation.embedding_transport import (
+    BINARY_MEDIA_TYPE,
+    encode_embeddings_base64,
+    encode_embeddings_binary,
+    negotiate_embedding_media_type,
+)
+from app.utils.recommendation.feed_store import FeedStore, MANIFEST_FILE
+from app.utils.recommendation.job_sources import load_jobs
+from app.utils.recommendation.job_filters import (
+    JobFilterIndex,
+    MIN_METADATA_COVERAGE,
+)
+from app.utils.recommendation.lexical_index import (
+    LEXICAL_MANIFEST_FILE,
+    RRF_K,
+    BM25Index,
+    reciprocal_rank_fusion,
+)
+from app.utils.recommendation.similar_jobs import (
+    GRAPH_MANIFEST_FILE,
+    SimilarJobsGraph,
 )
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Number of users scored together in one matrix product by the batch endpoint
+BATCH_SCORING_BLOCK_SIZE = 128
+
+# CVs pulled again on each candidate index sync, covering clock skew between
+# the workers that stamp `updated_at`
+CANDIDATE_SYNC_MARGIN_SECONDS = 60.0
+
+# Number of vector and lexical search results fused into one ranking
+SEARCH_FUSION_DEPTH = 1000
+
+# Title the job description collection was embedded with
+JOB_DESCRIPTION_TITLE = "Job Description and Qualification"
+
 
 @asynccontextmanager
 async def lifespan(application: APIRouter):
@@ -48,11 +162,27 @@ async def lifespan(application: APIRouter):
     # Startup logic
     application.state.gemini_client_vertex_ai = gemini_client_vertex_ai
     application.state.google_storage_client = google_storage_client
+    application.state.embedding_cache = (
+        EmbeddingCache(EMBEDDING_CACHE_PATH) if EMBEDDING_CACHE_PATH else None
+    )
+    application.state.embedding_batcher = EmbeddingBatcher(
+        gemini_client_vertex_ai,
+        max_batch_size=EMBEDDING_BATCH_SIZE,
+        max_delay=EMBEDDING_BATCH_DELAY_MS / 1000,
+        cache=application.state.embedding_cache,
+    )
+
+    application.state.query_embedding_cache = (
+        QueryEmbeddingCache(maxsize=SEARCH_QUERY_CACHE_SIZE)
+        if SEARCH_QUERY_CACHE_SIZE > 0
+        else None
+    )
 
     # Initialize ChromaDB client
     application.state.chroma_client = await create_chroma_client()
 
     # Get or create collections
+    application.state.corpus_version = None
     try:
         application.state.job_titles_collection = (
             await application.state.chroma_client.get_collection(
@@ -69,16 +199,385 @@ async def lifespan(application: APIRouter):
                 name="user_cv_embeddings"
             )
         )
+        application.state.corpus_version = (
+            application.state.job_desc_collection.metadata or {}
+        ).get("corpus_version")
         logger.info("Successfully loaded existing ChromaDB collections")
     except Exception as e:
         logger.error("Error loading collections: %s", e)
         logger.info("Collections will be initialized on first use")
 
+    # Load in-process job indexes for the current job corpus version
+    await _load_job_indexes(application.state, application.state.corpus_version)
+
+    # Keep candidate CV embeddings in memory for job-to-candidate matching
+    application.state.candidate_index = None
+    if CANDIDATE_INDEX_ENABLED:
+        try:
+            application.state.candidate_index = await CandidateIndex.from_collection(
+                application.state.user_cv_embeddings_collection
+            )
+        except Exception as e:
+            logger.error("Error loading candidate index: %s", e)
+            logger.info("Candidates will be served from ChromaDB queries")
+
+    # Cache ranked recommendations per user
+    application.state.recommendation_cache = (
+        RecommendationCache(
+            maxsize=RECOMMENDATION_CACHE_SIZE, ttl=RECOMMENDATION_CACHE_TTL_SECONDS
+        )
+        if RECOMMENDATION_CACHE_SIZE > 0
+        else None
+    )
+
+    if application.state.recommendation_cache is not None:
+        application.state.recommendation_cache.set_corpus_version(
+            application.state.corpus_version
+        )
+
+    # Open precomputed recommendation feeds written by materialize_feeds.py
+    application.state.feed_store = None
+    if RECOMMENDATION_FEED_STORE_PATH:
+        _refresh_feed_store(application.state)
+
+    # Open the similar jobs graph kept up to date by ingest_jobs.py
+    application.state.similar_jobs_graph = None
+    if SIMILAR_JOBS_GRAPH_PATH:
+        _refresh_similar_jobs_graph(application.state)
+
+    # Open the BM25 index written by ingest_jobs.py for lexical search
+    application.state.lexical_index = None
+    if LEXICAL_INDEX_PATH:
+        _refresh_lexical_index(application.state)
+
+    # Keep bulk CV ingestion jobs in GCS so every instance can report on them
+    application.state.cv_ingestion_jobs = None
+    if CV_INGESTION_JOBS_BUCKET:
+        application.state.cv_ingestion_jobs = CVIngestionJobStore(
+            application.state.google_storage_client, CV_INGESTION_JOBS_BUCKET
+        )
+    else:
+        logger.info(
+            "CV_INGESTION_JOBS_BUCKET is not set, bulk CV ingestion is disabled"
+        )
+
+    # Follow corpus version bumps made by `ingest_jobs.py --sync`
+    corpus_watcher = (
+        asyncio.create_task(
+            _watch_job_corpus(application.state, RECOMMENDATION_CORPUS_POLL_SECONDS)
+        )
+        if RECOMMENDATION_CORPUS_POLL_SECONDS > 0
+        else None
+    )
+
+    # Drop CVs deleted from ChromaDB, far less often than CVs are pulled
+    candidate_pruner = (
+        asyncio.create_task(
+            _prune_candidate_index(application.state, CANDIDATE_INDEX_PRUNE_SECONDS)
+        )
+        if application.state.candidate_index is not None
+        and CANDIDATE_INDEX_PRUNE_SECONDS > 0
+        else None
+    )
+
     logger.info(
         "Gemini client, google storage client and chroma client initialized on recommendation engine services"
     )
     yield
     # Shutdown logic
+    if corpus_watcher is not None:
+        corpus_watcher.cancel()
+    if candidate_pruner is not None:
+        candidate_pruner.cancel()
+    if application.state.cv_ingestion_jobs is not None:
+        await application.state.cv_ingestion_jobs.shutdown()
+    if application.state.embedding_cache is not None:
+        application.state.embedding_cache.close()
+
+
+async def _load_job_indexes(state, corpus_version) -> None:
+    """
+    Load the in-process job indexes, the job filter index and the autocomplete
+    index.
+
+    Job indexes are memory-mapped from the corpus snapshot when it matches the
+    corpus version, and paged out of ChromaDB otherwise. Everything is built
+    before it is published on the state, so requests in flight keep scoring
+    against a consistent set of indexes during a reload.
+    """
+    job_desc_index = None
+    job_titles_index = None
+    job_titles_rows = None
+    if RECOMMENDATION_INDEX_ENABLED:
+        try:
+            index_options = {
+                "dtype": RECOMMENDATION_INDEX_DTYPE,
+                "rescore_candidates": RECOMMENDATION_INDEX_RESCORE_CANDIDATES,
+                "shards": RECOMMENDATION_INDEX_SHARDS,
+                "spill_dir": RECOMMENDATION_INDEX_SPILL_DIR,
+            }
+            if RECOMMENDATION_SNAPSHOT_PATH and snapshot_is_current(
+                RECOMMENDATION_SNAPSHOT_PATH, corpus_version
+            ):
+                # Snapshots are memory-mapped as exported, never converted
+                try:
+                    job_desc_index = load_snapshot_index(
+                        RECOMMENDATION_SNAPSHOT_PATH,
+                        "job_desc_req_documents",
+                        shards=RECOMMENDATION_INDEX_SHARDS,
+                        dtype=RECOMMENDATION_INDEX_DTYPE,
+                        rescore_candidates=RECOMMENDATION_INDEX_RESCORE_CANDIDATES,
+                    )
+                    job_titles_index = load_snapshot_index(
+                        RECOMMENDATION_SNAPSHOT_PATH,
+                        "job_titles_documents",
+                        shards=RECOMMENDATION_INDEX_SHARDS,
+                        dtype=RECOMMENDATION_INDEX_DTYPE,
+                        rescore_candidates=RECOMMENDATION_INDEX_RESCORE_CANDIDATES,
+                    )
+                except ValueError as e:
+                    job_desc_index = job_titles_index = None
+                    logger.warning(
+                        "Corpus snapshot at %s does not match the index settings, "
+                        "loading job indexes from ChromaDB: %s",
+                        RECOMMENDATION_SNAPSHOT_PATH,
+                        e,
+                    )
+            elif RECOMMENDATION_SNAPSHOT_PATH:
+                logger.warning(
+                    "Corpus snapshot at %s is missing or not at corpus version "
+                    "%s, loading job indexes from ChromaDB",
+                    RECOMMENDATION_SNAPSHOT_PATH,
+                    corpus_version,
+                )
+            if job_desc_index is None:
+                job_desc_index, job_titles_index = await asyncio.gather(
+                    EmbeddingIndex.from_collection(
+                        state.job_desc_collection, **index_options
+                    ),
+                    EmbeddingIndex.from_collection(
+                        state.job_titles_collection, **index_options
+                    ),
+                )
+            # Map description rows to title rows once for hybrid scoring
+            job_titles_rows = lookup_rows(job_desc_index.ids, job_titles_index.ids)
+        except Exception as e:
+            job_desc_index = job_titles_index = None
+            logger.error("Error loading in-process job index: %s", e)
+            logger.info("Recommendations will be served from ChromaDB queries")
+
+    # Index job metadata for recommendation filters, aligned to the job index rows
+    job_filter_index = None
+    jobs = []
+    if JOB_SOURCE:
+        try:
+            jobs = await asyncio.to_thread(load_jobs, JOB_SOURCE)
+            job_ids = (
+                job_desc_index.ids
+                if job_desc_index is not None
+                else [job["id"] for job in jobs]
+            )
+            job_filter_index = JobFilterIndex(job_ids, jobs)
+            if job_filter_index.coverage < MIN_METADATA_COVERAGE:
+                logger.error(
+                    "Only %d of %d indexed job ids have job metadata in %s, "
+                    "check that JOB_SOURCE uses the same job ids as ChromaDB",
+                    job_filter_index.covered,
+                    len(job_filter_index),
+                    JOB_SOURCE,
+                )
+                logger.info("Recommendation filters will be unavailable")
+                job_filter_index = None
+        except Exception as e:
+            logger.error("Error loading job metadata for filters: %s", e)
+            logger.info("Recommendation filters will be unavailable")
+
+    # Index job titles and categories for search box autocomplete
+    categories = []
+    if JOB_CATEGORIES_PATH:
+        try:
+            categories = await asyncio.to_thread(
+                load_job_categories, JOB_CATEGORIES_PATH
+            )
+        except Exception as e:
+            logger.warning("Error loading job categories for autocomplete: %s", e)
+            logger.info("Autocomplete will suggest job titles only")
+
+    autocomplete_index = None
+    try:
+        autocomplete_index = await asyncio.to_thread(
+            AutocompleteIndex.build, jobs, categories
+        )
+    except Exception as e:
+        logger.error("Error building autocomplete index: %s", e)
+        logger.info("Autocomplete will return no suggestions")
+
+    state.job_desc_index = job_desc_index
+    state.job_titles_index = job_titles_index
+    state.job_titles_rows = job_titles_rows
+    state.job_filter_index = job_filter_index
+    state.autocomplete_index = autocomplete_index
+
+
+def _refresh_corpus_artifact(
+    state, attribute: str, path: str, manifest_file: str, loader, description: str
+) -> None:
+    """
+    Open an artifact computed offline if it changed on disk.
+
+    The artifact is only served while the corpus version in its manifest
+    matches the current one; otherwise endpoints fall back to live scoring.
+
+    Args:
+        state: Application state the artifact is published on
+        attribute: State attribute holding the artifact
+        path: Directory of the artifact
+        manifest_file: Name of its manifest file
+        loader: Function opening the artifact from its directory
+        description: Name of the artifact in log messages
+    """
+    current = getattr(state, attribute)
+    try:
+        with open(os.path.join(path, manifest_file), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if current is not None and current.manifest == manifest:
+            return
+
+        if manifest.get("corpus_version") != state.corpus_version:
+            if current is not None:
+                logger.info(
+                    "The %s was computed for corpus version %s, current version "
+                    "is %s; falling back to live scoring until it is rebuilt",
+                    description,
+                    manifest.get("corpus_version"),
+                    state.corpus_version,
+                )
+            setattr(state, attribute, None)
+            return
+
+        setattr(state, attribute, loader(path))
+    except Exception as e:
+        logger.error("Error loading %s: %s", description, e)
+        logger.info("Falling back to live scoring without the %s", description)
+        setattr(state, attribute, None)
+
+
+def _refresh_feed_store(state) -> None:
+    """Open the feed store if it changed on disk, serving it only if it is current."""
+    _refresh_corpus_artifact(
+        state,
+        "feed_store",
+        RECOMMENDATION_FEED_STORE_PATH,
+        MANIFEST_FILE,
+        FeedStore.load,
+        "recommendation feed store",
+    )
+
+
+def _refresh_similar_jobs_graph(state) -> None:
+    """Open the similar jobs graph if it changed on disk, serving it only if it is current."""
+    _refresh_corpus_artifact(
+        state,
+        "similar_jobs_graph",
+        SIMILAR_JOBS_GRAPH_PATH,
+        GRAPH_MANIFEST_FILE,
+        SimilarJobsGraph.load,
+        "similar jobs graph",
+    )
+
+
+def _refresh_lexical_index(state) -> None:
+    """Open the BM25 index if it changed on disk, serving it only if it is current."""
+
+    def load_lexical_index(path: str) -> BM25Index:
+        # Keyword matches are fused by job id, so they must be in the job index
+        lexical_index = BM25Index.load(path)
+        if state.job_desc_index is not None:
+            unknown = int(
+                (lookup_rows(lexical_index.job_ids, state.job_desc_index.ids) < 0).sum()
+            )
+            if unknown:
+                raise ValueError(
+                    f"{unknown} of {len(lexical_index)} job ids in the BM25 index "
+                    "are not in the job index; rebuild it with ingest_jobs.py"
+                )
+        return lexical_index
+
+    _refresh_corpus_artifact(
+        state,
+        "lexical_index",
+        LEXICAL_INDEX_PATH,
+        LEXICAL_MANIFEST_FILE,
+        load_lexical_index,
+        "BM25 index",
+    )
+
+
+async def _watch_job_corpus(state, interval: float) -> None:
+    """
+    Poll the job corpus version and reload job indexes when it changes.
+
+    Each poll also pulls recently updated CVs into the candidate index.
+
+    Args:
+        state: Application state holding the job collections and indexes
+        interval: Seconds between two polls
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            job_desc_collection = await state.chroma_client.get_collection(
+                name="job_desc_req_documents"
+            )
+            corpus_version = (job_desc_collection.metadata or {}).get("corpus_version")
+            if corpus_version != state.corpus_version:
+                logger.info(
+                    "Job corpus version changed from %s to %s, reloading job indexes",
+                    state.corpus_version,
+                    corpus_version,
+                )
+                state.job_desc_collection = job_desc_collection
+                state.job_titles_collection = await state.chroma_client.get_collection(
+                    name="job_titles_documents"
+                )
+                await _load_job_indexes(state, corpus_version)
+                state.corpus_version = corpus_version
+                if state.recommendation_cache is not None:
+                    state.recommendation_cache.set_corpus_version(corpus_version)
+
+            if RECOMMENDATION_FEED_STORE_PATH:
+                await asyncio.to_thread(_refresh_feed_store, state)
+            if SIMILAR_JOBS_GRAPH_PATH:
+                await asyncio.to_thread(_refresh_similar_jobs_graph, state)
+            if LEXICAL_INDEX_PATH:
+                await asyncio.to_thread(_refresh_lexical_index, state)
+
+            # Pull CVs posted to other workers
+            if state.candidate_index is not None:
+                synced = await state.candidate_index.sync(
+                    state.user_cv_embeddings_collection,
+                    since=state.candidate_index.synced_at
+                    - CANDIDATE_SYNC_MARGIN_SECONDS,
+                )
+                logger.debug("Synced %d CV embeddings into the candidate index", synced)
+        except Exception as e:
+            logger.error("Error refreshing job corpus: %s", e)
+
+
+async def _prune_candidate_index(state, interval: float) -> None:
+    """
+    Periodically remove CVs deleted from ChromaDB from the candidate index.
+
+    Args:
+        state: Application state holding the candidate index
+        interval: Seconds between two prunes
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await state.candidate_index.prune(state.user_cv_embeddings_collection)
+        except Exception as e:
+            logger.error("Error pruning candidate index: %s", e)
 
 
 router = APIRouter(
@@ -95,15 +594,170 @@ async def get_status(request: Request, api_key: str = Depends(get_api_key)):
     return {"status": heartbeat_status}
 
 
-@router.get("/cv_embeddings")
+@router.get(
+    "/cv_embeddings",
+    responses={
+        200: {
+            "description": "CV embedding as JSON, or raw little-endian float32 bytes",
+            "content": {
+                "application/json": {
+                    "example": {"embeddings": [0.0123, -0.0456, 0.0789]}
+                },
+                BINARY_MEDIA_TYPE: {},
+            },
+        },
+        404: {"description": "CV embedding not found"},
+    },
+)
 async def get_cv_embeddings(
-    request: Request, user_id: str, api_key: str = Depends(get_api_key)
+    request: Request,
+    user_id: str,
+    encoding: Literal["list", "base64"] = Query(
+        "list", description="JSON encoding of the vector, ignored for binary responses"
+    ),
+    api_key: str = Depends(get_api_key),
 ):
-    """Get CV embeddings for a given user ID."""
+    """
+    Get CV embeddings for a given user ID.
+
+    Send `Accept: application/octet-stream` to receive the vector as raw
+    little-endian float32 bytes instead of JSON.
+    """
+    request_id = f"req_{int(time.time())}"
     cv_embeddings = await request.app.state.user_cv_embeddings_collection.get(
         ids=user_id, include=["embeddings"]
     )
-    return {"embeddings": cv_embeddings["embeddings"][0].tolist()}
+    if not cv_embeddings["ids"]:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"error": "CV embedding not found", "request_id": request_id},
+        )
+
+    embedding = cv_embeddings["embeddings"][0]
+    if negotiate_embedding_media_type(request.headers.get("accept")) == (
+        BINARY_MEDIA_TYPE
+    ):
+        return Response(
+            content=encode_embeddings_binary(embedding),
+            media_type=BINARY_MEDIA_TYPE,
+            headers={"X-Embedding-Dimension": str(len(embedding))},
+        )
+    if encoding == "base64":
+        return {
+            "embeddings": encode_embeddings_base64(embedding),
+            "encoding": "base64",
+            "dimension": len(embedding),
+        }
+    return {"embeddings": np.asarray(embedding, dtype=np.float32).tolist()}
+
+
+@router.post(
+    "/cv_embeddings/batch",
+    responses={
+        200: {
+            "description": (
+                "CV embeddings as JSON, or raw little-endian float32 rows in "
+                "request order with NaN rows for users without an embedding"
+            ),
+            "content": {
+                "application/json": {
+                    "example": {
+                        "user_ids": ["123"],
+                        "missing_user_ids": ["456"],
+                        "dimension": 768,
+                        "encoding": "base64",
+                        "embeddings": "AAAAAAAAgD8AAABA...",
+                    }
+                },
+                BINARY_MEDIA_TYPE: {},
+            },
+        },
+        500: {"description": "Error getting CV embeddings"},
+    },
+)
+async def get_batch_cv_embeddings(
+    request: Request,
+    req_data: BatchCVEmbeddingsRequest,
+    api_key: str = Depends(get_api_key),
+):
+    """
+    Get the CV embeddings of many users in one response.
+
+    Send `Accept: application/octet-stream` to receive one row of raw
+    little-endian float32 values per requested user ID, in request order.
+    """
+
+    start_time = time.time()
+    request_id = f"req_{int(start_time)}"
+    logger.info(
+        "Getting cv embeddings [%s] for %d users", request_id, len(req_data.user_ids)
+    )
+
+    try:
+        # Fetch every CV embedding in a single request
+        cv_embeddings = await request.app.state.user_cv_embeddings_collection.get(
+            ids=list(dict.fromkeys(req_data.user_ids)), include=["embeddings"]
+        )
+    except Exception as e:
+        logger.error(
+            "[%s] Error fetching CV embeddings: %s", request_id, str(e), exc_info=True
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"error": str(e), "request_id": request_id},
+        )
+
+    embedding_rows = {user_id: row for row, user_id in enumerate(cv_embeddings["ids"])}
+    embedding_matrix = np.asarray(cv_embeddings["embeddings"], dtype=np.float32)
+    dimension = embedding_matrix.shape[1] if embedding_matrix.ndim == 2 else 0
+    missing_user_ids = [
+        user_id for user_id in req_data.user_ids if user_id not in embedding_rows
+    ]
+    logger.info(
+        "[%s] Found %d of %d CV embeddings in %.3f seconds",
+        request_id,
+        len(req_data.user_ids) - len(missing_user_ids),
+        len(req_data.user_ids),
+        time.time() - start_time,
+    )
+
+    if negotiate_embedding_media_type(request.headers.get("accept")) == (
+        BINARY_MEDIA_TYPE
+    ):
+        # Rows follow the request so clients need no id list to decode them
+        rows = np.full((len(req_data.user_ids), dimension), np.nan, dtype=np.float32)
+        for row, user_id in enumerate(req_data.user_ids):
+            if user_id in embedding_rows:
+                rows[row] = embedding_matrix[embedding_rows[user_id]]
+        return Response(
+            content=encode_embeddings_binary(rows),
+            media_type=BINARY_MEDIA_TYPE,
+            headers={
+                "X-Embedding-Dimension": str(dimension),
+                "X-Embedding-Count": str(len(rows)),
+                "X-Missing-Count": str(len(missing_user_ids)),
+            },
+        )
+
+    found_user_ids = [
+        user_id
+        for user_id in dict.fromkeys(req_data.user_ids)
+        if user_id in embedding_rows
+    ]
+    found_embeddings = embedding_matrix[
+        [embedding_rows[user_id] for user_id in found_user_ids]
+    ]
+    return {
+        "user_ids": found_user_ids,
+        "missing_user_ids": missing_user_ids,
+        "dimension": dimension,
+        "encoding": req_data.encoding,
+        "embeddings": (
+            encode_embeddings_base64(found_embeddings)
+            if req_data.encoding == "base64"
+            else found_embeddings.tolist()
+        ),
+    }
 
 
 @router.post(
@@ -116,6 +770,7 @@ async def get_cv_embeddings(
                     "example": {
                         "status": 200,
                         "message": "embedding added for user 123",
+                        "cv_unchanged": False,
                         "cv_to_text_response_time": 10.49885368347168,
                         "embedding_creation_time": 1.7401466369628906,
                         "total_response_time": 12.23932147026062,
@@ -157,6 +812,32 @@ async def post_cv_embeddings(
             )
             raise
 
+        # Skip both model calls when the stored embedding came from the same CV
+        cv_hash, stored_cv = await asyncio.gather(
+            get_cv_content_hash(request.app.state.google_storage_client, gs_link),
+            request.app.state.user_cv_embeddings_collection.get(
+                ids=[req_data.user_id], include=["metadatas"]
+            ),
+        )
+        if (
+            stored_cv["ids"]
+            and (stored_cv["metadatas"][0] or {}).get("cv_hash") == cv_hash
+        ):
+            total_response_time = time.time() - start_time
+            logger.info(
+                "[%s] CV unchanged for user %s, reusing stored embedding",
+                request_id,
+                req_data.user_id,
+            )
+            return {
+                "status": 200,
+                "message": f"embedding unchanged for user {req_data.user_id}",
+                "cv_unchanged": True,
+                "cv_to_text_response_time": 0.0,
+                "embedding_creation_time": 0.0,
+                "total_response_time": total_response_time,
+            }
+
         # Measure CV to text conversion time
         cv_to_text_start_time = time.time()
         user_cv_representation = await generate_text_representation_from_cv(
@@ -169,12 +850,19 @@ async def post_cv_embeddings(
             cv_to_text_response_time,
         )
 
-        # Generate embedding for CV - measure time separately
-        logger.info("[%s] Creating embedding from CV content", request_id)
-        embedding_start_time = time.time()
-        cv_embedding = await create_embedding(
-            request.app.state.gemini_client_vertex_ai, user_cv_representation.text
+        # Embed the whole CV and its sections in one batched call
+        cv_chunks = split_cv_sections(user_cv_representation.text)
+        record_ids, documents, metadatas = build_cv_records(
+            req_data.user_id, user_cv_representation.text, cv_chunks, cv_hash
+        )
+        logger.info(
+            "[%s] Creating embeddings from CV content and %d sections",
+            request_id,
+            len(cv_chunks),
         )
+        embedding_start_time = time.time()
+        embeddings = await request.app.state.embedding_batcher.embed_many(documents)
+        cv_embedding = embeddings[0]
         embedding_creation_time = time.time() - embedding_start_time
         logger.info(
             "[%s] Embedding creation completed in %.2f seconds",
@@ -189,13 +877,31 @@ async def post_cv_embeddings(
             total_response_time,
         )
 
+        # Store the CV hash and derived text next to the vectors
         await request.app.state.user_cv_embeddings_collection.upsert(
-            embeddings=[cv_embedding], ids=[req_data.user_id]
+            embeddings=embeddings,
+            ids=record_ids,
+            documents=documents,
+            metadatas=metadatas,
+        )
+        previous_chunks = (
+            (stored_cv["metadatas"][0] or {}).get("chunks", 0)
+            if stored_cv["ids"]
+            else 0
         )
+        if previous_chunks > len(cv_chunks):
+            await request.app.state.user_cv_embeddings_collection.delete(
+                ids=cv_chunk_ids(req_data.user_id, previous_chunks)[len(cv_chunks) :]
+            )
+        if request.app.state.candidate_index is not None:
+            request.app.state.candidate_index.upsert([req_data.user_id], [cv_embedding])
+        if request.app.state.recommendation_cache is not None:
+            request.app.state.recommendation_cache.invalidate(req_data.user_id)
 
         return {
             "status": 200,
             "message": f"embedding added for user {req_data.user_id}",
+            "cv_unchanged": False,
             "cv_to_text_response_time": cv_to_text_response_time,
             "embedding_creation_time": embedding_creation_time,
             "total_response_time": total_response_time,
@@ -210,101 +916,599 @@ async def post_cv_embeddings(
         )
 
 
-@router.get(
-    "/recommendations",
-    response_model=RecommendationsResponse,
+@router.post(
+    "/cv_embeddings/bulk",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=CVIngestionJobResponse,
     responses={
-        200: {
-            "description": "Recommendations generated successfully",
+        202: {
+            "description": "Bulk CV ingestion job started",
             "content": {
                 "application/json": {
                     "example": {
-                        "recommendations": [
-                            {
-                                "job_id": "68341f06d64eecb3953d5c3b",
-                                "similarity_score": 0.85,
-                            },
-                            {
-                                "job_id": "68341f06d64eecb3953d5adc",
-                                "similarity_score": 0.72,
-                            },
-                        ],
-                        "metrics": {
-                            "chroma_query_response_time": 0.32,
-                            "total_response_time": 3.21,
-                        },
+                        "job_id": "9f1c2e7a4b5d4c3e8a6f0b1d2c3e4f5a",
+                        "status": "pending",
+                        "error": None,
+                        "created_at": 1718000000.0,
+                        "finished_at": None,
+                        "abandoned": False,
+                        "total": 2,
+                        "counts": {"pending": 2},
+                        "items": None,
                     }
                 }
             },
         },
-        500: {"description": "Error generating recommendations"},
+        503: {"description": "Bulk CV ingestion is disabled"},
     },
 )
-async def get_recommendations(
-    request: Request, user_id: str, api_key: str = Depends(get_api_key)
+async def post_bulk_cv_embeddings(
+    request: Request,
+    req_data: BulkCVEmbeddingsRequest,
+    api_key: str = Depends(get_api_key),
 ):
-    """Get recommendations for a given user based on their CV."""
+    """
+    Start embedding many CVs in the background.
 
-    start_time = time.time()
-    request_id = f"req_{int(start_time)}"
-    logger.info(
-        "Starting recommendation generation [%s] for User ID: %s",
-        request_id,
-        user_id,
-    )
+    Poll `GET /cv_embeddings/bulk/{job_id}` for the status of every CV.
+    """
+
+    request_id = f"req_{int(time.time())}"
+    state = request.app.state
+    if state.cv_ingestion_jobs is None:
+        return _bulk_cv_ingestion_disabled(request_id)
+
+    # The last URL given for a user wins
+    cv_storage_urls = {item.user_id: item.cv_storage_url for item in req_data.items}
+    job = CVIngestionJob(cv_storage_urls)
 
     try:
-        cv_embedding = await request.app.state.user_cv_embeddings_collection.get(
-            ids=user_id, include=["embeddings"]
+        await state.cv_ingestion_jobs.start(job, _run_cv_ingestion(state, job))
+    except Exception as e:
+        logger.error("[%s] Error starting bulk CV ingestion: %s", request_id, e)
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"error": str(e), "request_id": request_id},
         )
-        cv_embedding = cv_embedding["embeddings"][0]
+    logger.info(
+        "[%s] Started bulk CV ingestion %s for %d CVs",
+        request_id,
+        job.job_id,
+        len(cv_storage_urls),
+    )
+    return job.to_dict(include_items=False)
 
-        # Query job descriptions with CV embedding
-        logger.info("[%s] Querying job descriptions based on CV", request_id)
-        chroma_query_start_time = time.time()
-        job_desc_results = await query_collection(
-            request.app.state.job_desc_collection, cv_embedding
-        )
-        chroma_query_response_time = time.time() - chroma_query_start_time
-        logger.info(
-            "[%s] ChromaDB query completed in %.2f seconds",
-            request_id,
-            chroma_query_response_time,
-        )
 
-        # Create dataframe from results
-        logger.debug("[%s] Processing query results into dataframe", request_id)
-        job_desc_df = create_dataframe_from_results(job_desc_results, "job_description")
+@router.get(
+    "/cv_embeddings/bulk/{job_id}",
+    response_model=CVIngestionJobResponse,
+    responses={
+        404: {"description": "Bulk CV ingestion job not found"},
+        503: {"description": "Bulk CV ingestion is disabled"},
+    },
+)
+async def get_bulk_cv_embeddings_status(
+    request: Request,
+    job_id: str,
+    include_items: bool = Query(True, description="Include the status of every CV"),
+    api_key: str = Depends(get_api_key),
+):
+    """
+    Get the status of a bulk CV ingestion job and of every CV in it.
 
-        job_desc_df["match_score"] = (
-            1
-            - job_desc_df["job_description_distance"]
-            / job_desc_df["job_description_distance"].max()
-        ) * 100
+    A job whose instance stopped renewing its lease is reported as
+    `abandoned`; resume it with `POST /cv_embeddings/bulk/{job_id}/resume`.
+    """
+    request_id = f"req_{int(time.time())}"
+    state = request.app.state
+    if state.cv_ingestion_jobs is None:
+        return _bulk_cv_ingestion_disabled(request_id)
 
-        combined_df = job_desc_df[["id", "match_score"]].sort_values(
-            "match_score", ascending=False
+    job = await state.cv_ingestion_jobs.get(job_id)
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "error": "Bulk CV ingestion job not found",
+                "request_id": request_id,
+            },
         )
+    return job.to_dict(include_items=include_items)
 
-        # Format the response to match the RecommendationsResponse model
-        logger.info(
-            "[%s] Preparing response with %d recommendations",
-            request_id,
-            len(combined_df),
-        )
-        recommendations_list = []
-        for item in combined_df.to_dict(orient="records"):
-            recommendations_list.append(
-                JobRecommendation(
-                    job_id=item["id"], similarity_score=float(item["match_score"])
-                )
-            )
 
-        total_response_time = time.time() - start_time
-        logger.info(
-            "[%s] Total recommendation processing completed in %.2f seconds",
-            request_id,
-            total_response_time,
+@router.post(
+    "/cv_embeddings/bulk/{job_id}/resume",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=CVIngestionJobResponse,
+    responses={
+        404: {"description": "Bulk CV ingestion job not found"},
+        409: {"description": "Bulk CV ingestion job is not abandoned"},
+        503: {"description": "Bulk CV ingestion is disabled"},
+    },
+)
+async def resume_bulk_cv_embeddings(
+    request: Request,
+    job_id: str,
+    api_key: str = Depends(get_api_key),
+):
+    """
+    Resume a bulk CV ingestion job whose instance stopped renewing its lease.
+
+    The job continues on this instance and skips the CVs already done. When
+    several requests race to resume a job, only one of them takes it over.
+    """
+    request_id = f"req_{int(time.time())}"
+    state = request.app.state
+    if state.cv_ingestion_jobs is None:
+        return _bulk_cv_ingestion_disabled(request_id)
+
+    job = await state.cv_ingestion_jobs.get(job_id)
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "error": "Bulk CV ingestion job not found",
+                "request_id": request_id,
+            },
+        )
+    if not job.abandoned:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "error": f"Bulk CV ingestion job is {job.status}, not abandoned",
+                "request_id": request_id,
+            },
+        )
+
+    try:
+        resumed = await state.cv_ingestion_jobs.resume(
+            job, _run_cv_ingestion(state, job)
+        )
+    except Exception as e:
+        logger.error("[%s] Error resuming bulk CV ingestion: %s", request_id, e)
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"error": str(e), "request_id": request_id},
+        )
+    if not resumed:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "error": "Bulk CV ingestion job was resumed by another request",
+                "request_id": request_id,
+            },
+        )
+    logger.info("[%s] Resumed bulk CV ingestion %s", request_id, job_id)
+    return job.to_dict(include_items=False)
+
+
+def _bulk_cv_ingestion_disabled(request_id: str) -> JSONResponse:
+    """Answer bulk CV ingestion requests on a deployment without a job bucket."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "error": "Bulk CV ingestion is disabled, set CV_INGESTION_JOBS_BUCKET",
+            "request_id": request_id,
+        },
+    )
+
+
+def _run_cv_ingestion(state, job: CVIngestionJob):
+    """Return the coroutine converting, embedding and upserting a job's CVs."""
+
+    async def fetch_cv_hash(cv_url: str) -> str:
+        gs_link = await change_link_storage_to_gs(cv_url)
+        return await get_cv_content_hash(state.google_storage_client, gs_link)
+
+    async def convert_cv(cv_url: str) -> str:
+        gs_link = await change_link_storage_to_gs(cv_url)
+        user_cv_representation = await generate_text_representation_from_cv(
+            state.gemini_client_vertex_ai, gs_link
+        )
+        return user_cv_representation.text
+
+    def on_upserted(user_ids: List[str], embeddings: List[List[float]]) -> None:
+        if state.candidate_index is not None:
+            state.candidate_index.upsert(user_ids, embeddings)
+        for user_id in user_ids:
+            if state.recommendation_cache is not None:
+                state.recommendation_cache.invalidate(user_id)
+
+    return ingest_cvs(
+        job,
+        state.user_cv_embeddings_collection,
+        state.embedding_batcher,
+        fetch_cv_hash,
+        convert_cv,
+        on_upserted=on_upserted,
+        concurrency=CV_INGESTION_CONCURRENCY,
+        batch_size=state.embedding_batcher.max_batch_size,
+    )
+
+
+async def _score_jobs(
+    state,
+    cv_embedding,
+    mode: str,
+    title_weight: float,
+    filter_rows: Optional[np.ndarray] = None,
+    aggregation: str = "max",
+):
+    """
+    Score every job against a CV embedding or the chunk embeddings of a CV.
+
+    Args:
+        state: Application state holding the job collections and indexes
+        cv_embedding: CV embedding, or (chunks, dim) matrix of CV chunk embeddings
+        mode: "description" or "hybrid" title + description scoring
+        title_weight: Weight of the job title distance in hybrid mode
+        filter_rows: Rows of the job filter index that passed the filters, or
+            None to score every job
+        aggregation: How chunk distances combine per job, "max" or "mean"
+
+    Returns:
+        tuple: Job ids and their distances to the CV
+    """
+    # Chunks are scored together in one matrix product, like a single CV
+    cv_embeddings = np.atleast_2d(np.asarray(cv_embedding, dtype=np.float32))
+    job_desc_index = state.job_desc_index
+    if job_desc_index is not None:
+        # The filter index shares the job index rows, so only survivors are scored
+        job_ids = (
+            job_desc_index.ids
+            if filter_rows is None
+            else job_desc_index.ids[filter_rows]
+        )
+        if len(job_ids) == 0:
+            return job_ids, np.empty(0, dtype=np.float32)
+
+        job_distances = job_desc_index.distances_batch(cv_embeddings, rows=filter_rows)
+        if mode == "hybrid":
+            job_titles_rows = (
+                state.job_titles_rows
+                if filter_rows is None
+                else state.job_titles_rows[filter_rows]
+            )
+            title_rows = np.unique(job_titles_rows[job_titles_rows >= 0])
+            job_title_distances = align_distances(
+                state.job_titles_index.distances_batch(cv_embeddings, rows=title_rows),
+                np.where(
+                    job_titles_rows >= 0,
+                    np.searchsorted(title_rows, job_titles_rows),
+                    -1,
+                ),
+            )
+            job_distances = fuse_distances(
+                job_distances, job_title_distances, title_weight
+            )
+        return job_ids, aggregate_chunk_distances(job_distances, aggregation)
+
+    if len(cv_embeddings) > 1:
+        job_ids, job_distances = await _score_jobs_batch(
+            state, cv_embeddings, mode, title_weight
+        )
+        job_distances = aggregate_chunk_distances(job_distances, aggregation)
+    else:
+        # ChromaDB takes one query embedding, not a (1, dim) matrix
+        job_ids, job_distances = await _query_jobs(
+            state, cv_embeddings[0].tolist(), mode, title_weight
+        )
+    if filter_rows is None:
+        return job_ids, job_distances
+
+    allowed_job_ids = set(state.job_filter_index.ids[filter_rows].tolist())
+    keep = np.fromiter(
+        (job_id in allowed_job_ids for job_id in job_ids),
+        dtype=bool,
+        count=len(job_ids),
+    )
+    return np.asarray(job_ids, dtype=object)[keep], np.asarray(job_distances)[keep]
+
+
+async def _query_jobs(state, cv_embedding, mode: str, title_weight: float):
+    """Score every job against a CV embedding with ChromaDB queries."""
+    if mode == "hybrid":
+        job_desc_results, job_title_results = await asyncio.gather(
+            query_collection(state.job_desc_collection, cv_embedding),
+            query_collection(state.job_titles_collection, cv_embedding),
+        )
+        job_ids = job_desc_results["ids"][0]
+        job_title_distances = align_distances(
+            job_title_results["distances"][0],
+            lookup_rows(job_ids, job_title_results["ids"][0]),
+        )
+        return job_ids, fuse_distances(
+            job_desc_results["distances"][0], job_title_distances, title_weight
+        )
+
+    job_desc_results = await query_collection(state.job_desc_collection, cv_embedding)
+    return job_desc_results["ids"][0], job_desc_results["distances"][0]
+
+
+@router.get(
+    "/recommendations",
+    response_model=RecommendationsResponse,
+    responses={
+        200: {
+            "description": "Recommendations generated successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "recommendations": [
+                            {
+                                "job_id": "68341f06d64eecb3953d5c3b",
+                                "similarity_score": 0.85,
+                            },
+                            {
+                                "job_id": "68341f06d64eecb3953d5adc",
+                                "similarity_score": 0.72,
+                            },
+                        ],
+                        "metrics": {
+                            "chroma_query_response_time": 0.32,
+                            "total_response_time": 3.21,
+                        },
+                        "next_cursor": "eyJvZmZzZXQiOjJ9",
+                    }
+                }
+            },
+        },
+        400: {"description": "Invalid pagination cursor"},
+        500: {"description": "Error generating recommendations"},
+    },
+)
+async def get_recommendations(
+    request: Request,
+    user_id: str,
+    limit: Optional[int] = Query(
+        None, ge=1, description="Maximum number of recommendations to return"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor returned by the previous page"
+    ),
+    mode: Literal["description", "hybrid"] = Query(
+        "description",
+        description="Score on job descriptions only, or fuse title and description",
+    ),
+    title_weight: float = Query(
+        0.6, ge=0, le=1, description="Weight of the job title score in hybrid mode"
+    ),
+    cv_scoring: Literal["whole", "max", "mean"] = Query(
+        "whole",
+        description=(
+            "Score with the whole-CV embedding, or with the best matching or "
+            "average CV section"
+        ),
+    ),
+    working_location: Optional[List[str]] = Query(
+        None, description="Only return jobs in one of these locations"
+    ),
+    working_location_type: Optional[List[str]] = Query(
+        None,
+        description="Only return jobs with one of these on-site/hybrid/remote types",
+    ),
+    employment_type: Optional[List[str]] = Query(
+        None, description="Only return jobs with one of these employment types"
+    ),
+    experience_years: Optional[float] = Query(
+        None,
+        ge=0,
+        description=(
+            "Years of experience of the job seeker. Only return jobs requiring "
+            "at most this many years; jobs with an unknown requirement are excluded"
+        ),
+    ),
+    category: Optional[List[str]] = Query(
+        None, description="Only return jobs in one of these categories"
+    ),
+    salary_min: Optional[float] = Query(
+        None, ge=0, description="Only return jobs paying at least this much"
+    ),
+    salary_max: Optional[float] = Query(
+        None,
+        ge=0,
+        description="Only return jobs with a salary range starting at or below this",
+    ),
+    api_key: str = Depends(get_api_key),
+):
+    """Get recommendations for a given user based on their CV."""
+
+    start_time = time.time()
+    request_id = f"req_{int(start_time)}"
+    logger.info(
+        "Starting recommendation generation [%s] for User ID: %s",
+        request_id,
+        user_id,
+    )
+
+    try:
+        offset = decode_cursor(cursor) if cursor else 0
+    except ValueError as e:
+        logger.warning("[%s] Rejected pagination cursor: %s", request_id, str(e))
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": str(e), "request_id": request_id},
+        )
+
+    if salary_min is not None and salary_max is not None and salary_min > salary_max:
+        logger.warning("[%s] Rejected an empty salary range", request_id)
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "error": "salary_min must not be greater than salary_max",
+                "request_id": request_id,
+            },
+        )
+
+    filters = {
+        "working_location": working_location,
+        "working_location_type": working_location_type,
+        "employment_type": employment_type,
+        "experience_years": experience_years,
+        "category": category,
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+    }
+    filtered = any(value is not None for value in filters.values())
+    job_filter_index = request.app.state.job_filter_index
+    if filtered and job_filter_index is None:
+        logger.warning("[%s] Rejected filters without job metadata", request_id)
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "error": "Recommendation filters are not available",
+                "request_id": request_id,
+            },
+        )
+
+    try:
+        recommendation_cache = request.app.state.recommendation_cache
+        cache_variant = (
+            mode,
+            title_weight if mode == "hybrid" else None,
+            cv_scoring,
+            tuple(
+                (name, tuple(value) if isinstance(value, list) else value)
+                for name, value in filters.items()
+                if value is not None
+            ),
+        )
+        feed_store = request.app.state.feed_store
+        # CV updates invalidate the user's cached rankings, so a hit is served
+        # without reading the stored CV
+        ranked_jobs = (
+            recommendation_cache.get(user_id, cache_variant)
+            if recommendation_cache is not None
+            else None
+        )
+        cache_hit = ranked_jobs is not None
+        feed_hit = False
+        chroma_query_response_time = 0.0
+
+        if cache_hit:
+            logger.info("[%s] Serving recommendations from cache", request_id)
+            total_results = len(ranked_jobs.scores)
+        else:
+            # Fetch the CV, with its section chunks and its hash, in one request
+            stored_cv = await request.app.state.user_cv_embeddings_collection.get(
+                ids=(
+                    [user_id]
+                    if cv_scoring == "whole"
+                    else [user_id] + cv_chunk_ids(user_id)
+                ),
+                include=["embeddings", "metadatas"],
+            )
+            embedding_rows = {
+                record_id: row for row, record_id in enumerate(stored_cv["ids"])
+            }
+            cv_hash = (
+                (stored_cv["metadatas"][embedding_rows[user_id]] or {}).get("cv_hash")
+                if user_id in embedding_rows
+                else None
+            )
+
+            # Serve pages within the materialized top-N from the feed store,
+            # as long as they were ranked for the stored CV
+            if (
+                feed_store is not None
+                and mode == "description"
+                and cv_scoring == "whole"
+                and not filtered
+                and limit is not None
+                and offset + limit <= feed_store.top_n
+            ):
+                ranked_jobs = feed_store.get(user_id, cv_hash)
+                feed_hit = ranked_jobs is not None
+            if feed_hit:
+                logger.info("[%s] Serving recommendations from feed store", request_id)
+                total_results = feed_store.total_jobs
+
+        if ranked_jobs is None:
+            if cv_scoring == "whole":
+                cv_embedding = stored_cv["embeddings"][embedding_rows[user_id]]
+            else:
+                chunk_rows = [
+                    embedding_rows[chunk_id]
+                    for chunk_id in cv_chunk_ids(user_id)
+                    if chunk_id in embedding_rows
+                ]
+                # CVs stored before chunking are scored on the whole-CV embedding
+                cv_embedding = np.asarray(stored_cv["embeddings"], dtype=np.float32)[
+                    chunk_rows or [embedding_rows[user_id]]
+                ]
+                logger.info(
+                    "[%s] Scoring %d CV sections with %s aggregation",
+                    request_id,
+                    len(chunk_rows),
+                    cv_scoring,
+                )
+
+            filter_rows = job_filter_index.matching_rows(filters) if filtered else None
+            if filter_rows is not None:
+                logger.info(
+                    "[%s] %d of %d jobs passed the filters",
+                    request_id,
+                    len(filter_rows),
+                    len(job_filter_index),
+                )
+
+            # Query jobs with CV embedding
+            logger.info("[%s] Scoring jobs in %s mode", request_id, mode)
+            chroma_query_start_time = time.time()
+            job_ids, job_distances = await _score_jobs(
+                request.app.state,
+                cv_embedding,
+                mode,
+                title_weight,
+                filter_rows,
+                aggregation="max" if cv_scoring == "whole" else cv_scoring,
+            )
+            chroma_query_response_time = time.time() - chroma_query_start_time
+            logger.info(
+                "[%s] Job query completed in %.2f seconds",
+                request_id,
+                chroma_query_response_time,
+            )
+
+            match_scores = distances_to_match_scores(job_distances)
+            total_results = len(match_scores)
+            if recommendation_cache is not None:
+                ranked_jobs = rank_jobs(job_ids, match_scores)
+                recommendation_cache.set(user_id, ranked_jobs, cache_variant)
+
+        stop = total_results if limit is None else offset + limit
+        if ranked_jobs is not None:
+            # Slice the requested page from the full ranking
+            page_ids = ranked_jobs.job_ids[offset:stop]
+            page_scores = ranked_jobs.scores[offset:stop]
+        else:
+            # Rank only the requested page
+            page = select_top_ranks(match_scores, offset, stop)
+            page_ids = [job_ids[position] for position in page]
+            page_scores = match_scores[page]
+
+        next_offset = offset + len(page_scores)
+        next_cursor = (
+            encode_cursor(next_offset) if next_offset < total_results else None
+        )
+
+        # Format the response to match the RecommendationsResponse model
+        logger.info(
+            "[%s] Preparing response with %d of %d recommendations",
+            request_id,
+            len(page_scores),
+            total_results,
+        )
+        recommendations_list = [
+            JobRecommendation(job_id=job_id, similarity_score=float(score))
+            for job_id, score in zip(page_ids, page_scores)
+        ]
+
+        total_response_time = time.time() - start_time
+        logger.info(
+            "[%s] Total recommendation processing completed in %.2f seconds",
+            request_id,
+            total_response_time,
         )
 
         return {
@@ -312,7 +1516,10 @@ async def get_recommendations(
             "metrics": {
                 "chroma_query_response_time": chroma_query_response_time,
                 "total_response_time": total_response_time,
+                "cache_hit": float(cache_hit),
+                "feed_hit": float(feed_hit),
             },
+            "next_cursor": next_cursor,
         }
 
     except Exception as e:
@@ -326,3 +1533,697 @@ async def get_recommendations(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"error": str(e), "request_id": request_id},
         )
+
+
+async def _top_jobs_batch(
+    state, cv_embeddings, mode: str, title_weight: float, limit: int
+):
+    """
+    Find the best matching jobs for several CV embeddings at once.
+
+    Args:
+        state: Application state holding the job collections and indexes
+        cv_embeddings: (users, dim) matrix of CV embeddings
+        mode: "description" or "hybrid" title + description scoring
+        title_weight: Weight of the job title distance in hybrid mode
+        limit: Number of jobs returned per user
+
+    Returns:
+        tuple: Job ids, and (users, limit) job columns and match scores ordered
+        from the best match
+    """
+    job_desc_index = state.job_desc_index
+    if job_desc_index is not None and mode != "hybrid":
+        # Only the closest jobs of each shard are kept instead of the full matrix
+        top_jobs, top_distances, max_distances = await asyncio.to_thread(
+            job_desc_index.top_k, cv_embeddings, limit
+        )
+        return (
+            job_desc_index.ids,
+            top_jobs,
+            distances_to_match_scores(top_distances, max_distances),
+        )
+
+    job_ids, job_distances = await _score_jobs_batch(
+        state, cv_embeddings, mode, title_weight
+    )
+    match_scores = distances_to_match_scores(job_distances)
+    top_jobs = select_top_k_per_row(match_scores, limit)
+    return job_ids, top_jobs, np.take_along_axis(match_scores, top_jobs, axis=1)
+
+
+async def _score_jobs_batch(state, cv_embeddings, mode: str, title_weight: float):
+    """
+    Score every job against several CV embeddings at once.
+
+    Args:
+        state: Application state holding the job collections and indexes
+        cv_embeddings: (users, dim) matrix of CV embeddings
+        mode: "description" or "hybrid" title + description scoring
+        title_weight: Weight of the job title distance in hybrid mode
+
+    Returns:
+        tuple: Job ids and a (users, jobs) distance matrix
+    """
+    job_desc_index = state.job_desc_index
+    if job_desc_index is not None:
+
+        def score_block():
+            job_distances = job_desc_index.distances_batch(cv_embeddings)
+            if mode == "hybrid":
+                job_title_distances = align_distances(
+                    state.job_titles_index.distances_batch(cv_embeddings),
+                    state.job_titles_rows,
+                )
+                job_distances = fuse_distances(
+                    job_distances, job_title_distances, title_weight
+                )
+            return job_distances
+
+        # Matrix products release the GIL, keep them off the event loop
+        return job_desc_index.ids, await asyncio.to_thread(score_block)
+
+    query_embeddings = [embedding.tolist() for embedding in cv_embeddings]
+    if mode == "hybrid":
+        job_desc_results, job_title_results = await asyncio.gather(
+            query_collection_many(state.job_desc_collection, query_embeddings),
+            query_collection_many(state.job_titles_collection, query_embeddings),
+        )
+        job_ids, job_distances = results_to_distance_matrix(job_desc_results)
+        _, job_title_distances = results_to_distance_matrix(job_title_results, job_ids)
+        return job_ids, fuse_distances(job_distances, job_title_distances, title_weight)
+
+    job_desc_results = await query_collection_many(
+        state.job_desc_collection, query_embeddings
+    )
+    return results_to_distance_matrix(job_desc_results)
+
+
+@router.post(
+    "/recommendations/batch",
+    responses={
+        200: {
+            "description": "Recommendations streamed as one JSON object per line",
+            "content": {
+                "application/x-ndjson": {
+                    "example": (
+                        '{"user_id": "123", "recommendations": [{"job_id": '
+                        '"68341f06d64eecb3953d5c3b", "similarity_score": 85.0}]}\n'
+                        '{"user_id": "456", "error": "CV embedding not found"}\n'
+                    )
+                }
+            },
+        },
+        500: {"description": "Error generating recommendations"},
+    },
+)
+async def get_batch_recommendations(
+    request: Request,
+    req_data: BatchRecommendationsRequest,
+    api_key: str = Depends(get_api_key),
+):
+    """Get top recommendations for many users, streamed as NDJSON."""
+
+    start_time = time.time()
+    request_id = f"req_{int(start_time)}"
+    user_ids = list(dict.fromkeys(req_data.user_ids))
+    logger.info(
+        "Starting batch recommendation generation [%s] for %d users",
+        request_id,
+        len(user_ids),
+    )
+
+    try:
+        # Fetch every CV embedding in a single request
+        cv_embeddings = await request.app.state.user_cv_embeddings_collection.get(
+            ids=user_ids, include=["embeddings"]
+        )
+    except Exception as e:
+        logger.error(
+            "[%s] Error fetching CV embeddings: %s", request_id, str(e), exc_info=True
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"error": str(e), "request_id": request_id},
+        )
+
+    embedding_rows = {user_id: row for row, user_id in enumerate(cv_embeddings["ids"])}
+    found_user_ids = [user_id for user_id in user_ids if user_id in embedding_rows]
+    missing_user_ids = [
+        user_id for user_id in user_ids if user_id not in embedding_rows
+    ]
+    embedding_matrix = np.asarray(cv_embeddings["embeddings"], dtype=np.float32)
+
+    async def stream_recommendations():
+        for user_id in missing_user_ids:
+            yield json.dumps({"user_id": user_id, "error": "CV embedding not found"})
+            yield "\n"
+
+        try:
+            for start in range(0, len(found_user_ids), BATCH_SCORING_BLOCK_SIZE):
+                block_user_ids = found_user_ids[
+                    start : start + BATCH_SCORING_BLOCK_SIZE
+                ]
+                block_embeddings = embedding_matrix[
+                    [embedding_rows[user_id] for user_id in block_user_ids]
+                ]
+                job_ids, top_jobs, top_scores = await _top_jobs_batch(
+                    request.app.state,
+                    block_embeddings,
+                    req_data.mode,
+                    req_data.title_weight,
+                    req_data.limit,
+                )
+
+                for row, user_id in enumerate(block_user_ids):
+                    recommendations = [
+                        {
+                            "job_id": job_ids[column],
+                            "similarity_score": float(score),
+                        }
+                        for column, score in zip(top_jobs[row], top_scores[row])
+                    ]
+                    yield json.dumps(
+                        {"user_id": user_id, "recommendations": recommendations}
+                    )
+                    yield "\n"
+        except Exception as e:
+            logger.error(
+                "[%s] Error generating batch recommendations: %s",
+                request_id,
+                str(e),
+                exc_info=True,
+            )
+            yield json.dumps({"error": str(e), "request_id": request_id})
+            yield "\n"
+            return
+
+        logger.info(
+            "[%s] Batch recommendations for %d users completed in %.2f seconds",
+            request_id,
+            len(user_ids),
+            time.time() - start_time,
+        )
+
+    return StreamingResponse(
+        stream_recommendations(), media_type="application/x-ndjson"
+    )
+
+
+@router.get(
+    "/similar_jobs/{job_id}",
+    response_model=SimilarJobsResponse,
+    responses={
+        200: {
+            "description": "Similar jobs found successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "job_id": "68341f06d64eecb3953d5c3b",
+                        "similar_jobs": [
+                            {
+                                "job_id": "68341f06d64eecb3953d5adc",
+                                "similarity_score": 91.2,
+                            },
+                        ],
+                        "metrics": {"graph_hit": 1.0, "total_response_time": 0.001},
+                    }
+                }
+            },
+        },
+        404: {"description": "Job not found"},
+        500: {"description": "Error finding similar jobs"},
+    },
+)
+async def get_similar_jobs(
+    request: Request,
+    job_id: str,
+    limit: int = Query(
+        10, ge=1, le=50, description="Maximum number of similar jobs to return"
+    ),
+    api_key: str = Depends(get_api_key),
+):
+    """Get the jobs most similar to a given job."""
+
+    start_time = time.time()
+    request_id = f"req_{int(start_time)}"
+    logger.info("[%s] Finding similar jobs for Job ID: %s", request_id, job_id)
+
+    try:
+        similar_jobs_graph = request.app.state.similar_jobs_graph
+        graph_hit = similar_jobs_graph is not None
+        if graph_hit:
+            ranked_jobs = similar_jobs_graph.get(job_id, limit)
+            if ranked_jobs is None:
+                logger.warning("[%s] Job %s is not in the graph", request_id, job_id)
+                return JSONResponse(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    content={"error": "Job not found", "request_id": request_id},
+                )
+            job_ids, scores = ranked_jobs
+        else:
+            job_desc_collection = request.app.state.job_desc_collection
+            job_embedding = await job_desc_collection.get(
+                ids=job_id, include=["embeddings"]
+            )
+            if not job_embedding["ids"]:
+                logger.warning("[%s] Job %s is not indexed", request_id, job_id)
+                return JSONResponse(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    content={"error": "Job not found", "request_id": request_id},
+                )
+
+            job_desc_index = request.app.state.job_desc_index
+            if job_desc_index is not None:
+                logger.info("[%s] Scoring similar jobs on the job index", request_id)
+                positions, distances, max_distances = await asyncio.to_thread(
+                    job_desc_index.top_k, job_embedding["embeddings"][:1], limit + 1
+                )
+                neighbour_ids = job_desc_index.ids[positions[0]]
+                scores = distances_to_match_scores(distances, max_distances)[0]
+            else:
+                # Scores are relative to the furthest of the few jobs returned
+                logger.info("[%s] Querying ChromaDB for similar jobs", request_id)
+                results = await query_collection(
+                    job_desc_collection,
+                    job_embedding["embeddings"][0].tolist(),
+                    n_results=limit + 1,
+                )
+                neighbour_ids = results["ids"][0]
+                scores = distances_to_match_scores(results["distances"][0])
+
+            neighbours = [
+                (neighbour_id, score)
+                for neighbour_id, score in zip(neighbour_ids, scores)
+                if neighbour_id != job_id
+            ][:limit]
+            job_ids = [neighbour_id for neighbour_id, _ in neighbours]
+            scores = [score for _, score in neighbours]
+
+        total_response_time = time.time() - start_time
+        logger.info(
+            "[%s] Found %d similar jobs in %.3f seconds",
+            request_id,
+            len(job_ids),
+            total_response_time,
+        )
+        return {
+            "job_id": job_id,
+            "similar_jobs": [
+                JobRecommendation(job_id=similar_job_id, similarity_score=float(score))
+                for similar_job_id, score in zip(job_ids, scores)
+            ],
+            "metrics": {
+                "graph_hit": float(graph_hit),
+                "total_response_time": total_response_time,
+            },
+        }
+
+    except Exception as e:
+        logger.error(
+            "[%s] Error finding similar jobs: %s",
+            request_id,
+            str(e),
+            exc_info=True,
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"error": str(e), "request_id": request_id},
+        )
+
+
+@router.post(
+    "/candidates",
+    response_model=CandidatesResponse,
+    responses={
+        200: {
+            "description": "Candidates ranked successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "candidates": [
+                            {"user_id": "123", "similarity_score": 88.4},
+                            {"user_id": "456", "similarity_score": 81.9},
+                        ],
+                        "metrics": {
+                            "job_embedding_time": 0.01,
+                            "scoring_time": 0.02,
+                            "total_response_time": 0.03,
+                        },
+                    }
+                }
+            },
+        },
+        400: {"description": "Neither or both of job_id and job_text given"},
+        404: {"description": "Job not found"},
+        500: {"description": "Error ranking candidates"},
+    },
+)
+async def get_candidates(
+    request: Request,
+    req_data: CandidatesRequest,
+    api_key: str = Depends(get_api_key),
+):
+    """Get the best matching candidates for a job."""
+
+    start_time = time.time()
+    request_id = f"req_{int(start_time)}"
+    logger.info(
+        "Starting candidate ranking [%s] for Job ID: %s", request_id, req_data.job_id
+    )
+
+    if (req_data.job_id is None) == (req_data.job_text is None):
+        logger.warning("[%s] Rejected request without a single job", request_id)
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "error": "Exactly one of job_id and job_text is required",
+                "request_id": request_id,
+            },
+        )
+
+    try:
+        job_embedding_start_time = time.time()
+        if req_data.job_id is not None:
+            stored_job = await request.app.state.job_desc_collection.get(
+                ids=[req_data.job_id], include=["embeddings"]
+            )
+            if not stored_job["ids"]:
+                logger.warning(
+                    "[%s] Job %s is not indexed", request_id, req_data.job_id
+                )
+                return JSONResponse(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    content={"error": "Job not found", "request_id": request_id},
+                )
+            job_embedding = stored_job["embeddings"][0]
+        else:
+            # Embed like the indexed job descriptions so both sides compare
+            job_embedding = await request.app.state.embedding_batcher.embed(
+                req_data.job_text,
+                task_type="RETRIEVAL_DOCUMENT",
+                title=JOB_DESCRIPTION_TITLE,
+            )
+        job_embedding_time = time.time() - job_embedding_start_time
+
+        scoring_start_time = time.time()
+        candidate_index = request.app.state.candidate_index
+        if candidate_index is not None:
+            user_ids, distances, max_distance = await asyncio.to_thread(
+                candidate_index.top_k, job_embedding, req_data.limit
+            )
+            scores = distances_to_match_scores(distances, max_distance)
+        else:
+            # Scores are relative to the furthest of the candidates returned.
+            # CV section chunks share the collection, so enough records are
+            # fetched to fill the limit with whole CVs.
+            results = await query_collection(
+                request.app.state.user_cv_embeddings_collection,
+                np.asarray(job_embedding, dtype=np.float32).tolist(),
+                n_results=req_data.limit * (MAX_CV_CHUNKS + 1),
+            )
+            whole_cvs = [
+                position
+                for position, record_id in enumerate(results["ids"][0])
+                if not is_cv_chunk_id(record_id)
+            ][: req_data.limit]
+            user_ids = [results["ids"][0][position] for position in whole_cvs]
+            scores = distances_to_match_scores(
+                np.asarray(results["distances"][0], dtype=np.float32)[whole_cvs]
+            )
+        scoring_time = time.time() - scoring_start_time
+
+        total_response_time = time.time() - start_time
+        logger.info(
+            "[%s] Ranked %d candidates in %.3f seconds",
+            request_id,
+            len(user_ids),
+            total_response_time,
+        )
+        return {
+            "candidates": [
+                CandidateMatch(user_id=user_id, similarity_score=float(score))
+                for user_id, score in zip(user_ids, scores)
+            ],
+            "metrics": {
+                "job_embedding_time": job_embedding_time,
+                "scoring_time": scoring_time,
+                "total_response_time": total_response_time,
+            },
+        }
+
+    except Exception as e:
+        logger.error(
+            "[%s] Error ranking candidates: %s", request_id, str(e), exc_info=True
+        )
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"error": str(e), "request_id": request_id},
+        )
+
+
+@router.get(
+    "/search",
+    response_model=SearchResponse,
+    responses={
+        200: {
+            "description": "Jobs matching the query ranked successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "recommendations": [
+                            {
+                                "job_id": "68341f06d64eecb3953d5c3b",
+                                "similarity_score": 92.4,
+                                "fusion_score": 99.2,
+                            },
+                        ],
+                        "metrics": {
+                            "query_embedding_time": 0.0,
+                            "query_cache_hit": 1.0,
+                            "chroma_query_response_time": 0.02,
+                            "total_response_time": 0.03,
+                        },
+                        "next_cursor": "eyJvZmZzZXQiOjIwfQ==",
+                        "total_results": 1342,
+                        "result_cap": 1000,
+                    }
+                }
+            },
+        },
+        400: {"description": "Empty query or invalid pagination cursor"},
+        500: {"description": "Error searching jobs"},
+    },
+)
+async def search_jobs(
+    request: Request,
+    q: str = Query(..., description="Free-text query, e.g. software developer"),
+    limit: int = Query(20, ge=1, description="Maximum number of jobs to return"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor returned by the previous page"
+    ),
+    mode: Literal["description", "hybrid"] = Query(
+        "hybrid",
+        description="Match job descriptions only, or fuse title and description",
+    ),
+    title_weight: float = Query(
+        0.6, ge=0, le=1, description="Weight of the job title score in hybrid mode"
+    ),
+    lexical: bool = Query(
+        True, description="Fuse BM25 keyword matches into the semantic ranking"
+    ),
+    api_key: str = Depends(get_api_key),
+):
+    """Search jobs with a free-text query."""
+
+    start_time = time.time()
+    request_id = f"req_{int(start_time)}"
+    query = normalize_query(q)
+    logger.info("Starting job search [%s] for query: %s", request_id, query)
+
+    if not query:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": "Query must not be empty", "request_id": request_id},
+        )
+    try:
+        offset = decode_cursor(cursor) if cursor else 0
+    except ValueError as e:
+        logger.warning("[%s] Rejected pagination cursor: %s", request_id, str(e))
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": str(e), "request_id": request_id},
+        )
+
+    try:
+        embedding_batcher = request.app.state.embedding_batcher
+        query_embedding_cache = request.app.state.query_embedding_cache
+
+        # Popular queries are answered from the cache without a model call
+        query_embedding_start_time = time.time()
+        if query_embedding_cache is not None:
+            query_embedding, query_cache_hit = await query_embedding_cache.get_or_embed(
+                query, embedding_batcher.embed
+            )
+        else:
+            query_embedding = await embedding_batcher.embed(query)
+            query_cache_hit = False
+        query_embedding_time = time.time() - query_embedding_start_time
+        logger.info(
+            "[%s] Query embedding %s in %.3f seconds",
+            request_id,
+            "served from cache" if query_cache_hit else "created",
+            query_embedding_time,
+        )
+
+        chroma_query_start_time = time.time()
+        job_ids, job_distances = await _score_jobs(
+            request.app.state, query_embedding, mode, title_weight
+        )
+        chroma_query_response_time = time.time() - chroma_query_start_time
+
+        match_scores = distances_to_match_scores(job_distances)
+        lexical_index = request.app.state.lexical_index
+        lexical_search_time = 0.0
+        if lexical and lexical_index is not None:
+            # Exact skill and tool names are matched on the BM25 posting lists
+            lexical_search_start_time = time.time()
+            lexical_rows, _ = lexical_index.search(query, SEARCH_FUSION_DEPTH)
+            lexical_search_time = time.time() - lexical_search_start_time
+
+            vector_ranking = select_top_ranks(match_scores, 0, SEARCH_FUSION_DEPTH)
+            ranked_ids, fusion_scores = reciprocal_rank_fusion(
+                [
+                    [job_ids[position] for position in vector_ranking],
+                    lexical_index.job_ids[lexical_rows].tolist(),
+                ]
+            )
+            total_results = len(ranked_ids)
+            result_cap = SEARCH_FUSION_DEPTH
+            page_ids = ranked_ids[offset : offset + limit]
+            # A job ranked first by both retrievers scores 100
+            page_fusion_scores = (
+                fusion_scores[offset : offset + limit] * (RRF_K + 1) * 50
+            ).tolist()
+
+            # Keyword-only matches are looked up outside the semantic ranking
+            vector_positions = {
+                job_ids[position]: position for position in vector_ranking
+            }
+            missing_ids = [
+                job_id for job_id in page_ids if job_id not in vector_positions
+            ]
+            if missing_ids:
+                vector_positions.update(
+                    zip(missing_ids, lookup_rows(missing_ids, job_ids).tolist())
+                )
+            page_scores = [
+                (
+                    match_scores[vector_positions[job_id]]
+                    if vector_positions[job_id] >= 0
+                    else 0.0
+                )
+                for job_id in page_ids
+            ]
+        else:
+            total_results = len(match_scores)
+            result_cap = None
+            page = select_top_ranks(match_scores, offset, offset + limit)
+            page_ids = [job_ids[position] for position in page]
+            page_scores = match_scores[page]
+            page_fusion_scores = [None] * len(page_ids)
+
+        next_offset = offset + len(page_ids)
+        next_cursor = (
+            encode_cursor(next_offset) if next_offset < total_results else None
+        )
+
+        total_response_time = time.time() - start_time
+        logger.info(
+            "[%s] Job search returned %d of %d jobs in %.2f seconds",
+            request_id,
+            len(page_ids),
+            total_results,
+            total_response_time,
+        )
+        return {
+            "recommendations": [
+                SearchResult(
+                    job_id=job_id,
+                    similarity_score=float(score),
+                    fusion_score=fusion_score,
+                )
+                for job_id, score, fusion_score in zip(
+                    page_ids, page_scores, page_fusion_scores
+                )
+            ],
+            "metrics": {
+                "query_embedding_time": query_embedding_time,
+                "query_cache_hit": float(query_cache_hit),
+                "chroma_query_response_time": chroma_query_response_time,
+                "lexical_search_time": lexical_search_time,
+                "total_response_time": total_response_time,
+            },
+            "next_cursor": next_cursor,
+            "total_results": total_results,
+            "result_cap": result_cap,
+        }
+
+    except Exception as e:
+        logger.error("[%s] Error searching jobs: %s", request_id, str(e), exc_info=True)
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"error": str(e), "request_id": request_id},
+        )
+
+
+@router.get(
+    "/autocomplete",
+    response_model=AutocompleteResponse,
+    responses={
+        200: {
+            "description": "Suggestions for the prefix returned successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "prefix": "sales e",
+                        "suggestions": [
+                            {"text": "Sales Executive", "kind": "title", "count": 5},
+                        ],
+                        "metrics": {"total_response_time": 0.00002},
+                    }
+                }
+            },
+        },
+    },
+)
+async def autocomplete(
+    request: Request,
+    prefix: str = Query(..., description="Text typed so far, e.g. sales e"),
+    limit: int = Query(
+        10, ge=1, le=MAX_SUGGESTIONS, description="Maximum number of suggestions"
+    ),
+    api_key: str = Depends(get_api_key),
+):
+    """
+    Suggest job titles and categories for a search box prefix.
+
+    Suggestions come from the in-memory autocomplete index only, so keystroke
+    traffic never reaches the embedding model or ChromaDB.
+    """
+
+    start_time = time.time()
+    autocomplete_index = request.app.state.autocomplete_index
+    suggestions = (
+        autocomplete_index.complete(prefix, limit)
+        if autocomplete_index is not None
+        else []
+    )
+    return {
+        "prefix": prefix,
+        "suggestions": [
+            AutocompleteSuggestion(text=text, kind=kind, count=count)
+            for text, kind, count in suggestions
+        ],
+        "metrics": {"total_response_time": time.time() - start_time},
+    }
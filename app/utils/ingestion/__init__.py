@@ -0,0 +1,8 @@
+"""
+Job ingestion utilities module for ML Services.
+"""
+
+from app.utils.ingestion.rate_limiter import *
+from app.utils.ingestion.checkpoint import *
+from app.utils.ingestion.pipeline import *
+from app.utils.ingestion.cv_ingestion import *
@@ -0,0 +1,77 @@
+"""
+Resumable progress tracking for ingestion runs.
+
+This module appends every record committed to a collection to a per-collection
+log, so an interrupted run resumes from the last upserted batch instead of
+embedding the whole corpus again.
+"""
+
+from typing import Dict, Iterable, Tuple
+import json
+import logging
+import os
+import shutil
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class IngestionCheckpoint:
+    """
+    Append-only log of the records already written to each collection.
+
+    Records are stored as `{"id": ..., "content_hash": ...}` lines, so a record
+    whose content changed since it was logged is embedded again.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _log_path(self, collection_name: str) -> str:
+        return os.path.join(self.path, f"{collection_name}.jsonl")
+
+    def completed(self, collection_name: str) -> Dict[str, str]:
+        """
+        Read the records already written to a collection.
+
+        Args:
+            collection_name: Name of the ChromaDB collection
+
+        Returns:
+            dict: Content hash of every completed record, keyed by id
+        """
+        completed = {}
+        log_path = self._log_path(collection_name)
+        if not os.path.exists(log_path):
+            return completed
+
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave the last line half written
+                    continue
+                completed[entry["id"]] = entry["content_hash"]
+        return completed
+
+    def record(self, collection_name: str, entries: Iterable[Tuple[str, str]]) -> None:
+        """
+        Log records that were committed to a collection.
+
+        Args:
+            collection_name: Name of the ChromaDB collection
+            entries: (id, content hash) of every committed record
+        """
+        with open(self._log_path(collection_name), "a", encoding="utf-8") as f:
+            for record_id, content_hash in entries:
+                f.write(json.dumps({"id": record_id, "content_hash": content_hash}))
+                f.write("\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        """Remove the checkpoint once a run has completed."""
+        shutil.rmtree(self.path, ignore_errors=True)
+        logger.info("Cleared ingestion checkpoint at %s", self.path)
@@ -0,0 +1,454 @@
+"""
+Bulk ingestion of user CVs into the `user_cv_embeddings` collection.
+
+This module converts many CVs to text with a bounded number of model calls in
+flight, embeds the finished CVs and their sections together in batched calls,
+and upserts them into ChromaDB in chunks. Progress of every CV is kept on a
+job record in Google Cloud Storage, so any instance can serve the job status.
+The instance running a job renews its lease on the record; a job whose lease
+expired, e.g. because its instance was scaled down, is resumed by the next
+instance asked for its status, skipping the CVs already done.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from google.api_core.exceptions import PreconditionFailed
+
+from app.utils.recommendation.cv_chunks import (
+    build_cv_records,
+    cv_chunk_ids,
+    split_cv_sections,
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Converted CVs wait at most this long for a fuller embedding batch
+EMBEDDING_FLUSH_SECONDS = 2.0
+
+# The running instance saves the job record this often, renewing its lease
+JOB_HEARTBEAT_SECONDS = 15.0
+
+# A running job whose record was not saved for this long is resumed elsewhere
+JOB_LEASE_SECONDS = 120.0
+
+ITEM_STATUSES = (
+    "pending",
+    "converting",
+    "embedding",
+    "completed",
+    "unchanged",
+    "failed",
+)
+
+# CVs in these states are not processed again when a job resumes
+FINAL_ITEM_STATUSES = ("completed", "unchanged", "failed")
+
+
+class CVIngestionJob:
+    """Status of one bulk CV ingestion and of every CV in it."""
+
+    def __init__(self, cv_storage_urls: Dict[str, str]) -> None:
+        self.job_id = uuid.uuid4().hex
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.heartbeat_at = self.created_at
+        self.cv_storage_urls = dict(cv_storage_urls)
+        self.items: Dict[str, Dict[str, Optional[str]]] = {
+            user_id: {"status": "pending", "error": None} for user_id in cv_storage_urls
+        }
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job stopped, successfully or not."""
+        return self.status in ("completed", "failed")
+
+    @property
+    def abandoned(self) -> bool:
+        """Whether the job is unfinished and its lease expired."""
+        return not self.finished and time.time() - self.heartbeat_at > JOB_LEASE_SECONDS
+
+    def pending_cv_storage_urls(self) -> Dict[str, str]:
+        """CV storage URL of every user whose CV still has to be processed."""
+        return {
+            user_id: cv_storage_url
+            for user_id, cv_storage_url in self.cv_storage_urls.items()
+            if self.items[user_id]["status"] not in FINAL_ITEM_STATUSES
+        }
+
+    def set_item(self, user_id: str, status: str, error: Optional[str] = None) -> None:
+        """Record the progress of one CV."""
+        self.items[user_id] = {"status": status, "error": error}
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """Mark the job as stopped, failing the CVs still in progress on error."""
+        if error is not None:
+            for user_id, item in self.items.items():
+                if item["status"] not in FINAL_ITEM_STATUSES:
+                    self.set_item(user_id, "failed", error)
+        self.status = "failed" if error is not None else "completed"
+        self.error = error
+        self.finished_at = time.time()
+
+    def to_dict(self, include_items: bool = True) -> dict:
+        """Summarize the job, with per-status counts and optionally every CV."""
+        counts = {status: 0 for status in ITEM_STATUSES}
+        for item in self.items.values():
+            counts[item["status"]] += 1
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "abandoned": self.abandoned,
+            "total": len(self.items),
+            "counts": counts,
+            "items": (
+                [{"user_id": user_id, **item} for user_id, item in self.items.items()]
+                if include_items
+                else None
+            ),
+        }
+
+    def to_record(self) -> dict:
+        """Serialize everything needed to report on or resume the job."""
+        return {
+            **self.to_dict(),
+            "heartbeat_at": self.heartbeat_at,
+            "cv_storage_urls": self.cv_storage_urls,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict):
+        """Rebuild a job from `to_record` output."""
+        job = cls(record["cv_storage_urls"])
+        job.job_id = record["job_id"]
+        job.status = record["status"]
+        job.error = record["error"]
+        job.created_at = record["created_at"]
+        job.finished_at = record["finished_at"]
+        job.heartbeat_at = record["heartbeat_at"]
+        for item in record["items"]:
+            job.set_item(item["user_id"], item["status"], item["error"])
+        return job
+
+
+class CVIngestionJobStore:
+    """
+    Bulk CV ingestion jobs kept as JSON records in Google Cloud Storage.
+
+    Every write is conditional on the generation of the record this instance
+    last saw, so when two instances race to resume an abandoned job only one
+    of them wins, and an instance that lost its lease stops its job instead of
+    overwriting the new owner's progress.
+    """
+
+    def __init__(
+        self, storage_client, bucket_name: str, prefix: str = "cv_ingestion_jobs/"
+    ) -> None:
+        self.storage_client = storage_client
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        # Jobs running on this instance
+        self._jobs: Dict[str, CVIngestionJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Generation of each record last written or read by this instance
+        self._generations: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _blob(self, job_id: str):
+        return self.storage_client.bucket(self.bucket_name).blob(
+            f"{self.prefix}{job_id}.json"
+        )
+
+    async def save(self, job: CVIngestionJob) -> None:
+        """
+        Write the job record.
+
+        Raises:
+            PreconditionFailed: Another instance wrote the record since this
+                instance last saw it
+        """
+        payload = json.dumps(job.to_record())
+        generation = self._generations.get(job.job_id, 0)
+
+        def write() -> int:
+            blob = self._blob(job.job_id)
+            # Generation 0 only matches a record that does not exist yet
+            blob.upload_from_string(
+                payload,
+                content_type="application/json",
+                if_generation_match=generation,
+            )
+            return blob.generation
+
+        self._generations[job.job_id] = await asyncio.to_thread(write)
+
+    async def get(self, job_id: str) -> Optional[CVIngestionJob]:
+        """Return a job by ID, or None if it is unknown."""
+        if job_id in self._jobs:
+            return self._jobs[job_id]
+
+        def read():
+            blob = self.storage_client.bucket(self.bucket_name).get_blob(
+                f"{self.prefix}{job_id}.json"
+            )
+            if blob is None:
+                return None, None
+            return json.loads(blob.download_as_text()), blob.generation
+
+        record, generation = await asyncio.to_thread(read)
+        if record is None:
+            return None
+        self._generations[job_id] = generation
+        return CVIngestionJob.from_record(record)
+
+    async def start(self, job: CVIngestionJob, run: Awaitable[None]) -> None:
+        """Save a new job and run its coroutine in the background."""
+        await self.save(job)
+        self._run(job, run)
+
+    async def resume(self, job: CVIngestionJob, run: Awaitable[None]) -> bool:
+        """
+        Take over an abandoned job and run its coroutine in the background.
+
+        Returns:
+            bool: False when another instance took the job over first
+        """
+        job.status = "pending"
+        job.heartbeat_at = time.time()
+        for user_id, item in job.items.items():
+            if item["status"] not in FINAL_ITEM_STATUSES:
+                job.set_item(user_id, "pending")
+        try:
+            await self.save(job)
+        except PreconditionFailed:
+            run.close()
+            logger.info("Bulk CV ingestion %s was resumed elsewhere", job.job_id)
+            return False
+
+        logger.info(
+            "Resuming bulk CV ingestion %s with %d CVs left",
+            job.job_id,
+            len(job.pending_cv_storage_urls()),
+        )
+        self._run(job, run)
+        return True
+
+    def _run(self, job: CVIngestionJob, run: Awaitable[None]) -> None:
+        self._jobs[job.job_id] = job
+        self._tasks[job.job_id] = asyncio.create_task(self._supervise(job, run))
+
+    async def _supervise(self, job: CVIngestionJob, run: Awaitable[None]) -> None:
+        """Run a job while renewing its lease, and save its final state."""
+        task = asyncio.create_task(run)
+        try:
+            while True:
+                await asyncio.wait({task}, timeout=JOB_HEARTBEAT_SECONDS)
+                job.heartbeat_at = time.time()
+                try:
+                    await self.save(job)
+                except PreconditionFailed:
+                    logger.warning(
+                        "Lost the lease on bulk CV ingestion %s, stopping it",
+                        job.job_id,
+                    )
+                    task.cancel()
+                    return
+                except Exception as e:
+                    logger.warning(
+                        "Could not save bulk CV ingestion %s: %s", job.job_id, e
+                    )
+                if task.done():
+                    return
+        except asyncio.CancelledError:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # Expire the lease so the job can be resumed on another instance
+            job.heartbeat_at = 0.0
+            await self.save(job)
+            raise
+        finally:
+            self._jobs.pop(job.job_id, None)
+            self._tasks.pop(job.job_id, None)
+
+    async def shutdown(self) -> None:
+        """Stop every running job, saving its progress for another instance."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def ingest_cvs(
+    job: CVIngestionJob,
+    collection,
+    embedding_batcher,
+    fetch_cv_hash: Callable[[str], Awaitable[str]],
+    convert_cv: Callable[[str], Awaitable[str]],
+    on_upserted: Optional[Callable[[List[str], List[List[float]]], None]] = None,
+    concurrency: int = 8,
+    batch_size: int = 64,
+    upsert_batch_size: int = 500,
+) -> None:
+    """
+    Convert, embed and upsert the CVs of a bulk ingestion job.
+
+    Only CVs not yet completed, unchanged or failed are processed, so a resumed
+    job picks up where it stopped. CVs whose content hash matches the stored
+    embedding are skipped. A CV that fails to convert, or a batch that fails to
+    embed or upsert, fails only its own CVs.
+
+    Args:
+        job: Job updated with the progress of every CV
+        collection: Async ChromaDB collection of CV embeddings
+        embedding_batcher: Embedding service used for CVs and their sections
+        fetch_cv_hash: Coroutine function returning the content hash of a CV URL
+        convert_cv: Coroutine function returning the text representation of a
+            CV URL
+        on_upserted: Called with the user IDs and whole-CV embeddings of every
+            upserted batch
+        concurrency: Maximum number of CVs converted at once
+        batch_size: Number of texts gathered before an embedding call
+        upsert_batch_size: Number of records per upsert
+    """
+    job.status = "running"
+    start_time = time.time()
+    cv_storage_urls = job.pending_cv_storage_urls()
+    try:
+        user_ids = list(cv_storage_urls)
+        stored_metadatas = {}
+        for start in range(0, len(user_ids), upsert_batch_size):
+            stored = await collection.get(
+                ids=user_ids[start : start + upsert_batch_size], include=["metadatas"]
+            )
+            for user_id, metadata in zip(stored["ids"], stored["metadatas"]):
+                stored_metadatas[user_id] = metadata or {}
+
+        converted: asyncio.Queue = asyncio.Queue()
+        conversion_slots = asyncio.Semaphore(concurrency)
+
+        async def convert(user_id: str) -> None:
+            async with conversion_slots:
+                job.set_item(user_id, "converting")
+                try:
+                    cv_url = cv_storage_urls[user_id]
+                    cv_hash = await fetch_cv_hash(cv_url)
+                    stored_metadata = stored_metadatas.get(user_id)
+                    if (
+                        stored_metadata is not None
+                        and stored_metadata.get("cv_hash") == cv_hash
+                    ):
+                        job.set_item(user_id, "unchanged")
+                        return
+                    text = await convert_cv(cv_url)
+                except Exception as e:
+                    logger.warning("Failed to convert CV of user %s: %s", user_id, e)
+                    job.set_item(user_id, "failed", str(e))
+                    return
+            job.set_item(user_id, "embedding")
+            await converted.put(
+                (
+                    user_id,
+                    build_cv_records(user_id, text, split_cv_sections(text), cv_hash),
+                )
+            )
+
+        async def flush(buffer) -> None:
+            ids, documents, metadatas = [], [], []
+            whole_cv_rows = []
+            stale_chunk_ids = []
+            for user_id, (record_ids, record_documents, record_metadatas) in buffer:
+                # The whole-CV record leads the records of each CV
+                whole_cv_rows.append(len(ids))
+                ids.extend(record_ids)
+                documents.extend(record_documents)
+                metadatas.extend(record_metadatas)
+                previous_chunks = stored_metadatas.get(user_id, {}).get("chunks", 0)
+                stale_chunk_ids.extend(
+                    cv_chunk_ids(user_id, previous_chunks)[len(record_ids) - 1 :]
+                )
+
+            try:
+                # Every CV and section of the buffer shares the embedding calls
+                embeddings = await embedding_batcher.embed_many(documents)
+                for start in range(0, len(ids), upsert_batch_size):
+                    stop = start + upsert_batch_size
+                    await collection.upsert(
+                        ids=ids[start:stop],
+                        embeddings=embeddings[start:stop],
+                        documents=documents[start:stop],
+                        metadatas=metadatas[start:stop],
+                    )
+                if stale_chunk_ids:
+                    await collection.delete(ids=stale_chunk_ids)
+            except Exception as e:
+                logger.error("Failed to store a batch of %d CVs: %s", len(buffer), e)
+                for user_id, _ in buffer:
+                    job.set_item(user_id, "failed", str(e))
+                return
+
+            if on_upserted is not None:
+                on_upserted(
+                    [ids[row] for row in whole_cv_rows],
+                    [embeddings[row] for row in whole_cv_rows],
+                )
+            for user_id, _ in buffer:
+                job.set_item(user_id, "completed")
+            logger.info(
+                "Stored embeddings of %d CVs for job %s", len(buffer), job.job_id
+            )
+
+        async def embed_worker() -> None:
+            buffer = []
+            texts = 0
+            while True:
+                try:
+                    item = await asyncio.wait_for(
+                        converted.get(), timeout=EMBEDDING_FLUSH_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Embed what is waiting instead of stalling on slow conversions
+                    if buffer:
+                        await flush(buffer)
+                        buffer, texts = [], 0
+                    continue
+                if item is None:
+                    break
+
+                buffer.append(item)
+                texts += len(item[1][1])
+                if texts >= batch_size:
+                    await flush(buffer)
+                    buffer, texts = [], 0
+            if buffer:
+                await flush(buffer)
+
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(embed_worker())
+            async with asyncio.TaskGroup() as convert_group:
+                for user_id in user_ids:
+                    convert_group.create_task(convert(user_id))
+            await converted.put(None)
+    except Exception as e:
+        logger.error("Bulk CV ingestion %s failed: %s", job.job_id, e, exc_info=True)
+        job.finish(str(e))
+        return
+
+    job.finish()
+    logger.info(
+        "Bulk CV ingestion %s finished %d CVs in %.2f seconds",
+        job.job_id,
+        len(job.items),
+        time.time() - start_time,
+    )
@@ -0,0 +1,540 @@
+"""
+Concurrent ingestion of job postings into the ChromaDB job collections.
+
+This module embeds job titles and descriptions in batches with a bounded number
+of in-flight requests paced by an adaptive rate limiter, and upserts finished
+batches into ChromaDB while the next ones are still being embedded. Committed
+records are checkpointed so an interrupted run can be resumed. In sync mode
+only new or changed jobs are embedded and removed jobs are deleted, after which
+the corpus version observed by the API is bumped.
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+import asyncio
+import hashlib
+import logging
+
+from app.utils.ingestion.checkpoint import IngestionCheckpoint
+from app.utils.ingestion.rate_limiter import AdaptiveRateLimiter, is_rate_limit_error
+from app.utils.recommendation.job_sources import format_job_description
+from app.utils.recommendation.embedding_cache import (
+    EmbeddingCache,
+    embedding_cache_key,
+)
+from app.utils.recommendation.recommendation_utils import (
+    EMBEDDING_MODEL,
+    create_embeddings,
+)
+from app.utils.recommendation.vector_index import (
+    SPACE_METADATA_KEY,
+    collection_space,
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Collection whose metadata carries the job corpus version
+CORPUS_VERSION_COLLECTION = "job_desc_req_documents"
+
+# Largest share of the indexed jobs a sync deletes without being forced
+MAX_REMOVED_FRACTION = 0.2
+
+
+class CollectionSpec(NamedTuple):
+    """ChromaDB collection fed by the ingestion pipeline."""
+
+    name: str
+    title: str
+    text: Callable[[Dict[str, Any]], str]
+
+
+JOB_COLLECTIONS = (
+    CollectionSpec(
+        "job_titles_documents", "Job Title", lambda job: job["job_position"]
+    ),
+    CollectionSpec(
+        "job_desc_req_documents",
+        "Job Description and Qualification",
+        format_job_description,
+    ),
+)
+
+
+def content_hash(text: str) -> str:
+    """Hash the embedded text of a record to detect content changes."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def embed_with_retry(
+    client,
+    texts: List[str],
+    title: str,
+    rate_limiter: AdaptiveRateLimiter,
+    max_retries: int = 5,
+    cache: Optional[EmbeddingCache] = None,
+) -> List[List[float]]:
+    """
+    Embed a batch of documents, backing off when the quota is exhausted.
+
+    Cached documents are answered from the cache without consuming quota.
+
+    Args:
+        client: Gemini client
+        texts: Documents to embed
+        title: Document title passed to the embedding model
+        rate_limiter: Limiter shared by every embedding worker
+        max_retries: Number of retries after quota errors
+        cache: Optional persistent embedding cache
+
+    Returns:
+        list: Embedding of every document
+    """
+    keys = [
+        embedding_cache_key(EMBEDDING_MODEL, "RETRIEVAL_DOCUMENT", title, text)
+        for text in texts
+    ]
+    embeddings = (
+        await asyncio.to_thread(cache.get_many, keys) if cache is not None else {}
+    )
+    missing = {key: text for key, text in zip(keys, texts) if key not in embeddings}
+
+    for attempt in range(max_retries + 1):
+        if not missing:
+            break
+        await rate_limiter.acquire(len(missing))
+        try:
+            created = await create_embeddings(
+                client,
+                list(missing.values()),
+                task_type="RETRIEVAL_DOCUMENT",
+                title=title,
+            )
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == max_retries:
+                raise
+            rate_limiter.on_rate_limited(retry_after=min(2**attempt, 60))
+            continue
+
+        rate_limiter.on_success()
+        created = dict(zip(missing, created))
+        if cache is not None:
+            await asyncio.to_thread(cache.set_many, created.items())
+        embeddings.update(created)
+        break
+
+    return [embeddings[key] for key in keys]
+
+
+async def fetch_content_hashes(
+    collection, page_size: int = 1000
+) -> Dict[str, Optional[str]]:
+    """
+    Read the content hash of every record indexed in a collection.
+
+    Args:
+        collection: Async ChromaDB collection
+        page_size: Number of records fetched per request
+
+    Returns:
+        dict: Content hash of every indexed record, None when it has none
+    """
+    content_hashes = {}
+    total = await collection.count()
+    for offset in range(0, total, page_size):
+        page = await collection.get(
+            include=["metadatas"], limit=page_size, offset=offset
+        )
+        for record_id, metadata in zip(page["ids"], page["metadatas"]):
+            content_hashes[record_id] = (metadata or {}).get("content_hash")
+    return content_hashes
+
+
+async def bump_corpus_version(chroma_client) -> int:
+    """
+    Increment the job corpus version stored in the collection metadata.
+
+    Args:
+        chroma_client: Async ChromaDB client
+
+    Returns:
+        int: New corpus version
+    """
+    collection = await chroma_client.get_collection(name=CORPUS_VERSION_COLLECTION)
+    space = collection_space(collection.metadata)
+    # The distance function cannot be modified, so only user keys are written
+    # and the space is kept under a user key that survives the rewrite
+    metadata = {
+        key: value
+        for key, value in (collection.metadata or {}).items()
+        if not key.startswith("hnsw:")
+    }
+    corpus_version = int(metadata.get("corpus_version") or 0) + 1
+    metadata["corpus_version"] = corpus_version
+    metadata[SPACE_METADATA_KEY] = space
+    await collection.modify(metadata=metadata)
+
+    collection = await chroma_client.get_collection(name=CORPUS_VERSION_COLLECTION)
+    if collection_space(collection.metadata) != space:
+        raise RuntimeError(
+            f"Distance space of '{CORPUS_VERSION_COLLECTION}' changed from {space} "
+            f"to {collection_space(collection.metadata)} after the corpus version "
+            "bump"
+        )
+    logger.info("Bumped job corpus version to %d", corpus_version)
+    return corpus_version
+
+
+class CollectionPlan(NamedTuple):
+    """Records to embed and delete in a collection, computed before any write."""
+
+    spec: CollectionSpec
+    collection: Any
+    indexed: Dict[str, Optional[str]]
+    source_ids: Set[str]
+    pending: List[Tuple[str, str, str]]
+    removed: List[str]
+    skipped: int
+
+
+async def plan_collection(
+    chroma_client,
+    jobs: Sequence[Dict[str, Any]],
+    spec: CollectionSpec,
+    checkpoint: IngestionCheckpoint,
+    sync: bool = False,
+) -> CollectionPlan:
+    """
+    Diff the jobs of a source against the records indexed in a collection.
+
+    Jobs that are already checkpointed are skipped. In sync mode jobs whose
+    content hash matches the indexed record are also skipped, and indexed
+    records missing from `jobs` are marked for deletion. Jobs without text
+    are skipped and counted, and their indexed records are kept.
+
+    Args:
+        chroma_client: Async ChromaDB client
+        jobs: Normalized job records
+        spec: Collection to fill
+        checkpoint: Progress of the current run
+        sync: Diff against the indexed records instead of rebuilding
+
+    Returns:
+        CollectionPlan: Records to embed and delete
+    """
+    collection = await chroma_client.get_or_create_collection(name=spec.name)
+    completed = checkpoint.completed(spec.name)
+    indexed = await fetch_content_hashes(collection)
+    known = {**indexed, **completed} if sync else completed
+
+    pending = []
+    source_ids = set()
+    skipped_ids = set()
+    for job in jobs:
+        text = spec.text(job)
+        if not text:
+            logger.warning("Skipping job %s without text for %s", job["id"], spec.name)
+            skipped_ids.add(job["id"])
+            continue
+        source_ids.add(job["id"])
+        text_hash = content_hash(text)
+        if known.get(job["id"]) != text_hash:
+            pending.append((job["id"], text, text_hash))
+    removed = (
+        [
+            record_id
+            for record_id in indexed
+            if record_id not in source_ids and record_id not in skipped_ids
+        ]
+        if sync
+        else []
+    )
+
+    logger.info(
+        "Ingesting %d of %d jobs into '%s' (%d already checkpointed or unchanged, "
+        "%d skipped without text, %d of %d indexed jobs removed)",
+        len(pending),
+        len(jobs),
+        spec.name,
+        len(source_ids) - len(pending),
+        len(skipped_ids),
+        len(removed),
+        len(indexed),
+    )
+    return CollectionPlan(
+        spec, collection, indexed, source_ids, pending, removed, len(skipped_ids)
+    )
+
+
+def check_plan(
+    plan: CollectionPlan, max_removed_fraction: float = MAX_REMOVED_FRACTION
+) -> None:
+    """
+    Refuse to write a collection whose records the source does not know.
+
+    A source keyed by other job ids, such as the row numbers of the CSV
+    exports against a collection keyed by MongoDB ids, would otherwise add a
+    second copy of the corpus that the API cannot map back to job postings,
+    or delete the whole collection in sync mode. A truncated or empty source
+    would delete most of it.
+
+    Args:
+        plan: Diff of the source against the collection
+        max_removed_fraction: Largest share of the indexed records to delete
+
+    Raises:
+        ValueError: If the collection has records and none of them is in the
+            source, or too many of them would be deleted
+    """
+    if plan.indexed and plan.source_ids.isdisjoint(plan.indexed):
+        raise ValueError(
+            f"None of the {len(plan.source_ids)} source job ids is indexed in "
+            f"'{plan.spec.name}', which holds {len(plan.indexed)} records; check "
+            "that the source uses the same job ids as ChromaDB"
+        )
+    if len(plan.removed) > max_removed_fraction * len(plan.indexed):
+        raise ValueError(
+            f"Sync would delete {len(plan.removed)} of the {len(plan.indexed)} "
+            f"jobs indexed in '{plan.spec.name}', more than "
+            f"{max_removed_fraction:.0%}; check that the source is complete"
+        )
+
+
+async def ingest_collection(
+    genai_client,
+    plan: CollectionPlan,
+    checkpoint: IngestionCheckpoint,
+    rate_limiter: AdaptiveRateLimiter,
+    embedding_slots: asyncio.Semaphore,
+    concurrency: int = 4,
+    batch_size: int = 64,
+    upsert_batch_size: int = 500,
+    cache: Optional[EmbeddingCache] = None,
+) -> Dict[str, int]:
+    """
+    Embed and upsert the pending jobs of a collection and delete removed ones.
+
+    Args:
+        genai_client: Gemini client
+        plan: Records to embed and delete from `plan_collection`
+        checkpoint: Progress of the current run
+        rate_limiter: Limiter shared by every embedding worker
+        embedding_slots: Semaphore bounding concurrent embedding requests
+        concurrency: Number of embedding workers
+        batch_size: Number of texts per embedding request
+        upsert_batch_size: Number of records per upsert
+        cache: Optional persistent embedding cache
+
+    Returns:
+        dict: Number of records upserted, deleted and skipped without text
+    """
+    upserted = await _upsert_pending(
+        plan.collection,
+        genai_client,
+        plan.pending,
+        plan.spec,
+        checkpoint,
+        rate_limiter,
+        embedding_slots,
+        concurrency,
+        batch_size,
+        upsert_batch_size,
+        cache,
+    )
+
+    removed = plan.removed
+    if removed:
+        logger.info(
+            "Deleting %d of %d indexed jobs from '%s'",
+            len(removed),
+            len(plan.indexed),
+            plan.spec.name,
+        )
+    for start in range(0, len(removed), upsert_batch_size):
+        await plan.collection.delete(ids=removed[start : start + upsert_batch_size])
+    if removed:
+        logger.info("Deleted %d removed jobs from '%s'", len(removed), plan.spec.name)
+
+    return {"upserted": upserted, "deleted": len(removed), "skipped": plan.skipped}
+
+
+async def _upsert_pending(
+    collection,
+    genai_client,
+    pending: List[Tuple[str, str, str]],
+    spec: CollectionSpec,
+    checkpoint: IngestionCheckpoint,
+    rate_limiter: AdaptiveRateLimiter,
+    embedding_slots: asyncio.Semaphore,
+    concurrency: int,
+    batch_size: int,
+    upsert_batch_size: int,
+    cache: Optional[EmbeddingCache],
+) -> int:
+    """Embed (id, text, content hash) records and upsert them in pipelined batches."""
+    if not pending:
+        return 0
+
+    # Jobs sharing a text, such as common job titles, are embedded once
+    records_by_text: Dict[str, List[Tuple[str, str, str]]] = {}
+    for record in pending:
+        records_by_text.setdefault(record[1], []).append(record)
+    texts = list(records_by_text)
+    logger.info(
+        "Embedding %d distinct texts for %d jobs in '%s'",
+        len(texts),
+        len(pending),
+        spec.name,
+    )
+
+    batches = iter(
+        [
+            texts[start : start + batch_size]
+            for start in range(0, len(texts), batch_size)
+        ]
+    )
+    # Bounded so embedding cannot run arbitrarily far ahead of upserts
+    embedded: asyncio.Queue = asyncio.Queue(maxsize=4)
+    upserted = 0
+
+    async def embed_worker():
+        for batch in batches:
+            async with embedding_slots:
+                embeddings = await embed_with_retry(
+                    genai_client, batch, spec.title, rate_limiter, cache=cache
+                )
+            await embedded.put(
+                [
+                    (record, embedding)
+                    for text, embedding in zip(batch, embeddings)
+                    for record in records_by_text[text]
+                ]
+            )
+
+    async def flush(buffer):
+        nonlocal upserted
+        await collection.upsert(
+            ids=[record_id for (record_id, _, _), _ in buffer],
+            embeddings=[embedding for _, embedding in buffer],
+            documents=[text for (_, text, _), _ in buffer],
+            metadatas=[{"content_hash": text_hash} for (_, _, text_hash), _ in buffer],
+        )
+        checkpoint.record(
+            spec.name,
+            [(record_id, text_hash) for (record_id, _, text_hash), _ in buffer],
+        )
+        upserted += len(buffer)
+        logger.info(
+            "Upserted %d of %d jobs into '%s'", upserted, len(pending), spec.name
+        )
+
+    async def upsert_worker():
+        buffer = []
+        while (records := await embedded.get()) is not None:
+            buffer.extend(records)
+            if len(buffer) >= upsert_batch_size:
+                await flush(buffer)
+                buffer = []
+        if buffer:
+            await flush(buffer)
+
+    async with asyncio.TaskGroup() as task_group:
+        task_group.create_task(upsert_worker())
+        async with asyncio.TaskGroup() as embed_group:
+            for _ in range(concurrency):
+                embed_group.create_task(embed_worker())
+        await embedded.put(None)
+
+    return upserted
+
+
+async def ingest_jobs(
+    chroma_client,
+    genai_client,
+    jobs: Sequence[Dict[str, Any]],
+    checkpoint: IngestionCheckpoint,
+    rate_limiter: Optional[AdaptiveRateLimiter] = None,
+    concurrency: int = 4,
+    batch_size: int = 64,
+    upsert_batch_size: int = 500,
+    collections: Sequence[CollectionSpec] = JOB_COLLECTIONS,
+    sync: bool = False,
+    cache: Optional[EmbeddingCache] = None,
+    max_removed_fraction: float = MAX_REMOVED_FRACTION,
+    force: bool = False,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Ingest job postings into every job collection.
+
+    Collections are filled side by side and share the rate limiter and the
+    bound on concurrent embedding requests. Nothing is written unless the
+    source shares job ids with every non-empty collection and a sync deletes
+    at most `max_removed_fraction` of each, or the run is forced. The corpus
+    version
+    is bumped once every collection is written, unless a sync found nothing to
+    change.
+
+    Args:
+        chroma_client: Async ChromaDB client
+        genai_client: Gemini client
+        jobs: Normalized job records
+        checkpoint: Progress of the current run
+        rate_limiter: Limiter for embedding requests
+        concurrency: Maximum number of embedding requests in flight
+        batch_size: Number of texts per embedding request
+        upsert_batch_size: Number of records per upsert
+        collections: Collections to fill
+        sync: Only embed new or changed jobs and delete removed ones
+        cache: Optional persistent embedding cache consulted before the model
+        max_removed_fraction: Largest share of a collection a sync deletes
+        force: Write the collections even if the checks fail
+
+    Returns:
+        dict: Number of records upserted, deleted and skipped per collection
+
+    Raises:
+        ValueError: If the source shares no job id with a non-empty collection,
+            or a sync would delete too many jobs, unless forced
+    """
+    rate_limiter = rate_limiter or AdaptiveRateLimiter()
+    embedding_slots = asyncio.Semaphore(concurrency)
+    # Every collection is diffed and checked before any of them is written
+    plans = await asyncio.gather(
+        *(
+            plan_collection(chroma_client, jobs, spec, checkpoint, sync=sync)
+            for spec in collections
+        )
+    )
+    if not force:
+        for plan in plans:
+            check_plan(plan, max_removed_fraction)
+
+    counts = await asyncio.gather(
+        *(
+            ingest_collection(
+                genai_client,
+                plan,
+                checkpoint,
+                rate_limiter,
+                embedding_slots,
+                concurrency=concurrency,
+                batch_size=batch_size,
+                upsert_batch_size=upsert_batch_size,
+                cache=cache,
+            )
+            for plan in plans
+        )
+    )
+
+    if not sync or any(count["upserted"] or count["deleted"] for count in counts):
+        await bump_corpus_version(chroma_client)
+    return {spec.name: count for spec, count in zip(collections, counts)}
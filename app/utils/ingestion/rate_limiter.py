@@ -0,0 +1,79 @@
+"""
+Adaptive rate limiting for embedding API calls.
+
+This module paces embedding requests by the number of texts sent per minute and
+adapts that budget to the quota actually granted: it grows additively while
+calls succeed and is cut multiplicatively when the API reports exhaustion.
+"""
+
+from typing import Optional
+import asyncio
+import logging
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Return True if an API error reports an exhausted quota."""
+    if getattr(error, "code", None) == 429:
+        return True
+    message = str(error)
+    return "RESOURCE_EXHAUSTED" in message or "429" in message
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD rate limiter measured in texts per minute.
+
+    Callers `acquire` a slot for each request and report the outcome. Slots are
+    handed out in order, spaced by the request cost at the current rate, so
+    bursts from concurrent workers are smoothed instead of rejected.
+    """
+
+    def __init__(
+        self,
+        texts_per_minute: float = 600.0,
+        min_texts_per_minute: float = 10.0,
+        max_texts_per_minute: float = 20000.0,
+        increase: float = 10.0,
+        decrease: float = 0.5,
+    ) -> None:
+        self.rate = texts_per_minute
+        self.min_rate = min_texts_per_minute
+        self.max_rate = max_texts_per_minute
+        self.increase = increase
+        self.decrease = decrease
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, cost: int = 1) -> None:
+        """Wait until a request of `cost` texts may be sent."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + cost * 60.0 / self.rate
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def on_success(self) -> None:
+        """Raise the rate after a successful request."""
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """
+        Cut the rate and pause new requests after a quota error.
+
+        Args:
+            retry_after: Seconds to pause, defaults to one slot at the new rate
+        """
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        pause = retry_after if retry_after is not None else 60.0 / self.rate
+        now = asyncio.get_running_loop().time()
+        self._next_slot = max(self._next_slot, now + pause)
+        logger.warning(
+            "Embedding quota exhausted, slowing down to %.0f texts/minute",
+            self.rate,
+        )
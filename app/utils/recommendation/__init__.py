@@ -3,3 +3,19 @@ Recommendation utilities module for ML Services.
 """
 
 from app.utils.recommendation.recommendation_utils import *
+from app.utils.recommendation.quantization import *
+from app.utils.recommendation.vector_index import *
+from app.utils.recommendation.recommendation_cache import *
+from app.utils.recommendation.embedding_service import *
+from app.utils.recommendation.feed_store import *
+from app.utils.recommendation.job_sources import *
+from app.utils.recommendation.job_filters import *
+from app.utils.recommendation.embedding_cache import *
+from app.utils.recommendation.corpus_snapshot import *
+from app.utils.recommendation.similar_jobs import *
+from app.utils.recommendation.candidate_index import *
+from app.utils.recommendation.query_embedding_cache import *
+from app.utils.recommendation.lexical_index import *
+from app.utils.recommendation.autocomplete import *
+from app.utils.recommendation.cv_chunks import *
+from app.utils.recommendation.embedding_transport import *
@@ -0,0 +1,181 @@
+"""
+Prefix autocomplete over job titles and job categories.
+
+This module keeps every normalized job title and category, keyed by each of its
+word suffixes, in one sorted array, so the suggestions for a prefix are found
+by binary search without calling the embedding model or ChromaDB. Suggestions
+are ranked by the number of job postings they appear in.
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+import json
+import logging
+import unicodedata
+
+import numpy as np
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Largest number of suggestions returned for one prefix
+MAX_SUGGESTIONS = 20
+
+# Prefixes up to this length match too many keys to rank per request, so their
+# suggestions are ranked once when the index is built
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+# Sorts after every character, so `prefix + PREFIX_END` bounds the prefix range
+PREFIX_END = "\U0010ffff"
+
+
+def normalize_suggestion(text: str) -> str:
+    """Normalize a title, category or typed prefix for matching."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def load_job_categories(path: str) -> List[str]:
+    """
+    Read the category names of `unique_job_categories.json`.
+
+    Args:
+        path: Path to the JSON list of `category_name` records
+
+    Returns:
+        list: Category names
+    """
+    with open(path, encoding="utf-8") as f:
+        return [record["category_name"] for record in json.load(f)]
+
+
+class AutocompleteIndex:
+    """
+    Sorted array of suggestion keys for prefix lookups.
+
+    Suggestions are numbered by descending posting count, then alphabetically,
+    so ranking the suggestions matching a prefix is sorting their numbers.
+    Every suggestion is keyed by each suffix starting at a word, so "dev" also
+    completes "Software Developer".
+    """
+
+    def __init__(
+        self,
+        texts: Sequence[str],
+        kinds: Sequence[str],
+        counts: Sequence[int],
+        keys: List[str],
+        key_suggestions: np.ndarray,
+    ) -> None:
+        self.texts = list(texts)
+        self.kinds = list(kinds)
+        self.counts = list(counts)
+        self.keys = keys
+        self.key_suggestions = key_suggestions
+        self._ranked_by_prefix: Dict[str, np.ndarray] = {}
+
+        prefixes = {
+            key[:length]
+            for key in keys
+            for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1)
+        }
+        for prefix in prefixes:
+            self._ranked_by_prefix[prefix] = self._rank(prefix, MAX_SUGGESTIONS)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def build(cls, jobs: Iterable[Dict[str, Any]], categories: Iterable[str] = ()):
+        """
+        Index the titles and categories of normalized job records.
+
+        Args:
+            jobs: Normalized job records from `load_jobs`
+            categories: Category names suggested even without postings
+
+        Returns:
+            AutocompleteIndex: Index over every distinct title and category
+        """
+        # Normalized text -> posting count and the spellings seen for it
+        suggestions: Dict[Tuple[str, str], Tuple[int, Dict[str, int]]] = {}
+
+        def add(kind: str, text: str, count: int = 1) -> None:
+            text = " ".join(str(text).split())
+            normalized = normalize_suggestion(text)
+            if not normalized:
+                return
+            total, spellings = suggestions.get((kind, normalized), (0, {}))
+            spellings[text] = spellings.get(text, 0) + count
+            suggestions[(kind, normalized)] = (total + count, spellings)
+
+        for category in categories:
+            add("category", category, count=0)
+        for job in jobs:
+            if job.get("job_position"):
+                add("title", job["job_position"])
+            for category in job.get("categories") or []:
+                add("category", category)
+
+        ranked = sorted(
+            suggestions.items(), key=lambda item: (-item[1][0], item[0][1], item[0][0])
+        )
+        texts = []
+        kinds = []
+        counts = []
+        key_entries = []
+        for number, ((kind, normalized), (count, spellings)) in enumerate(ranked):
+            # Suggest the spelling used by most postings
+            texts.append(max(spellings, key=spellings.get))
+            kinds.append(kind)
+            counts.append(count)
+            words = normalized.split(" ")
+            for start in range(len(words)):
+                key_entries.append((" ".join(words[start:]), number))
+        key_entries.sort()
+
+        index = cls(
+            texts,
+            kinds,
+            counts,
+            [key for key, _ in key_entries],
+            np.asarray([number for _, number in key_entries], dtype=np.int32),
+        )
+        logger.info(
+            "Built autocomplete index of %d suggestions with %d keys",
+            len(index),
+            len(index.keys),
+        )
+        return index
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, str, int]]:
+        """
+        Suggest titles and categories for a typed prefix.
+
+        Args:
+            prefix: Text typed so far
+            limit: Maximum number of suggestions, at most MAX_SUGGESTIONS
+
+        Returns:
+            list: Text, kind ("title" or "category") and posting count of each
+            suggestion, most frequent first
+        """
+        prefix = normalize_suggestion(prefix)
+        if not prefix:
+            return []
+
+        numbers = self._ranked_by_prefix.get(prefix)
+        if numbers is None:
+            if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+                return []
+            numbers = self._rank(prefix, limit)
+        return [
+            (self.texts[number], self.kinds[number], self.counts[number])
+            for number in numbers[:limit].tolist()
+        ]
+
+    def _rank(self, prefix: str, limit: int) -> np.ndarray:
+        """Number the best suggestions with a key starting with `prefix`."""
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + PREFIX_END, lo=start)
+        # A suggestion matches once per word starting with the prefix
+        return np.unique(self.key_suggestions[start:end])[:limit]
@@ -0,0 +1,283 @@
+"""
+In-memory index of candidate CV embeddings for job-to-candidate matching.
+
+This module keeps every whole-CV embedding of `user_cv_embeddings` in a growable
+float32 matrix that is updated in place when a CV is posted, and pruned of CVs
+deleted from ChromaDB, so the best candidates for a job are found with one
+matrix-vector product instead of a ChromaDB query over the whole collection.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+import threading
+import time
+
+import numpy as np
+
+from app.utils.recommendation.cv_chunks import is_cv_chunk_id
+from app.utils.recommendation.vector_index import SUPPORTED_SPACES, collection_space
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Rows allocated before the first resize
+INITIAL_CAPACITY = 1024
+
+
+class CandidateIndex:
+    """
+    Mutable matrix of CV embeddings keyed by user ID.
+
+    Rows are updated in place and appended into spare capacity, and a removed
+    row is filled with the last row. When the matrix is full it is copied into
+    one twice the size. Searches score under the same lock as updates, so they
+    never see a half-written row. Distances follow the ChromaDB `space` of the
+    collection, like `EmbeddingIndex`.
+    """
+
+    def __init__(self, space: str = "l2", capacity: int = INITIAL_CAPACITY) -> None:
+        if space not in SUPPORTED_SPACES:
+            raise ValueError(f"Unsupported distance space: {space}")
+
+        self.space = space
+        self.user_ids: List[str] = []
+        # Newest `updated_at` of the CVs pulled from ChromaDB
+        self.synced_at = 0.0
+        self._capacity = capacity
+        self._rows: Dict[str, int] = {}
+        self._embeddings: Optional[np.ndarray] = None
+        self._squared_norms: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._rows
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the embedding matrix, including spare capacity."""
+        if self._embeddings is None:
+            return 0
+        return self._embeddings.nbytes + self._squared_norms.nbytes
+
+    def upsert(self, user_ids: Sequence[str], embeddings) -> None:
+        """
+        Insert or replace the CV embeddings of users.
+
+        Args:
+            user_ids: User ID of every embedding
+            embeddings: (users, dim) matrix of CV embeddings
+        """
+        matrix = np.array(embeddings, dtype=np.float32, ndmin=2)
+        if len(user_ids) == 0:
+            return
+        if self.space == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix /= norms
+        squared_norms = np.einsum("ij,ij->i", matrix, matrix)
+
+        with self._lock:
+            if self._embeddings is None:
+                self._allocate(max(self._capacity, len(user_ids)), matrix.shape[1])
+            elif matrix.shape[1] != self._embeddings.shape[1]:
+                raise ValueError(
+                    f"Expected embeddings of dimension {self._embeddings.shape[1]}, "
+                    f"got {matrix.shape[1]}"
+                )
+
+            for user_id, embedding, squared_norm in zip(
+                user_ids, matrix, squared_norms
+            ):
+                row = self._rows.get(user_id)
+                if row is None:
+                    row = len(self.user_ids)
+                    if row == len(self._embeddings):
+                        self._allocate(2 * row, matrix.shape[1])
+                    self.user_ids.append(user_id)
+                    self._rows[user_id] = row
+                self._embeddings[row] = embedding
+                self._squared_norms[row] = squared_norm
+
+    def remove(self, user_ids: Sequence[str]) -> int:
+        """
+        Remove the CV embeddings of users.
+
+        Args:
+            user_ids: User IDs to remove, unknown IDs are ignored
+
+        Returns:
+            int: Number of CVs removed
+        """
+        removed = 0
+        with self._lock:
+            for user_id in user_ids:
+                row = self._rows.pop(user_id, None)
+                if row is None:
+                    continue
+                last = len(self.user_ids) - 1
+                if row != last:
+                    moved_user_id = self.user_ids[last]
+                    self.user_ids[row] = moved_user_id
+                    self._rows[moved_user_id] = row
+                    self._embeddings[row] = self._embeddings[last]
+                    self._squared_norms[row] = self._squared_norms[last]
+                self.user_ids.pop()
+                removed += 1
+        return removed
+
+    def top_k(self, query, k: int) -> Tuple[List[str], np.ndarray, float]:
+        """
+        Find the `k` candidates closest to a query embedding.
+
+        Args:
+            query: Job embedding
+            k: Number of candidates to return
+
+        Returns:
+            tuple: User ids and distances sorted by ascending distance, and the
+            largest distance over every candidate
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if self.space == "cosine":
+            query_norm = np.linalg.norm(query)
+            query = query / (query_norm if query_norm > 0 else 1.0)
+
+        # Rows are overwritten in place, so they are read under the lock
+        with self._lock:
+            count = len(self.user_ids)
+            if count == 0:
+                return [], np.empty(0, dtype=np.float32), 0.0
+
+            dots = self._embeddings[:count] @ query
+            if self.space == "l2":
+                distances = self._squared_norms[:count] + query @ query - 2.0 * dots
+                np.maximum(distances, 0.0, out=distances)
+            else:
+                distances = 1.0 - dots
+
+            k = min(k, count)
+            if k < count:
+                rows = np.argpartition(distances, k - 1)[:k]
+            else:
+                rows = np.arange(count)
+            # Ties are broken by row so rankings are stable across calls
+            rows = rows[np.lexsort((rows, distances[rows]))]
+            user_ids = [self.user_ids[row] for row in rows]
+        return user_ids, distances[rows], float(distances.max())
+
+    def _allocate(self, capacity: int, dimension: int) -> None:
+        """Move the rows into new arrays of `capacity` rows."""
+        embeddings = np.zeros((capacity, dimension), dtype=np.float32)
+        squared_norms = np.zeros(capacity, dtype=np.float32)
+        if self._embeddings is not None:
+            count = len(self.user_ids)
+            embeddings[:count] = self._embeddings[:count]
+            squared_norms[:count] = self._squared_norms[:count]
+        self._embeddings = embeddings
+        self._squared_norms = squared_norms
+
+    async def sync(self, collection, since: float = 0.0, page_size: int = 1000) -> int:
+        """
+        Pull CVs updated in ChromaDB after `since` into the index.
+
+        Args:
+            collection: Async ChromaDB collection of CV embeddings
+            since: Only CVs whose `updated_at` metadata is newer are fetched,
+                0 for every CV
+            page_size: Number of records fetched per request
+
+        Returns:
+            int: Number of CVs upserted
+        """
+        where = {"updated_at": {"$gt": since}} if since > 0 else None
+        upserted = 0
+        offset = 0
+        while True:
+            page = await collection.get(
+                include=["embeddings", "metadatas"],
+                where=where,
+                limit=page_size,
+                offset=offset,
+            )
+            if not page["ids"]:
+                break
+            # Section chunks are matched through the whole-CV embedding
+            whole_cvs = [
+                row
+                for row, record_id in enumerate(page["ids"])
+                if not is_cv_chunk_id(record_id)
+            ]
+            self.upsert(
+                [page["ids"][row] for row in whole_cvs],
+                np.asarray(page["embeddings"], dtype=np.float32)[whole_cvs],
+            )
+            for metadata in page["metadatas"]:
+                self.synced_at = max(
+                    self.synced_at, (metadata or {}).get("updated_at", 0.0)
+                )
+            upserted += len(whole_cvs)
+            offset += len(page["ids"])
+
+        return upserted
+
+    async def prune(self, collection, page_size: int = 1000) -> int:
+        """
+        Remove the CVs deleted from ChromaDB.
+
+        Only the indexed user IDs are looked up, so section chunks and the
+        embeddings themselves are never read.
+
+        Args:
+            collection: Async ChromaDB collection of CV embeddings
+            page_size: Number of IDs looked up per request
+
+        Returns:
+            int: Number of CVs removed
+        """
+        # CVs added while the IDs are looked up are not in the snapshot
+        with self._lock:
+            indexed_user_ids = list(self.user_ids)
+
+        stored_ids = set()
+        for start in range(0, len(indexed_user_ids), page_size):
+            page = await collection.get(
+                ids=indexed_user_ids[start : start + page_size], include=[]
+            )
+            stored_ids.update(page["ids"])
+        removed = self.remove(
+            [user_id for user_id in indexed_user_ids if user_id not in stored_ids]
+        )
+        if removed:
+            logger.info("Removed %d deleted CVs from the candidate index", removed)
+        return removed
+
+    @classmethod
+    async def from_collection(cls, collection, page_size: int = 1000):
+        """
+        Build an index from every CV embedding stored in a ChromaDB collection.
+
+        Args:
+            collection: Async ChromaDB collection of CV embeddings
+            page_size: Number of records fetched per request
+
+        Returns:
+            CandidateIndex: Index holding the collection embeddings
+        """
+        start_time = time.time()
+        space = collection_space(collection.metadata)
+        index = cls(
+            space=space, capacity=max(INITIAL_CAPACITY, await collection.count())
+        )
+        await index.sync(collection, page_size=page_size)
+        # CVs stored before `updated_at` was recorded are covered by the load
+        index.synced_at = max(index.synced_at, start_time)
+        logger.info(
+            "Loaded candidate index for '%s' with %d CV embeddings (%d bytes)",
+            collection.name,
+            len(index),
+            index.nbytes,
+        )
+        return index
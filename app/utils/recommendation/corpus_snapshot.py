@@ -0,0 +1,195 @@
+"""
+Local snapshots of the job collections for fast worker start-up.
+
+This module exports the job collections from ChromaDB into a directory holding,
+per collection, the ids, the embedding matrix in its scoring layout (float32,
+float16 or int8), optionally the float32 embeddings used to rescore a quantized
+matrix, and the record metadata. API workers memory-map the snapshot
+at boot instead of paging the corpus out of ChromaDB, so start-up is near
+instant and workers on one host share a single page-cached copy.
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+
+from app.utils.recommendation.vector_index import EmbeddingIndex, collection_space
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MANIFEST_FILE = "manifest.json"
+SNAPSHOT_METADATA_FILE = "metadata.json"
+
+JOB_COLLECTION_NAMES = ("job_desc_req_documents", "job_titles_documents")
+
+
+async def export_corpus_snapshot(
+    chroma_client,
+    path: str,
+    collection_names: Sequence[str] = JOB_COLLECTION_NAMES,
+    dtype: str = "float32",
+    rescore: bool = False,
+    page_size: int = 1000,
+) -> dict:
+    """
+    Export collections from ChromaDB into a snapshot, replacing any previous one.
+
+    Args:
+        chroma_client: Async ChromaDB client
+        path: Directory of the snapshot
+        collection_names: Collections to export
+        dtype: Storage of the embedding matrices (float32, float16 or int8)
+        rescore: Also write the float32 embeddings of a quantized matrix, so
+            workers can rescore its closest candidates
+        page_size: Number of records fetched per request
+
+    Returns:
+        dict: Manifest of the written snapshot
+    """
+    staging_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(staging_path, ignore_errors=True)
+
+    manifest = {"created_at": time.time(), "corpus_version": None, "collections": {}}
+    for name in collection_names:
+        collection = await chroma_client.get_collection(name=name)
+        metadata = collection.metadata or {}
+        if name == JOB_COLLECTION_NAMES[0]:
+            manifest["corpus_version"] = metadata.get("corpus_version")
+
+        ids: List[str] = []
+        pages: List[np.ndarray] = []
+        metadatas: List[Optional[dict]] = []
+        total = await collection.count()
+        for offset in range(0, total, page_size):
+            page = await collection.get(
+                include=["embeddings", "metadatas"], limit=page_size, offset=offset
+            )
+            ids.extend(page["ids"])
+            pages.append(np.asarray(page["embeddings"], dtype=np.float32))
+            metadatas.extend(page["metadatas"])
+
+        index = EmbeddingIndex(
+            ids,
+            np.concatenate(pages) if pages else np.empty((0, 0), dtype=np.float32),
+            space=collection_space(metadata),
+            dtype=dtype,
+            rescore_candidates=int(rescore),
+            spill_dir=staging_path,
+        )
+        collection_path = os.path.join(staging_path, name)
+        index.save(collection_path)
+        with open(
+            os.path.join(collection_path, SNAPSHOT_METADATA_FILE), "w", encoding="utf-8"
+        ) as f:
+            json.dump(metadatas, f)
+
+        manifest["collections"][name] = {
+            "count": len(index),
+            "dimension": index.dimension,
+            "dtype": index.dtype,
+            "rescore": rescore and index.dtype != "float32",
+            "space": index.space,
+            "nbytes": index.nbytes,
+        }
+        logger.info(
+            "Exported %d records of '%s' as %s (%d bytes)",
+            len(index),
+            name,
+            index.dtype,
+            index.nbytes,
+        )
+
+    with open(
+        os.path.join(staging_path, SNAPSHOT_MANIFEST_FILE), "w", encoding="utf-8"
+    ) as f:
+        json.dump(manifest, f)
+
+    # Swap the finished snapshot in so readers never see a partial write
+    previous_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, previous_path)
+    os.replace(staging_path, path)
+    shutil.rmtree(previous_path, ignore_errors=True)
+
+    logger.info("Wrote corpus snapshot to %s", path)
+    return manifest
+
+
+def read_snapshot_manifest(path: str) -> dict:
+    """Read the manifest of a snapshot."""
+    with open(os.path.join(path, SNAPSHOT_MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_snapshot_index(
+    path: str,
+    collection_name: str,
+    shards: int = 1,
+    dtype: Optional[str] = None,
+    rescore_candidates: int = 0,
+) -> EmbeddingIndex:
+    """
+    Memory-map the index of one collection from a snapshot.
+
+    Args:
+        path: Directory of the snapshot
+        collection_name: Name of the exported collection
+        shards: Number of parallel scoring shards
+        dtype: Storage to score with, or None for the exported one
+        rescore_candidates: Number of closest quantized candidates rescored
+            exactly against the float32 embeddings of the snapshot
+
+    Returns:
+        EmbeddingIndex: Index backed by the snapshot files
+
+    Raises:
+        ValueError: If the snapshot was exported in another `dtype`, or
+            without the float32 embeddings needed for rescoring
+    """
+    start_time = time.time()
+    index = EmbeddingIndex.load(
+        os.path.join(path, collection_name),
+        shards=shards,
+        dtype=dtype,
+        rescore_candidates=rescore_candidates,
+    )
+    logger.info(
+        "Opened %s snapshot index for '%s' with %d embeddings in %.3f seconds",
+        index.dtype,
+        collection_name,
+        len(index),
+        time.time() - start_time,
+    )
+    return index
+
+
+def load_snapshot_metadatas(path: str, collection_name: str) -> List[Optional[dict]]:
+    """Read the record metadata of one collection, aligned to its index rows."""
+    with open(
+        os.path.join(path, collection_name, SNAPSHOT_METADATA_FILE), encoding="utf-8"
+    ) as f:
+        return json.load(f)
+
+
+def snapshot_is_current(path: str, corpus_version: Optional[Hashable]) -> bool:
+    """
+    Check that a snapshot exists and matches the current corpus version.
+
+    Args:
+        path: Directory of the snapshot
+        corpus_version: Corpus version currently stored in ChromaDB
+
+    Returns:
+        bool: True if the snapshot can be served
+    """
+    try:
+        manifest: Dict = read_snapshot_manifest(path)
+    except (OSError, ValueError):
+        return False
+    return manifest.get("corpus_version") == corpus_version
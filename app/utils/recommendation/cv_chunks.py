@@ -0,0 +1,120 @@
+"""
+Section-level chunking of CV text representations.
+
+This module splits the structured profile written by `CV_TO_TEXT_SYSTEM_PROMPT`
+into one chunk per section, and per position or project within the experience
+and project sections. Chunk embeddings are stored in `user_cv_embeddings` next
+to the whole-CV embedding, so a long CV with mixed experience is matched on its
+best matching section instead of one averaged vector.
+"""
+
+from typing import List, Tuple
+import re
+import time
+
+import numpy as np
+
+# Separates the user ID from the chunk number in chunk record ids
+CV_CHUNK_ID_SEPARATOR = "#chunk-"
+
+# Largest number of chunks stored per CV, extra entries join the last chunk
+MAX_CV_CHUNKS = 8
+
+# Section headers such as "[TECHNICAL COMPETENCIES]:"
+SECTION_HEADER_PATTERN = re.compile(r"^\[([^\]\n]+)\]:[ \t]*", re.MULTILINE)
+
+# Lines starting one position or project within a section
+ENTRY_PATTERN = re.compile(r"^[ \t]*-[ \t]*(?:Role|Project):", re.MULTILINE)
+
+
+def split_cv_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    Split a CV text representation into section chunks.
+
+    Args:
+        text: Structured profile from `generate_text_representation_from_cv`
+
+    Returns:
+        list: Section header and chunk text of every non-empty chunk, at most
+        MAX_CV_CHUNKS
+    """
+    headers = list(SECTION_HEADER_PATTERN.finditer(text))
+    chunks = []
+    for header, next_header in zip(headers, headers[1:] + [None]):
+        body = text[header.end() : next_header.start() if next_header else len(text)]
+        entry_starts = [entry.start() for entry in ENTRY_PATTERN.finditer(body)]
+        if len(entry_starts) > 1:
+            # Text before the first entry stays with it
+            entry_starts[0] = 0
+            entries = [
+                body[start:stop]
+                for start, stop in zip(entry_starts, entry_starts[1:] + [len(body)])
+            ]
+        else:
+            entries = [body]
+
+        for entry in entries:
+            entry = entry.strip()
+            if entry:
+                chunks.append((header.group(1), f"{header.group(1)}:\n{entry}"))
+
+    if len(chunks) > MAX_CV_CHUNKS:
+        overflow = "\n\n".join(chunk for _, chunk in chunks[MAX_CV_CHUNKS - 1 :])
+        chunks = chunks[: MAX_CV_CHUNKS - 1] + [
+            (chunks[MAX_CV_CHUNKS - 1][0], overflow)
+        ]
+    return chunks
+
+
+def cv_chunk_ids(user_id: str, count: int = MAX_CV_CHUNKS) -> List[str]:
+    """Return the record ids of the first `count` chunks of a user's CV."""
+    return [f"{user_id}{CV_CHUNK_ID_SEPARATOR}{chunk}" for chunk in range(count)]
+
+
+def build_cv_records(
+    user_id: str, text: str, chunks: List[Tuple[str, str]], cv_hash: str
+) -> Tuple[List[str], List[str], List[dict]]:
+    """
+    Build the records stored in `user_cv_embeddings` for a CV.
+
+    Args:
+        user_id: User ID
+        text: Text representation of the whole CV
+        chunks: Section chunks from `split_cv_sections`
+        cv_hash: Content hash of the CV document
+
+    Returns:
+        tuple: Record ids, documents and metadatas, the whole CV first and then
+        its chunks, in the order their documents are embedded
+    """
+    return (
+        [user_id] + cv_chunk_ids(user_id, len(chunks)),
+        [text] + [chunk_text for _, chunk_text in chunks],
+        [{"cv_hash": cv_hash, "updated_at": time.time(), "chunks": len(chunks)}]
+        + [{"user_id": user_id, "section": section} for section, _ in chunks],
+    )
+
+
+def is_cv_chunk_id(record_id: str) -> bool:
+    """Check whether a `user_cv_embeddings` record holds a CV chunk."""
+    return CV_CHUNK_ID_SEPARATOR in record_id
+
+
+def aggregate_chunk_distances(distances, aggregation: str = "max") -> np.ndarray:
+    """
+    Combine (chunks, jobs) distances into one distance per job.
+
+    Args:
+        distances: Distances from every CV chunk to every job
+        aggregation: "max" to keep the best matching chunk of each job, or
+            "mean" to average every chunk
+
+    Returns:
+        np.ndarray: Distance of each job to the CV
+    """
+    distances = np.asarray(distances, dtype=np.float32)
+    if aggregation == "max":
+        return distances.min(axis=0)
+    if aggregation == "mean":
+        return distances.mean(axis=0)
+    raise ValueError(f"Unsupported chunk aggregation: {aggregation}")
@@ -0,0 +1,120 @@
+"""
+Persistent content-addressed embedding cache.
+
+This module stores embeddings in SQLite keyed by a hash of the model, task
+type, title and text they were computed from, so that identical strings are
+only ever sent to the embedding model once across ingestion runs and API
+workers.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Keys looked up per query, below SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+def embedding_cache_key(
+    model: str, task_type: str, title: Optional[str], text: str
+) -> str:
+    """
+    Build the cache key of an embedding.
+
+    Args:
+        model: Embedding model name
+        task_type: Embedding task type
+        title: Document title passed to the model, if any
+        text: Embedded text
+
+    Returns:
+        str: Hex SHA-256 digest identifying the embedding
+    """
+    payload = "\0".join((model, task_type, title or "", text))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache shared by threads and processes.
+
+    Embeddings are stored as float32 blobs. The database runs in WAL mode so an
+    ingestion run and API workers can read and write the same file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+        self._connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()[0]
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Look up embeddings by key.
+
+        Args:
+            keys: Cache keys from `embedding_cache_key`
+
+        Returns:
+            dict: Cached embedding of every key that was found
+        """
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique_keys), LOOKUP_CHUNK_SIZE):
+                chunk = unique_keys[start : start + LOOKUP_CHUNK_SIZE]
+                rows = self._connection.execute(
+                    "SELECT key, embedding FROM embeddings WHERE key IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+        self.hits += len(found)
+        self.misses += len(unique_keys) - len(found)
+        return found
+
+    def set_many(self, items: Iterable[Tuple[str, Sequence[float]]]) -> None:
+        """
+        Store embeddings by key.
+
+        Args:
+            items: (key, embedding) pairs
+        """
+        rows = [
+            (key, np.asarray(embedding, dtype=np.float32).tobytes())
+            for key, embedding in items
+        ]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                rows,
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,135 @@
+"""
+Asynchronous embedding service with request micro-batching.
+
+This module coalesces concurrent single-text embedding requests that arrive
+within a short window into one batched `embed_content` call on the client's
+async surface, so embedding never blocks the event loop.
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+from app.utils.recommendation.embedding_cache import EmbeddingCache
+from app.utils.recommendation.recommendation_utils import create_embeddings
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+BatchKey = Tuple[str, Optional[str]]
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batcher for embedding requests.
+
+    Requests sharing a task type and title are queued and flushed together once
+    `max_batch_size` requests are waiting or `max_delay` seconds have passed
+    since the first one arrived. With a `cache`, texts embedded before are
+    answered from it instead of the model.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_batch_size: int = 64,
+        max_delay: float = 0.005,
+        cache: Optional[EmbeddingCache] = None,
+    ) -> None:
+        self._client = client
+        self._cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: Dict[BatchKey, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def embed(
+        self,
+        content: str,
+        task_type: str = "RETRIEVAL_QUERY",
+        title: Optional[str] = None,
+    ) -> List[float]:
+        """
+        Embed a single text, sharing the model call with concurrent requests.
+
+        Args:
+            content: Text to embed
+            task_type: Embedding task type
+            title: Optional document title for RETRIEVAL_DOCUMENT embeddings
+
+        Returns:
+            list: Embedding values
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (task_type, title)
+
+        batch = self._pending.setdefault(key, [])
+        batch.append((content, future))
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.max_delay, self._flush, key)
+
+        return await future
+
+    async def embed_many(
+        self,
+        contents: List[str],
+        task_type: str = "RETRIEVAL_QUERY",
+        title: Optional[str] = None,
+    ) -> List[List[float]]:
+        """Embed many texts in as few model calls as the batch size allows."""
+        batches = [
+            contents[start : start + self.max_batch_size]
+            for start in range(0, len(contents), self.max_batch_size)
+        ]
+        results = await asyncio.gather(
+            *(
+                create_embeddings(
+                    self._client, batch, task_type, title, cache=self._cache
+                )
+                for batch in batches
+            )
+        )
+        return [embedding for batch in results for embedding in batch]
+
+    def _flush(self, key: BatchKey) -> None:
+        """Send every queued request for a key as one batched call."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run_batch(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(
+        self, key: BatchKey, batch: List[Tuple[str, asyncio.Future]]
+    ) -> None:
+        """Embed a flushed batch and resolve the waiting futures."""
+        task_type, title = key
+        logger.info("Flushing embedding batch of %d texts", len(batch))
+        try:
+            embeddings = await create_embeddings(
+                self._client,
+                [content for content, _ in batch],
+                task_type,
+                title,
+                cache=self._cache,
+            )
+        except Exception as e:
+            logger.error("Batched embedding request failed: %s", str(e))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
@@ -0,0 +1,80 @@
+"""
+Compact transport encodings for stored embeddings.
+
+This module encodes embedding vectors as raw little-endian float32 bytes, or as
+base64 of those bytes inside JSON, and negotiates the encoding from the Accept
+header. Bulk consumers skip formatting and parsing hundreds of JSON floats per
+vector, and a 768-dimension vector shrinks from about 15 KB of JSON to 3 KB.
+"""
+
+from typing import Optional
+import base64
+
+import numpy as np
+
+JSON_MEDIA_TYPE = "application/json"
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+# Wire layout of every encoded vector
+EMBEDDING_WIRE_DTYPE = np.dtype("<f4")
+
+# Media ranges a JSON response satisfies
+JSON_MEDIA_RANGES = (JSON_MEDIA_TYPE, "application/*", "*/*")
+
+
+def negotiate_embedding_media_type(accept: Optional[str]) -> str:
+    """
+    Choose between JSON and raw float32 bytes from an Accept header.
+
+    Args:
+        accept: Accept header of the request, None when absent
+
+    Returns:
+        str: BINARY_MEDIA_TYPE when raw bytes are preferred, JSON_MEDIA_TYPE
+        otherwise
+    """
+    media_type = JSON_MEDIA_TYPE
+    best_quality = 0.0
+    for media_range in (accept or "").split(","):
+        name, *parameters = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        # Earlier ranges win ties, as listed by the client
+        if quality > best_quality and name.lower() == BINARY_MEDIA_TYPE:
+            media_type, best_quality = BINARY_MEDIA_TYPE, quality
+        elif quality > best_quality and name.lower() in JSON_MEDIA_RANGES:
+            media_type, best_quality = JSON_MEDIA_TYPE, quality
+    return media_type
+
+
+def encode_embeddings_binary(embeddings) -> bytes:
+    """Encode a vector or a row-major matrix as little-endian float32 bytes."""
+    return np.ascontiguousarray(embeddings, dtype=EMBEDDING_WIRE_DTYPE).tobytes()
+
+
+def encode_embeddings_base64(embeddings) -> str:
+    """Encode a vector or a row-major matrix as base64 of float32 bytes."""
+    return base64.b64encode(encode_embeddings_binary(embeddings)).decode("ascii")
+
+
+def decode_embeddings(payload, dimension: int) -> np.ndarray:
+    """
+    Decode bytes or base64 text from the encoders into a (vectors, dim) matrix.
+
+    Args:
+        payload: Raw bytes, or base64 text
+        dimension: Number of values per vector
+
+    Returns:
+        np.ndarray: float32 matrix with one row per vector
+    """
+    if isinstance(payload, str):
+        payload = base64.b64decode(payload)
+    return np.frombuffer(payload, dtype=EMBEDDING_WIRE_DTYPE).reshape(-1, dimension)
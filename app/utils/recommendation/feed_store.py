@@ -0,0 +1,184 @@
+"""
+On-disk store of precomputed recommendation feeds.
+
+This module writes and reads the top-N jobs materialized offline for every
+user, stored as job row indices and float16 match scores, so that the API can
+serve a feed with a key lookup instead of scoring the job corpus. Each feed
+records the content hash of the CV it was ranked for, so a feed is not served
+once the CV changes, whichever worker or instance handled the update.
+"""
+
+from typing import Hashable, List, Optional, Sequence
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+
+from app.utils.recommendation.recommendation_cache import RankedJobs
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+USER_IDS_FILE = "user_ids.json"
+JOB_IDS_FILE = "job_ids.json"
+CV_HASHES_FILE = "cv_hashes.json"
+JOB_ROWS_FILE = "job_rows.npy"
+SCORES_FILE = "scores.npy"
+
+
+def write_feed_store(
+    path: str,
+    user_ids: Sequence[str],
+    job_ids: Sequence[str],
+    job_rows: np.ndarray,
+    scores: np.ndarray,
+    corpus_version: Optional[Hashable] = None,
+    cv_hashes: Optional[Sequence[Optional[str]]] = None,
+) -> None:
+    """
+    Write materialized feeds to a directory, replacing any previous store.
+
+    Args:
+        path: Directory of the feed store
+        user_ids: User ID of each feed row
+        job_ids: Job ids referenced by `job_rows`
+        job_rows: (users, top_n) matrix of ranked job row indices
+        scores: (users, top_n) matrix of match scores
+        corpus_version: Job corpus version the feeds were computed against
+        cv_hashes: `cv_hash` metadata of the CV each feed was ranked for
+    """
+    staging_path = f"{path}.tmp-{os.getpid()}"
+    os.makedirs(staging_path, exist_ok=True)
+
+    np.save(os.path.join(staging_path, JOB_ROWS_FILE), job_rows.astype(np.int32))
+    np.save(os.path.join(staging_path, SCORES_FILE), scores.astype(np.float16))
+    with open(os.path.join(staging_path, USER_IDS_FILE), "w", encoding="utf-8") as f:
+        json.dump(list(user_ids), f)
+    with open(os.path.join(staging_path, JOB_IDS_FILE), "w", encoding="utf-8") as f:
+        json.dump(list(job_ids), f)
+    with open(os.path.join(staging_path, CV_HASHES_FILE), "w", encoding="utf-8") as f:
+        json.dump(list(cv_hashes or [None] * len(user_ids)), f)
+    with open(os.path.join(staging_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "created_at": time.time(),
+                "users": len(user_ids),
+                "total_jobs": len(job_ids),
+                "top_n": int(job_rows.shape[1]) if job_rows.ndim == 2 else 0,
+                "corpus_version": corpus_version,
+            },
+            f,
+        )
+
+    # Swap the finished store in so readers never see a partial write
+    previous_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, previous_path)
+    os.replace(staging_path, path)
+    shutil.rmtree(previous_path, ignore_errors=True)
+
+    logger.info("Wrote %d materialized feeds to %s", len(user_ids), path)
+
+
+class FeedStore:
+    """Read-only view over a materialized feed store."""
+
+    def __init__(
+        self,
+        user_ids: List[str],
+        job_ids: np.ndarray,
+        job_rows: np.ndarray,
+        scores: np.ndarray,
+        manifest: dict,
+        cv_hashes: Optional[List[Optional[str]]] = None,
+    ) -> None:
+        self._user_rows = {user_id: row for row, user_id in enumerate(user_ids)}
+        self._job_ids = job_ids
+        self._job_rows = job_rows
+        self._scores = scores
+        self._cv_hashes = cv_hashes or [None] * len(user_ids)
+        self.manifest = manifest
+
+    def __len__(self) -> int:
+        return len(self._user_rows)
+
+    @property
+    def top_n(self) -> int:
+        """Number of jobs materialized per user."""
+        return self.manifest["top_n"]
+
+    @property
+    def total_jobs(self) -> int:
+        """Size of the job corpus the feeds were ranked against."""
+        return self.manifest["total_jobs"]
+
+    @property
+    def corpus_version(self) -> Optional[Hashable]:
+        """Job corpus version the feeds were computed against."""
+        return self.manifest.get("corpus_version")
+
+    def get(self, user_id: str, cv_hash: Optional[str] = None) -> Optional[RankedJobs]:
+        """
+        Return the materialized feed for a user, or None on a miss.
+
+        Args:
+            user_id: User ID
+            cv_hash: Current `cv_hash` metadata of the user's CV
+
+        Returns:
+            RankedJobs: The feed, or None when the user has no feed or it was
+            ranked for a different version of the CV
+        """
+        row = self._user_rows.get(user_id)
+        if row is None or self._cv_hashes[row] != cv_hash:
+            return None
+        return RankedJobs(
+            job_ids=self._job_ids[self._job_rows[row]],
+            scores=self._scores[row].astype(np.float32),
+        )
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Open a feed store written by `write_feed_store`.
+
+        The row and score matrices are memory-mapped, so opening the store is
+        cheap and workers on one host share the page cache.
+
+        Args:
+            path: Directory of the feed store
+
+        Returns:
+            FeedStore: Store ready for lookups
+        """
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(os.path.join(path, USER_IDS_FILE), encoding="utf-8") as f:
+            user_ids = json.load(f)
+        with open(os.path.join(path, JOB_IDS_FILE), encoding="utf-8") as f:
+            job_ids = np.asarray(json.load(f), dtype=object)
+        # Stores written before CV hashes were recorded match no current CV
+        cv_hashes = None
+        if os.path.exists(os.path.join(path, CV_HASHES_FILE)):
+            with open(os.path.join(path, CV_HASHES_FILE), encoding="utf-8") as f:
+                cv_hashes = json.load(f)
+
+        store = cls(
+            user_ids,
+            job_ids,
+            np.load(os.path.join(path, JOB_ROWS_FILE), mmap_mode="r"),
+            np.load(os.path.join(path, SCORES_FILE), mmap_mode="r"),
+            manifest,
+            cv_hashes,
+        )
+        logger.info(
+            "Loaded feed store from %s with %d users (top %d jobs each)",
+            path,
+            len(store),
+            store.top_n,
+        )
+        return store
@@ -0,0 +1,204 @@
+"""
+Metadata pre-filtering for job recommendations.
+
+This module indexes job metadata as one packed bitmap per categorical value and
+as sorted salary bounds and experience requirements, so that a filter resolves
+to the set of surviving index rows before any embedding is scored.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Filter name -> job record field holding its values
+CATEGORICAL_FILTERS = {
+    "working_location": "working_location",
+    "working_location_type": "working_location_type",
+    "employment_type": "employment_type",
+    "category": "categories",
+}
+
+# Below this share of index ids with a job record, the records most likely use
+# other ids than the index and the filters are not worth serving
+MIN_METADATA_COVERAGE = 0.05
+
+
+def _normalize_value(value: str) -> str:
+    """Normalize a metadata value for case-insensitive matching."""
+    return " ".join(str(value).split()).casefold()
+
+
+class JobFilterIndex:
+    """
+    Bitmap index over job metadata aligned to a fixed id order.
+
+    Values of one filter are OR-ed together and different filters are AND-ed.
+    The salary filters keep jobs whose stated salary range overlaps the
+    requested range, and the experience filter keeps jobs requiring at least
+    the requested years of experience; jobs without a stated value, or missing
+    from the job records, never survive a filter on that field.
+    """
+
+    def __init__(
+        self, job_ids: Sequence[str], records: Iterable[Dict[str, Any]]
+    ) -> None:
+        self.ids = np.asarray(job_ids, dtype=object)
+        rows_by_id = {job_id: row for row, job_id in enumerate(self.ids)}
+        total = len(self.ids)
+
+        value_rows: Dict[str, Dict[str, List[int]]] = {
+            name: {} for name in CATEGORICAL_FILTERS
+        }
+        salary_min = np.full(total, np.nan)
+        salary_max = np.full(total, np.nan)
+        experience_years = np.full(total, np.nan)
+        covered = np.zeros(total, dtype=bool)
+        for record in records:
+            row = rows_by_id.get(record["id"])
+            if row is None:
+                continue
+            covered[row] = True
+
+            for name, field in CATEGORICAL_FILTERS.items():
+                values = record.get(field)
+                if values is None:
+                    continue
+                if isinstance(values, str):
+                    values = [values]
+                for value in values:
+                    value_rows[name].setdefault(_normalize_value(value), []).append(row)
+
+            if record.get("salary_min") is not None:
+                salary_min[row] = record["salary_min"]
+                salary_max[row] = record["salary_max"]
+            if record.get("min_experience_years") is not None:
+                experience_years[row] = record["min_experience_years"]
+
+        self._bitmaps = {
+            name: {value: self._to_bitmap(rows) for value, rows in values.items()}
+            for name, values in value_rows.items()
+        }
+
+        # Unknown salaries sort last and are cut off by the finite counts
+        self._rows_by_salary_min = np.argsort(salary_min, kind="stable")
+        self._sorted_salary_min = salary_min[self._rows_by_salary_min]
+        self._rows_by_salary_max = np.argsort(salary_max, kind="stable")
+        self._sorted_salary_max = salary_max[self._rows_by_salary_max]
+        self._known_salaries = int(np.isfinite(salary_min).sum())
+        self._rows_by_experience = np.argsort(experience_years, kind="stable")
+        self._sorted_experience = experience_years[self._rows_by_experience]
+        self._known_experiences = int(np.isfinite(experience_years).sum())
+        self.covered = int(covered.sum())
+
+        logger.info(
+            "Built job filter index over %d jobs, %d of them with job metadata "
+            "(%d bytes of bitmaps)",
+            total,
+            self.covered,
+            self.nbytes,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def coverage(self) -> float:
+        """Share of the indexed ids with a job record."""
+        return self.covered / len(self.ids) if len(self.ids) else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the categorical bitmaps."""
+        return sum(
+            bitmap.nbytes
+            for bitmaps in self._bitmaps.values()
+            for bitmap in bitmaps.values()
+        )
+
+    def values(self, name: str) -> List[str]:
+        """Return the indexed values of a categorical filter."""
+        return sorted(self._bitmaps[name])
+
+    def _to_bitmap(self, rows) -> np.ndarray:
+        """Pack a set of rows into a bitmap."""
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def _empty_bitmap(self) -> np.ndarray:
+        return np.zeros((len(self.ids) + 7) // 8, dtype=np.uint8)
+
+    def _salary_bitmap(
+        self, salary_min: Optional[float], salary_max: Optional[float]
+    ) -> np.ndarray:
+        """Bitmap of jobs whose salary range overlaps the requested range."""
+        bitmap = np.packbits(np.ones(len(self.ids), dtype=bool))
+        if salary_min is not None:
+            start = np.searchsorted(
+                self._sorted_salary_max[: self._known_salaries], salary_min, "left"
+            )
+            bitmap &= self._to_bitmap(
+                self._rows_by_salary_max[start : self._known_salaries]
+            )
+        if salary_max is not None:
+            stop = np.searchsorted(
+                self._sorted_salary_min[: self._known_salaries], salary_max, "right"
+            )
+            bitmap &= self._to_bitmap(self._rows_by_salary_min[:stop])
+        return bitmap
+
+    def _experience_bitmap(self, experience_years: float) -> np.ndarray:
+        """Bitmap of jobs requiring at most `experience_years` years."""
+        stop = np.searchsorted(
+            self._sorted_experience[: self._known_experiences],
+            experience_years,
+            "right",
+        )
+        return self._to_bitmap(self._rows_by_experience[:stop])
+
+    def matching_rows(
+        self,
+        filters: Dict[str, Any],
+    ) -> Optional[np.ndarray]:
+        """
+        Resolve filters to the rows of the jobs that satisfy all of them.
+
+        Args:
+            filters: Filter name to a list of accepted values, plus optional
+                `salary_min` and `salary_max` bounds and the
+                `experience_years` of the job seeker. Empty filters are ignored.
+
+        Returns:
+            np.ndarray: Sorted surviving rows, or None when no filter is set
+        """
+        bitmap = None
+        for name in CATEGORICAL_FILTERS:
+            values = filters.get(name)
+            if not values:
+                continue
+
+            field_bitmap = self._empty_bitmap()
+            for value in values:
+                value_bitmap = self._bitmaps[name].get(_normalize_value(value))
+                if value_bitmap is not None:
+                    field_bitmap |= value_bitmap
+            bitmap = field_bitmap if bitmap is None else bitmap & field_bitmap
+
+        experience_years = filters.get("experience_years")
+        if experience_years is not None:
+            experience_bitmap = self._experience_bitmap(experience_years)
+            bitmap = experience_bitmap if bitmap is None else bitmap & experience_bitmap
+
+        salary_min = filters.get("salary_min")
+        salary_max = filters.get("salary_max")
+        if salary_min is not None or salary_max is not None:
+            salary_bitmap = self._salary_bitmap(salary_min, salary_max)
+            bitmap = salary_bitmap if bitmap is None else bitmap & salary_bitmap
+
+        if bitmap is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bitmap, count=len(self.ids)))
@@ -0,0 +1,277 @@
+"""
+Job posting sources for indexing and filtering.
+
+This module loads job postings from MongoDB, a JSON export of it or the CSV
+exports under `data/` and normalizes them into plain records shared by the ingestion
+pipeline and the recommendation filters.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import ast
+import json
+import logging
+import math
+import os
+import re
+
+import pandas as pd
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# MongoDB `jobs` document fields for each normalized record field
+MONGO_JOB_FIELDS = {
+    "job_position": "jobPosition",
+    "job_desc_list": "jobDescList",
+    "job_qualification_list": "jobQualificationsList",
+    "working_location": "workingLocation",
+    "working_location_type": "workingLocationType",
+    "employment_type": "employmentType",
+    "min_experience": "minExperience",
+    "salary": "salary",
+    "categories": "categories",
+}
+
+SALARY_NUMBER_PATTERN = re.compile(r"\d[\d.,]*")
+
+EXPERIENCE_YEARS_PATTERN = re.compile(r"(\d+(?:[.,]\d+)?)\+?\s*(?:years?|tahun)", re.I)
+
+# Experience labels asking for no prior work experience
+NO_EXPERIENCE_PATTERN = re.compile(
+    r"fresh\s*grad|college student|open for all levels|no experience", re.I
+)
+
+
+def parse_salary_range(
+    salary: Optional[str],
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Parse a salary label such as "Rp4.000.000 – 5.000.000" into a range.
+
+    Args:
+        salary: Salary label, e.g. a range, a single amount or "Negotiable"
+
+    Returns:
+        tuple: Minimum and maximum salary, or (None, None) when not stated
+    """
+    if not isinstance(salary, str):
+        return None, None
+
+    amounts = [
+        float(re.sub(r"[.,]", "", number))
+        for number in SALARY_NUMBER_PATTERN.findall(salary)
+    ]
+    if not amounts:
+        return None, None
+    return min(amounts), max(amounts)
+
+
+def parse_min_experience_years(min_experience: Optional[str]) -> Optional[float]:
+    """
+    Parse an experience label such as "Min. 5+ years of experience" into years.
+
+    Args:
+        min_experience: Experience label, e.g. a number of years, "Min.
+            Freshgrad" or "Open for all levels"
+
+    Returns:
+        float: Minimum years of experience, 0 for labels asking for none, or
+        None when the label is not understood
+    """
+    if not isinstance(min_experience, str):
+        return None
+
+    match = EXPERIENCE_YEARS_PATTERN.search(min_experience)
+    if match:
+        return float(match.group(1).replace(",", "."))
+    if NO_EXPERIENCE_PATTERN.search(min_experience):
+        return 0.0
+    return None
+
+
+def _parse_list(value: Any) -> List[str]:
+    """Parse a list stored either natively or as its Python string form."""
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    if isinstance(value, float) and math.isnan(value):
+        return []
+    if isinstance(value, str):
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return [value]
+        return [str(item) for item in parsed] if isinstance(parsed, list) else [value]
+    return []
+
+
+def _normalize_job(job_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a normalized job record from raw field values."""
+
+    def text(name):
+        value = fields.get(name)
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+        return str(value)
+
+    salary = text("salary")
+    salary_min, salary_max = parse_salary_range(salary)
+    return {
+        "id": job_id,
+        "job_position": text("job_position") or "",
+        "job_desc_list": _parse_list(fields.get("job_desc_list")),
+        "job_qualification_list": _parse_list(fields.get("job_qualification_list")),
+        "working_location": text("working_location"),
+        "working_location_type": text("working_location_type"),
+        "employment_type": text("employment_type"),
+        "min_experience": text("min_experience"),
+        "min_experience_years": parse_min_experience_years(text("min_experience")),
+        "categories": _parse_list(fields.get("categories")),
+        "salary": salary,
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+    }
+
+
+def load_jobs_from_csv(data_dir: str = "data") -> List[Dict[str, Any]]:
+    """
+    Load job records from the CSV exports in the data directory.
+
+    Job details come from `raw_data/full_temp_data.csv`, categories from
+    `raw_data/multi_label_category_gemini_pro.csv` and labelled salaries from
+    `cleaned_data/label_salary.csv`, all joined on `jobs_id`.
+
+    Args:
+        data_dir: Root of the data directory
+
+    Returns:
+        list: Normalized job records
+    """
+    jobs_df = pd.read_csv(os.path.join(data_dir, "raw_data", "full_temp_data.csv"))
+    categories_df = pd.read_csv(
+        os.path.join(data_dir, "raw_data", "multi_label_category_gemini_pro.csv")
+    ).drop_duplicates("jobs_id")
+    salary_df = pd.read_csv(
+        os.path.join(data_dir, "cleaned_data", "label_salary.csv")
+    ).drop_duplicates("jobs_id")
+
+    jobs_df = jobs_df.merge(
+        categories_df[["jobs_id", "kategori"]], on="jobs_id", how="left"
+    ).merge(
+        salary_df.rename(columns={"salary": "labelled_salary"}),
+        on="jobs_id",
+        how="left",
+    )
+    jobs_df["salary"] = jobs_df["labelled_salary"].fillna(jobs_df["salary"])
+    jobs_df = jobs_df.rename(columns={"kategori": "categories"})
+
+    jobs = [
+        _normalize_job(str(row["jobs_id"]), row)
+        for row in jobs_df.to_dict(orient="records")
+    ]
+    logger.info("Loaded %d jobs from CSV files in %s", len(jobs), data_dir)
+    return jobs
+
+
+def _mongo_document_to_job(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a MongoDB `jobs` document, native or in extended JSON."""
+    job_id = document["_id"]
+    if isinstance(job_id, dict):
+        job_id = job_id.get("$oid", job_id)
+    return _normalize_job(
+        str(job_id),
+        {name: document.get(field) for name, field in MONGO_JOB_FIELDS.items()},
+    )
+
+
+def load_jobs_from_json(path: str) -> List[Dict[str, Any]]:
+    """
+    Load job records from a JSON export of the MongoDB `jobs` collection.
+
+    Both a JSON array (`mongoexport --jsonArray`) and one document per line
+    are accepted.
+
+    Args:
+        path: Path to the JSON export
+
+    Returns:
+        list: Normalized job records
+    """
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    if content.lstrip().startswith("["):
+        documents = json.loads(content)
+    else:
+        documents = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    jobs = [_mongo_document_to_job(document) for document in documents]
+    logger.info("Loaded %d jobs from %s", len(jobs), path)
+    return jobs
+
+
+def load_jobs_from_mongo(
+    mongo_uri: str, database: str = "hireonai"
+) -> List[Dict[str, Any]]:
+    """
+    Load job records from the MongoDB `jobs` collection.
+
+    Args:
+        mongo_uri: MongoDB connection string
+        database: Database holding the `jobs` collection
+
+    Returns:
+        list: Normalized job records
+    """
+    import pymongo
+
+    client = pymongo.MongoClient(mongo_uri)
+    try:
+        projection = {field: 1 for field in MONGO_JOB_FIELDS.values()}
+        documents = client[database]["jobs"].find({}, projection)
+        jobs = [_mongo_document_to_job(document) for document in documents]
+    finally:
+        client.close()
+
+    logger.info("Loaded %d jobs from MongoDB", len(jobs))
+    return jobs
+
+
+def load_jobs(source: str) -> List[Dict[str, Any]]:
+    """
+    Load job records from a configured source.
+
+    Args:
+        source: "mongo" to read from MONGO_URI, a JSON export of the `jobs`
+            collection, or a data directory holding the CSV exports
+
+    Returns:
+        list: Normalized job records
+    """
+    if source == "mongo":
+        return load_jobs_from_mongo(os.getenv("MONGO_URI"))
+    if source.endswith((".json", ".jsonl")):
+        return load_jobs_from_json(source)
+    return load_jobs_from_csv(source)
+
+
+def format_job_description(job: Dict[str, Any]) -> str:
+    """
+    Build the job description and qualification text that is embedded.
+
+    Args:
+        job: Normalized job record
+
+    Returns:
+        str: Description and qualification bullet lists
+    """
+    sections = []
+    if job["job_desc_list"]:
+        sections.append(
+            "Job Description:\n"
+            + "\n".join(f"- {item}" for item in job["job_desc_list"])
+        )
+    if job["job_qualification_list"]:
+        sections.append(
+            "Qualifications:\n"
+            + "\n".join(f"- {item}" for item in job["job_qualification_list"])
+        )
+    return "\n\n".join(sections)
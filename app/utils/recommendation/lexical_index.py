@@ -0,0 +1,311 @@
+"""
+BM25 lexical index over job postings.
+
+This module builds an inverted index over job titles, descriptions and
+qualifications, with the BM25 weight of every posting computed at build time,
+so exact skill and tool names such as "Golang" or "SAP" are matched by summing
+a few posting lists. Results are fused with vector rankings by reciprocal rank
+fusion.
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import unicodedata
+
+import numpy as np
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+LEXICAL_MANIFEST_FILE = "manifest.json"
+LEXICAL_JOB_IDS_FILE = "job_ids.json"
+LEXICAL_VOCABULARY_FILE = "vocabulary.json"
+LEXICAL_OFFSETS_FILE = "offsets.npy"
+LEXICAL_POSTINGS_FILE = "postings.npy"
+LEXICAL_IMPACTS_FILE = "impacts.npy"
+
+# Words, keeping tool names such as "C++" and "C#" whole
+TOKEN_PATTERN = re.compile(r"\w[\w+#]*")
+
+# Title terms count this many times towards term frequencies
+TITLE_TERM_WEIGHT = 2
+
+# Rank offset of reciprocal rank fusion, as in the original RRF paper
+RRF_K = 60
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized lowercase terms."""
+    return TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+def job_terms(job: Dict[str, Any]) -> Dict[str, float]:
+    """Count the weighted term frequencies of a normalized job record."""
+    frequencies: Dict[str, float] = {}
+    for term in tokenize(job.get("job_position") or ""):
+        frequencies[term] = frequencies.get(term, 0.0) + TITLE_TERM_WEIGHT
+    for line in (job.get("job_desc_list") or []) + (
+        job.get("job_qualification_list") or []
+    ):
+        for term in tokenize(line):
+            frequencies[term] = frequencies.get(term, 0.0) + 1.0
+    return frequencies
+
+
+class BM25Index:
+    """
+    Inverted index with precomputed BM25 impacts.
+
+    Posting lists are stored back to back: the postings of term `t` are
+    `postings[offsets[t]:offsets[t + 1]]`, job rows sorted ascending, with
+    their BM25 contributions in `impacts`.
+    """
+
+    def __init__(
+        self,
+        job_ids: Sequence[str],
+        vocabulary: Dict[str, int],
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        impacts: np.ndarray,
+        manifest: Optional[dict] = None,
+    ) -> None:
+        self.job_ids = np.asarray(job_ids, dtype=object)
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings = postings
+        self.impacts = impacts
+        self.manifest = manifest or {}
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    @property
+    def corpus_version(self) -> Optional[Hashable]:
+        """Job corpus version the index was built for."""
+        return self.manifest.get("corpus_version")
+
+    @classmethod
+    def build(
+        cls,
+        jobs: Sequence[Dict[str, Any]],
+        k1: float = 1.2,
+        b: float = 0.75,
+        corpus_version: Optional[Hashable] = None,
+    ):
+        """
+        Index normalized job records.
+
+        Args:
+            jobs: Normalized job records from `load_jobs`
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+            corpus_version: Job corpus version the records belong to
+
+        Returns:
+            BM25Index: Index over every job
+        """
+        postings_by_term: Dict[str, Tuple[List[int], List[float]]] = {}
+        lengths = np.zeros(len(jobs), dtype=np.float32)
+        for row, job in enumerate(jobs):
+            frequencies = job_terms(job)
+            lengths[row] = sum(frequencies.values())
+            for term, frequency in frequencies.items():
+                rows, term_frequencies = postings_by_term.setdefault(term, ([], []))
+                rows.append(row)
+                term_frequencies.append(frequency)
+
+        average_length = float(lengths.mean()) if len(jobs) else 0.0
+        length_norms = k1 * (1 - b + b * lengths / max(average_length, 1e-9))
+
+        vocabulary = {}
+        offsets = [0]
+        posting_blocks = []
+        impact_blocks = []
+        for term_id, (term, (rows, term_frequencies)) in enumerate(
+            sorted(postings_by_term.items())
+        ):
+            rows = np.asarray(rows, dtype=np.int32)
+            term_frequencies = np.asarray(term_frequencies, dtype=np.float32)
+            idf = np.log(1 + (len(jobs) - len(rows) + 0.5) / (len(rows) + 0.5))
+            vocabulary[term] = term_id
+            posting_blocks.append(rows)
+            impact_blocks.append(
+                idf
+                * term_frequencies
+                * (k1 + 1)
+                / (term_frequencies + length_norms[rows])
+            )
+            offsets.append(offsets[-1] + len(rows))
+
+        index = cls(
+            [job["id"] for job in jobs],
+            vocabulary,
+            np.asarray(offsets, dtype=np.int64),
+            (
+                np.concatenate(posting_blocks)
+                if posting_blocks
+                else np.empty(0, dtype=np.int32)
+            ),
+            (
+                np.concatenate(impact_blocks).astype(np.float32)
+                if impact_blocks
+                else np.empty(0, dtype=np.float32)
+            ),
+            {
+                "created_at": time.time(),
+                "total_jobs": len(jobs),
+                "terms": len(vocabulary),
+                "k1": k1,
+                "b": b,
+                "corpus_version": corpus_version,
+            },
+        )
+        logger.info(
+            "Built BM25 index of %d jobs with %d terms and %d postings",
+            len(index),
+            len(vocabulary),
+            len(index.postings),
+        )
+        return index
+
+    def search(self, query: str, k: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rank jobs for a query by summing the impacts of its posting lists.
+
+        Args:
+            query: Free-text query
+            k: Number of jobs to return
+
+        Returns:
+            tuple: Job rows and BM25 scores sorted by descending score, only
+            for jobs matching at least one query term
+        """
+        term_ids = {
+            self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary
+        }
+        if not term_ids:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        slices = [
+            slice(self.offsets[term_id], self.offsets[term_id + 1])
+            for term_id in sorted(term_ids)
+        ]
+        if len(slices) == 1:
+            rows = np.asarray(self.postings[slices[0]])
+            scores = np.asarray(self.impacts[slices[0]])
+        else:
+            all_scores = np.bincount(
+                np.concatenate([self.postings[s] for s in slices]),
+                weights=np.concatenate([self.impacts[s] for s in slices]),
+                minlength=len(self),
+            )
+            rows = np.flatnonzero(all_scores)
+            scores = all_scores[rows].astype(np.float32)
+
+        if k < len(rows):
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        # Ties are broken by row so rankings are stable across calls
+        order = np.lexsort((rows, -scores))
+        return rows[order], scores[order]
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a directory, replacing any previous index.
+
+        Args:
+            path: Directory of the index
+        """
+        staging_path = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(staging_path, exist_ok=True)
+
+        np.save(os.path.join(staging_path, LEXICAL_OFFSETS_FILE), self.offsets)
+        np.save(os.path.join(staging_path, LEXICAL_POSTINGS_FILE), self.postings)
+        np.save(os.path.join(staging_path, LEXICAL_IMPACTS_FILE), self.impacts)
+        for file_name, content in (
+            (LEXICAL_JOB_IDS_FILE, self.job_ids.tolist()),
+            (LEXICAL_VOCABULARY_FILE, self.vocabulary),
+            (LEXICAL_MANIFEST_FILE, self.manifest),
+        ):
+            with open(
+                os.path.join(staging_path, file_name), "w", encoding="utf-8"
+            ) as f:
+                json.dump(content, f, ensure_ascii=False)
+
+        # Swap the finished index in so readers never see a partial write
+        previous_path = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.replace(path, previous_path)
+        os.replace(staging_path, path)
+        shutil.rmtree(previous_path, ignore_errors=True)
+
+        logger.info("Wrote BM25 index of %d jobs to %s", len(self), path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Open an index written by `save`, memory-mapping the posting lists.
+
+        Args:
+            path: Directory of the index
+
+        Returns:
+            BM25Index: Index ready for queries
+        """
+        contents = []
+        for file_name in (
+            LEXICAL_JOB_IDS_FILE,
+            LEXICAL_VOCABULARY_FILE,
+            LEXICAL_MANIFEST_FILE,
+        ):
+            with open(os.path.join(path, file_name), encoding="utf-8") as f:
+                contents.append(json.load(f))
+        job_ids, vocabulary, manifest = contents
+
+        index = cls(
+            job_ids,
+            vocabulary,
+            np.load(os.path.join(path, LEXICAL_OFFSETS_FILE)),
+            np.load(os.path.join(path, LEXICAL_POSTINGS_FILE), mmap_mode="r"),
+            np.load(os.path.join(path, LEXICAL_IMPACTS_FILE), mmap_mode="r"),
+            manifest,
+        )
+        logger.info(
+            "Loaded BM25 index from %s with %d jobs and %d terms",
+            path,
+            len(index),
+            len(vocabulary),
+        )
+        return index
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[str]], k: int = RRF_K
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Fuse several rankings of ids by summing 1 / (k + rank) per id.
+
+    Args:
+        rankings: Ids ranked from the best match, one sequence per retriever
+        k: Rank offset damping the weight of the top ranks
+
+    Returns:
+        tuple: Fused ids and their fusion scores sorted by descending score
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+
+    # Python's sort is stable, so ties keep first-seen order
+    ranked = sorted(fused.items(), key=lambda item: -item[1])
+    return (
+        [item_id for item_id, _ in ranked],
+        np.asarray([score for _, score in ranked], dtype=np.float32),
+    )
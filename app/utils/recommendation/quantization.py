@@ -0,0 +1,144 @@
+"""
+Quantized embedding storage for the in-process job index.
+
+This module stores embedding matrices as float16 or as int8 with one scale per
+vector, scores queries directly on the quantized data and measures how closely
+the quantized ranking follows exact float32 scoring.
+"""
+
+from typing import Dict, Optional
+import logging
+
+import numpy as np
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+# Rows converted to float32 at a time while scoring quantized data, small
+# enough for the converted block to stay in cache for its matrix product
+SCORING_BLOCK_SIZE = 256
+
+
+class QuantizedMatrix:
+    """
+    Row-wise quantized embedding matrix.
+
+    float16 values are stored as-is. int8 values use symmetric quantization with
+    a float32 scale per row, so a row is reconstructed as ``values * scale``.
+
+    Scoring converts the values back to float32 block by block. For int8 this
+    costs about as much as the smaller matrix saves in memory traffic, while
+    float16 scores several times slower than float32, since NumPy converts
+    float16 slowly.
+    """
+
+    def __init__(self, values: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.values = values
+        self.scales = scales
+
+    @property
+    def shape(self):
+        """Shape of the underlying matrix."""
+        return self.values.shape
+
+    @property
+    def dtype(self) -> str:
+        """Storage dtype name."""
+        return self.values.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the quantized values and scales."""
+        return self.values.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    @classmethod
+    def quantize(cls, matrix: np.ndarray, dtype: str = "int8"):
+        """
+        Quantize a float32 matrix.
+
+        Args:
+            matrix: (rows, dim) float32 matrix
+            dtype: "float16" or "int8"
+
+        Returns:
+            QuantizedMatrix: Quantized copy of the matrix
+        """
+        if dtype == "float16":
+            return cls(matrix.astype(np.float16))
+        if dtype != "int8":
+            raise ValueError(f"Unsupported quantization dtype: {dtype}")
+
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        values = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return cls(values, scales.astype(np.float32))
+
+    def dot(self, queries: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Compute inner products on the quantized data.
+
+        Args:
+            queries: (queries, dim) float32 matrix
+            rows: Row indices to score, or None for every row
+
+        Returns:
+            np.ndarray: (queries, rows) inner products
+        """
+        total = self.values.shape[0] if rows is None else len(rows)
+        products = np.empty((queries.shape[0], total), dtype=np.float32)
+        # One conversion buffer per call, reused by every block
+        buffer = np.empty((SCORING_BLOCK_SIZE, self.values.shape[1]), np.float32)
+        for start in range(0, total, SCORING_BLOCK_SIZE):
+            selection = (
+                slice(start, start + SCORING_BLOCK_SIZE)
+                if rows is None
+                else rows[start : start + SCORING_BLOCK_SIZE]
+            )
+            values = self.values[selection]
+            block = buffer[: len(values)]
+            np.copyto(block, values, casting="unsafe")
+            np.matmul(queries, block.T, out=products[:, start : start + len(block)])
+
+        if self.scales is not None:
+            products *= self.scales if rows is None else self.scales[rows]
+        return products
+
+    def dequantize(self) -> np.ndarray:
+        """Reconstruct the float32 matrix."""
+        matrix = self.values.astype(np.float32)
+        if self.scales is not None:
+            matrix *= self.scales[:, None]
+        return matrix
+
+
+def evaluate_ranking(
+    exact_distances: np.ndarray, approximate_distances: np.ndarray, k: int = 100
+) -> Dict[str, float]:
+    """
+    Compare an approximate ranking against exact distances.
+
+    Args:
+        exact_distances: (queries, rows) exact distance matrix
+        approximate_distances: (queries, rows) approximate distance matrix
+        k: Ranking depth to compare
+
+    Returns:
+        dict: Mean recall@k and mean/max absolute distance error
+    """
+    k = min(k, exact_distances.shape[1])
+    exact_top = np.argpartition(exact_distances, k - 1, axis=1)[:, :k]
+    approximate_top = np.argpartition(approximate_distances, k - 1, axis=1)[:, :k]
+    recall = np.mean(
+        [
+            len(np.intersect1d(exact_row, approximate_row)) / k
+            for exact_row, approximate_row in zip(exact_top, approximate_top)
+        ]
+    )
+    error = np.abs(exact_distances - approximate_distances)
+    return {
+        f"recall@{k}": float(recall),
+        "mean_distance_error": float(error.mean()),
+        "max_distance_error": float(error.max()),
+    }
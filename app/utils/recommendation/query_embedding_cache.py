@@ -0,0 +1,78 @@
+"""
+In-process LRU cache of search query embeddings.
+
+This module keys query embeddings by their normalized text, so that repeated
+free-text searches such as "software developer" are answered without calling
+the embedding model. Concurrent misses for the same query share one call.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Tuple
+import asyncio
+import logging
+import unicodedata
+
+from cachetools import LRUCache
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a key."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU cache of query embeddings keyed by normalized query text."""
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self._entries = LRUCache(maxsize=maxsize)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_embed(
+        self, query: str, embed: Callable[[str], Awaitable[List[float]]]
+    ) -> Tuple[List[float], bool]:
+        """
+        Return the embedding of a normalized query, embedding it on a miss.
+
+        Args:
+            query: Normalized query from `normalize_query`
+            embed: Coroutine function embedding a query
+
+        Returns:
+            tuple: Embedding values, and whether the model call was skipped
+        """
+        embedding = self._entries.get(query)
+        if embedding is not None:
+            self.hits += 1
+            return embedding, True
+
+        pending = self._pending.get(query)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending), True
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[query] = future
+        try:
+            embedding = await embed(query)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the error as retrieved in case no request is waiting on it
+            future.exception()
+            raise
+        else:
+            self._entries[query] = embedding
+            future.set_result(embedding)
+            return embedding, False
+        finally:
+            del self._pending[query]
@@ -0,0 +1,78 @@
+"""
+Per-user cache of ranked job recommendations.
+
+This module keeps the ranked job ids and match scores computed for a user so
+that pagination and repeat visits only need to slice a cached array.
+"""
+
+from typing import Hashable, NamedTuple, Optional
+import logging
+
+from cachetools import LRUCache, TTLCache
+import numpy as np
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class RankedJobs(NamedTuple):
+    """Job ids and match scores sorted by descending score."""
+
+    job_ids: np.ndarray
+    scores: np.ndarray
+
+
+class RecommendationCache:
+    """
+    Bounded LRU cache with a time-to-live for ranked recommendations.
+
+    Entries are keyed by user ID and are all dropped when the job corpus
+    version changes. Each user keeps a few rankings for different request
+    variants, such as scoring mode and fusion weights.
+    """
+
+    def __init__(
+        self, maxsize: int = 10000, ttl: float = 900, max_variants: int = 4
+    ) -> None:
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.max_variants = max_variants
+        self.corpus_version: Optional[Hashable] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: str, variant: Hashable = None) -> Optional[RankedJobs]:
+        """Return the cached ranking for a user, or None on a miss."""
+        variants = self._entries.get(user_id)
+        if variants is None:
+            return None
+        return variants.get(variant)
+
+    def set(
+        self, user_id: str, ranked_jobs: RankedJobs, variant: Hashable = None
+    ) -> None:
+        """Store the ranking computed for a user."""
+        variants = self._entries.get(user_id)
+        if variants is None:
+            variants = LRUCache(maxsize=self.max_variants)
+            self._entries[user_id] = variants
+        variants[variant] = ranked_jobs
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop the cached ranking for a user, e.g. after their CV changes."""
+        if self._entries.pop(user_id, None) is not None:
+            logger.info("Invalidated cached recommendations for user %s", user_id)
+
+    def set_corpus_version(self, version: Hashable) -> None:
+        """Record the current job corpus version, clearing stale entries."""
+        if version == self.corpus_version:
+            return
+
+        logger.info(
+            "Job corpus version changed from %s to %s, clearing %d cached rankings",
+            self.corpus_version,
+            version,
+            len(self._entries),
+        )
+        self._entries.clear()
+        self.corpus_version = version
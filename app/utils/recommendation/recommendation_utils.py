@@ -6,31 +6,86 @@ and processing recommendation results through dataframe operations.
 """
 
 from typing import List, Dict, Any, Optional
+import asyncio
+import base64
+import binascii
+import json
 import logging
 
 from google.genai import types
+import numpy as np
 import pandas as pd
 
+from app.utils.recommendation.embedding_cache import (
+    EmbeddingCache,
+    embedding_cache_key,
+)
+from app.utils.recommendation.recommendation_cache import RankedJobs
+
 # Configure logger
 logger = logging.getLogger(__name__)
 
 
-async def create_embedding(client, content: str, task_type: str = "RETRIEVAL_QUERY"):
-    """Generate embedding for the given content."""
-    logger.info("Creating embedding with task type: %s", task_type)
+EMBEDDING_MODEL = "text-multilingual-embedding-002"
+
+
+async def create_embeddings(
+    client,
+    contents: List[str],
+    task_type: str = "RETRIEVAL_QUERY",
+    title: Optional[str] = None,
+    cache: Optional[EmbeddingCache] = None,
+) -> List[List[float]]:
+    """
+    Generate embeddings for a batch of contents in a single request.
+
+    Repeated contents are embedded once. With a cache, cached embeddings are
+    reused and only the remaining contents are sent to the model.
+
+    Args:
+        client: Gemini client
+        contents: Texts to embed
+        task_type: Embedding task type
+        title: Optional document title for RETRIEVAL_DOCUMENT embeddings
+        cache: Optional persistent embedding cache
+
+    Returns:
+        list: Embedding of every content, in order
+    """
+    keys = [
+        embedding_cache_key(EMBEDDING_MODEL, task_type, title, content)
+        for content in contents
+    ]
+    embeddings = {}
+    if cache is not None:
+        embeddings = await asyncio.to_thread(cache.get_many, keys)
+
+    missing = {}
+    for key, content in zip(keys, contents):
+        if key not in embeddings:
+            missing.setdefault(key, content)
 
-    embedding = (
-        client.models.embed_content(
-            model="text-multilingual-embedding-002",
-            contents=content,
-            config=types.EmbedContentConfig(task_type=task_type),
+    if missing:
+        logger.info(
+            "Creating %d embeddings with task type: %s (%d cached)",
+            len(missing),
+            task_type,
+            len(embeddings),
         )
-        .embeddings[0]
-        .values
-    )
+        response = await client.aio.models.embed_content(
+            model=EMBEDDING_MODEL,
+            contents=list(missing.values()),
+            config=types.EmbedContentConfig(task_type=task_type, title=title),
+        )
+        created = {
+            key: embedding.values
+            for key, embedding in zip(missing, response.embeddings)
+        }
+        if cache is not None:
+            await asyncio.to_thread(cache.set_many, created.items())
+        embeddings.update(created)
 
-    logger.info("Embedding created successfully, dimension: %d", len(embedding))
-    return embedding
+    return [embeddings[key] for key in keys]
 
 
 async def query_collection(collection, embedding: List[float], n_results: int = 10000):
@@ -43,6 +98,23 @@ async def query_collection(collection, embedding: List[float], n_results: int =
     return results
 
 
+async def query_collection_many(
+    collection, embeddings: List[List[float]], n_results: int = 10000
+):
+    """Query a collection with several embeddings in a single request."""
+    logger.info(
+        "Querying collection '%s' with %d embeddings for %d results each",
+        collection.name,
+        len(embeddings),
+        n_results,
+    )
+
+    results = await collection.query(query_embeddings=embeddings, n_results=n_results)
+
+    logger.info("Query completed for %d embeddings", len(results["ids"]))
+    return results
+
+
 def create_dataframe_from_results(results: Dict[str, Any], source_type: str):
     """Create a dataframe from query results."""
     logger.info("Creating dataframe from %s results", source_type)
@@ -60,7 +132,9 @@ def create_dataframe_from_results(results: Dict[str, Any], source_type: str):
 
 
 def merge_dataframes(
-    job_desc_df: pd.DataFrame, job_title_df: Optional[pd.DataFrame] = None
+    job_desc_df: pd.DataFrame,
+    job_title_df: Optional[pd.DataFrame] = None,
+    title_weight: float = 0.6,
 ) -> pd.DataFrame:
     """Merge job description and job title dataframes if available."""
     if job_title_df is None:
@@ -83,11 +157,16 @@ def merge_dataframes(
 
     logger.info("Merged dataframe created with %d rows", len(combined_df))
 
-    # Calculate hybrid score (60% title, 40% description)
-    logger.info("Calculating hybrid scores (60% title, 40% description)")
+    # Calculate hybrid score (60% title, 40% description by default)
+    logger.info(
+        "Calculating hybrid scores (%.0f%% title, %.0f%% description)",
+        title_weight * 100,
+        (1 - title_weight) * 100,
+    )
+    description_weight = 1 - title_weight
     combined_df["hybrid_score"] = (
-        combined_df["job_title_distance"] * 0.6
-        + combined_df["job_description_distance"] * 0.4
+        combined_df["job_title_distance"] * title_weight
+        + combined_df["job_description_distance"] * description_weight
     )
 
     # Calculate match score (normalized)
@@ -100,3 +179,160 @@ def merge_dataframes(
     logger.info("Final result dataframe created with %d rows", len(combined_df))
 
     return combined_df.sort_values("match_score", ascending=False)
+
+
+def lookup_rows(ids, source_ids) -> np.ndarray:
+    """Return the position of each id in `source_ids`, or -1 when it is absent."""
+    source_rows = {source_id: row for row, source_id in enumerate(source_ids)}
+    return np.fromiter(
+        (source_rows.get(item_id, -1) for item_id in ids), dtype=np.intp, count=len(ids)
+    )
+
+
+def align_distances(
+    source_distances, rows: np.ndarray, empty_distance: float = 0.0
+) -> np.ndarray:
+    """
+    Reorder distances from another result set using rows from `lookup_rows`.
+
+    Ids missing from the other result set get its worst distance so they are
+    ranked on the remaining signal instead of being dropped. When the other
+    result set is empty, every id gets `empty_distance`. A 2-D array is
+    aligned row by row.
+    """
+    source_distances = np.asarray(source_distances, dtype=np.float32)
+    if source_distances.shape[-1] == 0:
+        return np.full(
+            source_distances.shape[:-1] + (len(rows),), empty_distance, np.float32
+        )
+    aligned = source_distances[..., rows]
+    missing = rows < 0
+    if missing.any():
+        worst_distance = source_distances.max(axis=-1, keepdims=True)
+        aligned = np.where(missing, worst_distance, aligned)
+    return aligned
+
+
+def fuse_distances(
+    job_desc_distances, job_title_distances, title_weight: float = 0.6
+) -> np.ndarray:
+    """Blend aligned job description and job title distances into hybrid distances."""
+    return title_weight * np.asarray(job_title_distances, dtype=np.float32) + (
+        1 - title_weight
+    ) * np.asarray(job_desc_distances, dtype=np.float32)
+
+
+def distances_to_match_scores(distances, max_distance=None) -> np.ndarray:
+    """
+    Convert distances into 0-100 match scores relative to the furthest result.
+
+    A 2-D array is treated as one result set per row. Pass `max_distance`, one
+    value per result set, when `distances` only holds the closest results.
+    """
+    distances = np.asarray(distances, dtype=np.float32)
+    if distances.size == 0:
+        return distances
+
+    if max_distance is None:
+        max_distance = distances.max(axis=-1, keepdims=True)
+    else:
+        max_distance = np.asarray(max_distance, dtype=np.float32)[..., None]
+    safe_max_distance = np.where(max_distance > 0, max_distance, 1.0)
+    scores = (1 - distances / safe_max_distance) * 100
+    return np.where(max_distance > 0, scores, np.float32(100.0))
+
+
+def select_top_k_per_row(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Return the column positions of the top `k` scores in each row, ranked.
+
+    Ties are broken by position, like `select_top_ranks`, so a user ranked in
+    a batch gets the same jobs as when ranked alone.
+    """
+    k = min(k, scores.shape[1])
+    if k == 0 or scores.shape[0] == 0:
+        return np.empty((scores.shape[0], k), dtype=np.intp)
+    return np.stack([select_top_ranks(row, 0, k) for row in scores])
+
+
+def results_to_distance_matrix(
+    results: Dict[str, Any], job_ids: Optional[List[str]] = None
+):
+    """
+    Align a multi-query ChromaDB result into one distance matrix.
+
+    Args:
+        results: Query results holding one id and distance list per query
+        job_ids: Column order of the matrix, defaults to the first query's ids
+
+    Returns:
+        tuple: Job ids and a (queries, jobs) distance matrix
+    """
+    if job_ids is None:
+        job_ids = results["ids"][0]
+    distance_matrix = np.vstack(
+        [
+            align_distances(distances, lookup_rows(job_ids, ids))
+            for ids, distances in zip(results["ids"], results["distances"])
+        ]
+    )
+    return job_ids, distance_matrix
+
+
+def select_top_ranks(scores: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """
+    Select the positions ranked [start, stop) by descending score.
+
+    Only the top `stop` candidates are sorted, using partial selection over the
+    rest of the array. Ties are broken by position so pages stay consistent
+    across requests.
+
+    Args:
+        scores: Scores for every candidate
+        start: First rank to return (inclusive)
+        stop: Last rank to return (exclusive)
+
+    Returns:
+        np.ndarray: Candidate positions ordered by rank
+    """
+    total = len(scores)
+    stop = min(stop, total)
+    if start >= stop:
+        return np.empty(0, dtype=np.intp)
+
+    if stop < total:
+        partition = np.argpartition(-scores, stop - 1)[:stop]
+        # Keep every candidate tied with the cut-off so tie-breaking is stable
+        candidates = np.flatnonzero(scores >= scores[partition].min())
+    else:
+        candidates = np.arange(total)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][start:stop]
+
+
+def rank_jobs(job_ids, scores: np.ndarray) -> RankedJobs:
+    """Sort every job by descending score, with the same tie-breaking as pages."""
+    order = select_top_ranks(scores, 0, len(scores))
+    return RankedJobs(
+        job_ids=np.asarray(job_ids, dtype=object)[order], scores=scores[order]
+    )
+
+
+def encode_cursor(offset: int) -> str:
+    """Encode a ranking offset into an opaque pagination cursor."""
+    payload = json.dumps({"offset": offset}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a pagination cursor back into a ranking offset."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded))["offset"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return offset
@@ -0,0 +1,431 @@
+"""
+Precomputed job-to-job similarity graph.
+
+This module builds a k-nearest-neighbour graph over the job description
+embeddings, stored as neighbour row indices and distances per job, so that the
+`/similar_jobs` endpoint answers with a key lookup instead of a vector query.
+After an ingestion run the graph is updated incrementally: only new and changed
+jobs, and jobs that lost a neighbour, are searched again, while every other job
+merges the changed jobs into its existing neighbour list.
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+
+from app.utils.recommendation.recommendation_cache import RankedJobs
+from app.utils.recommendation.recommendation_utils import (
+    distances_to_match_scores,
+    lookup_rows,
+)
+from app.utils.recommendation.vector_index import EmbeddingIndex, collection_space
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+GRAPH_MANIFEST_FILE = "manifest.json"
+GRAPH_JOB_IDS_FILE = "job_ids.json"
+GRAPH_CONTENT_HASHES_FILE = "content_hashes.json"
+GRAPH_NEIGHBOURS_FILE = "neighbours.npy"
+GRAPH_DISTANCES_FILE = "distances.npy"
+GRAPH_MAX_DISTANCES_FILE = "max_distances.npy"
+
+SIMILAR_JOBS_COLLECTION = "job_desc_req_documents"
+
+# Above this share of jobs to search again, the graph is rebuilt from scratch
+REBUILD_FRACTION = 0.25
+
+
+class SimilarJobsGraph:
+    """
+    Top-k most similar jobs of every job.
+
+    `neighbours` holds row indices into `job_ids`, ranked by ascending
+    distance. `max_distances` is the distance to the furthest job, used to
+    turn distances into match scores like the recommendation endpoints do.
+    """
+
+    def __init__(
+        self,
+        job_ids: Sequence[str],
+        content_hashes: Sequence[Optional[str]],
+        neighbours: np.ndarray,
+        distances: np.ndarray,
+        max_distances: np.ndarray,
+        manifest: Optional[dict] = None,
+    ) -> None:
+        self.job_ids = np.asarray(job_ids, dtype=object)
+        self.content_hashes = list(content_hashes)
+        self.neighbours = neighbours
+        self.distances = distances
+        self.max_distances = max_distances
+        self.manifest = manifest or {}
+        self._job_rows = {job_id: row for row, job_id in enumerate(self.job_ids)}
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    @property
+    def k(self) -> int:
+        """Number of neighbours stored per job."""
+        return self.neighbours.shape[1]
+
+    @property
+    def corpus_version(self) -> Optional[Hashable]:
+        """Job corpus version the graph was computed against."""
+        return self.manifest.get("corpus_version")
+
+    def get(self, job_id: str, limit: Optional[int] = None) -> Optional[RankedJobs]:
+        """Return the most similar jobs of a job, or None if it is not indexed."""
+        row = self._job_rows.get(job_id)
+        if row is None:
+            return None
+
+        neighbours = self.neighbours[row, :limit]
+        return RankedJobs(
+            job_ids=self.job_ids[neighbours],
+            scores=distances_to_match_scores(
+                self.distances[row, :limit], self.max_distances[row]
+            ),
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Write the graph to a directory, replacing any previous graph.
+
+        Args:
+            path: Directory of the graph
+        """
+        staging_path = f"{path}.tmp-{os.getpid()}"
+        os.makedirs(staging_path, exist_ok=True)
+
+        np.save(os.path.join(staging_path, GRAPH_NEIGHBOURS_FILE), self.neighbours)
+        np.save(os.path.join(staging_path, GRAPH_DISTANCES_FILE), self.distances)
+        np.save(
+            os.path.join(staging_path, GRAPH_MAX_DISTANCES_FILE), self.max_distances
+        )
+        with open(
+            os.path.join(staging_path, GRAPH_JOB_IDS_FILE), "w", encoding="utf-8"
+        ) as f:
+            json.dump(self.job_ids.tolist(), f)
+        with open(
+            os.path.join(staging_path, GRAPH_CONTENT_HASHES_FILE), "w", encoding="utf-8"
+        ) as f:
+            json.dump(self.content_hashes, f)
+        with open(
+            os.path.join(staging_path, GRAPH_MANIFEST_FILE), "w", encoding="utf-8"
+        ) as f:
+            json.dump(self.manifest, f)
+
+        # Swap the finished graph in so readers never see a partial write
+        previous_path = f"{path}.old-{os.getpid()}"
+        if os.path.exists(path):
+            os.replace(path, previous_path)
+        os.replace(staging_path, path)
+        shutil.rmtree(previous_path, ignore_errors=True)
+
+        logger.info("Wrote similar jobs graph of %d jobs to %s", len(self), path)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Open a graph written by `save`.
+
+        The neighbour and distance matrices are memory-mapped, so opening the
+        graph is cheap and workers on one host share the page cache.
+
+        Args:
+            path: Directory of the graph
+
+        Returns:
+            SimilarJobsGraph: Graph ready for lookups
+        """
+        with open(os.path.join(path, GRAPH_MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(os.path.join(path, GRAPH_JOB_IDS_FILE), encoding="utf-8") as f:
+            job_ids = json.load(f)
+        with open(os.path.join(path, GRAPH_CONTENT_HASHES_FILE), encoding="utf-8") as f:
+            content_hashes = json.load(f)
+
+        graph = cls(
+            job_ids,
+            content_hashes,
+            np.load(os.path.join(path, GRAPH_NEIGHBOURS_FILE), mmap_mode="r"),
+            np.load(os.path.join(path, GRAPH_DISTANCES_FILE), mmap_mode="r"),
+            np.load(os.path.join(path, GRAPH_MAX_DISTANCES_FILE), mmap_mode="r"),
+            manifest,
+        )
+        logger.info(
+            "Loaded similar jobs graph from %s with %d jobs (%d neighbours each)",
+            path,
+            len(graph),
+            graph.k,
+        )
+        return graph
+
+
+def build_similar_jobs_graph(
+    index: EmbeddingIndex,
+    content_hashes: Sequence[Optional[str]],
+    k: int = 50,
+    corpus_version: Optional[Hashable] = None,
+    block_size: int = 256,
+) -> SimilarJobsGraph:
+    """
+    Compute the graph of the `k` most similar jobs of every job.
+
+    Args:
+        index: float32 index of the job description embeddings
+        content_hashes: Content hash of every index row
+        k: Number of neighbours kept per job
+        corpus_version: Job corpus version the index was loaded at
+        block_size: Number of jobs searched per matrix product
+
+    Returns:
+        SimilarJobsGraph: Graph over every indexed job
+    """
+    k = max(0, min(k, len(index) - 1))
+    neighbours, distances, max_distances = _search_rows(
+        index, np.arange(len(index)), k, block_size
+    )
+    logger.info("Built similar jobs graph of %d jobs", len(index))
+    return SimilarJobsGraph(
+        index.ids,
+        content_hashes,
+        neighbours,
+        distances,
+        max_distances,
+        _graph_manifest(len(index), k, corpus_version),
+    )
+
+
+def update_similar_jobs_graph(
+    graph: SimilarJobsGraph,
+    index: EmbeddingIndex,
+    content_hashes: Sequence[Optional[str]],
+    k: int = 50,
+    corpus_version: Optional[Hashable] = None,
+    block_size: int = 256,
+) -> SimilarJobsGraph:
+    """
+    Bring a graph up to date with the current job embeddings.
+
+    Jobs are compared by content hash. New and changed jobs, and jobs with a
+    removed or changed neighbour, are searched again over the whole index. The
+    other jobs keep their neighbours and only score the changed jobs. The
+    graph is rebuilt instead when more than `REBUILD_FRACTION` of it is stale.
+
+    Args:
+        graph: Graph computed for a previous version of the corpus
+        index: float32 index of the job description embeddings
+        content_hashes: Content hash of every index row
+        k: Number of neighbours kept per job
+        corpus_version: Job corpus version the index was loaded at
+        block_size: Number of jobs searched per matrix product
+
+    Returns:
+        SimilarJobsGraph: Graph over every indexed job
+    """
+    k = max(0, min(k, len(index) - 1))
+    if graph.k != k:
+        logger.info("Neighbour count changed from %d to %d", graph.k, k)
+        return build_similar_jobs_graph(
+            index, content_hashes, k, corpus_version, block_size
+        )
+
+    # Rows of the graph for every index row, and the other way round
+    graph_rows = lookup_rows(index.ids, graph.job_ids)
+    index_rows = lookup_rows(graph.job_ids, index.ids)
+
+    unchanged = np.fromiter(
+        (
+            graph_row >= 0
+            and content_hash is not None
+            and graph.content_hashes[graph_row] == content_hash
+            for graph_row, content_hash in zip(graph_rows, content_hashes)
+        ),
+        dtype=bool,
+        count=len(index),
+    )
+    # Graph rows of jobs that were removed or changed
+    stale_graph_rows = np.ones(len(graph), dtype=bool)
+    stale_graph_rows[graph_rows[unchanged]] = False
+
+    kept_rows = np.flatnonzero(unchanged)
+    lost_neighbour = stale_graph_rows[graph.neighbours[graph_rows[kept_rows]]].any(
+        axis=1
+    )
+    changed_rows = np.flatnonzero(~unchanged)
+    search_rows = np.union1d(changed_rows, kept_rows[lost_neighbour])
+    kept_rows = kept_rows[~lost_neighbour]
+
+    if len(search_rows) > REBUILD_FRACTION * len(index):
+        logger.info(
+            "%d of %d jobs are stale, rebuilding the similar jobs graph",
+            len(search_rows),
+            len(index),
+        )
+        return build_similar_jobs_graph(
+            index, content_hashes, k, corpus_version, block_size
+        )
+
+    neighbours = np.empty((len(index), k), dtype=np.int32)
+    distances = np.empty((len(index), k), dtype=np.float32)
+    max_distances = np.empty(len(index), dtype=np.float32)
+
+    (
+        neighbours[search_rows],
+        distances[search_rows],
+        max_distances[search_rows],
+    ) = _search_rows(index, search_rows, k, block_size)
+
+    # Kept jobs only need to consider the changed jobs as new neighbours
+    for start in range(0, len(kept_rows), block_size):
+        block = kept_rows[start : start + block_size]
+        block_graph_rows = graph_rows[block]
+        block_neighbours = index_rows[graph.neighbours[block_graph_rows]]
+        block_distances = np.asarray(graph.distances[block_graph_rows])
+        block_max_distances = np.asarray(graph.max_distances[block_graph_rows])
+
+        if len(changed_rows):
+            changed_distances = index.distances_batch(
+                index.embeddings[block], rows=changed_rows
+            )
+            block_neighbours = np.concatenate(
+                [
+                    block_neighbours,
+                    np.broadcast_to(changed_rows, changed_distances.shape),
+                ],
+                axis=1,
+            )
+            block_distances = np.concatenate(
+                [block_distances, changed_distances], axis=1
+            )
+            block_max_distances = np.maximum(
+                block_max_distances, changed_distances.max(axis=1)
+            )
+            order = np.lexsort((block_neighbours, block_distances), axis=-1)[:, :k]
+            block_neighbours = np.take_along_axis(block_neighbours, order, axis=1)
+            block_distances = np.take_along_axis(block_distances, order, axis=1)
+
+        neighbours[block] = block_neighbours
+        distances[block] = block_distances
+        max_distances[block] = block_max_distances
+
+    logger.info(
+        "Updated similar jobs graph: %d jobs searched again, %d jobs merged with "
+        "%d changed jobs",
+        len(search_rows),
+        len(kept_rows),
+        len(changed_rows),
+    )
+    return SimilarJobsGraph(
+        index.ids,
+        content_hashes,
+        neighbours,
+        distances,
+        max_distances,
+        _graph_manifest(len(index), k, corpus_version),
+    )
+
+
+async def refresh_similar_jobs_graph(
+    chroma_client,
+    path: str,
+    k: int = 50,
+    page_size: int = 1000,
+) -> SimilarJobsGraph:
+    """
+    Build or incrementally update the similar jobs graph stored at `path`.
+
+    Args:
+        chroma_client: Async ChromaDB client
+        path: Directory of the graph
+        k: Number of neighbours kept per job
+        page_size: Number of records fetched per request
+
+    Returns:
+        SimilarJobsGraph: Graph written to `path`
+    """
+    collection = await chroma_client.get_collection(name=SIMILAR_JOBS_COLLECTION)
+    metadata = collection.metadata or {}
+
+    ids: List[str] = []
+    pages: List[np.ndarray] = []
+    content_hashes: List[Optional[str]] = []
+    total = await collection.count()
+    for offset in range(0, total, page_size):
+        page = await collection.get(
+            include=["embeddings", "metadatas"], limit=page_size, offset=offset
+        )
+        ids.extend(page["ids"])
+        pages.append(np.asarray(page["embeddings"], dtype=np.float32))
+        content_hashes.extend(
+            (record_metadata or {}).get("content_hash")
+            for record_metadata in page["metadatas"]
+        )
+
+    index = EmbeddingIndex(
+        ids,
+        np.concatenate(pages) if pages else np.empty((0, 0), dtype=np.float32),
+        space=collection_space(metadata),
+    )
+
+    graph = None
+    if os.path.exists(os.path.join(path, GRAPH_MANIFEST_FILE)):
+        try:
+            graph = SimilarJobsGraph.load(path)
+        except Exception as e:
+            logger.warning("Could not open similar jobs graph, rebuilding: %s", e)
+
+    if graph is None:
+        graph = build_similar_jobs_graph(
+            index, content_hashes, k, metadata.get("corpus_version")
+        )
+    else:
+        graph = update_similar_jobs_graph(
+            graph, index, content_hashes, k, metadata.get("corpus_version")
+        )
+    graph.save(path)
+    return graph
+
+
+def _search_rows(index: EmbeddingIndex, rows: np.ndarray, k: int, block_size: int):
+    """Find the `k` nearest other jobs of the given index rows."""
+    neighbours = np.empty((len(rows), k), dtype=np.int32)
+    distances = np.empty((len(rows), k), dtype=np.float32)
+    max_distances = np.empty(len(rows), dtype=np.float32)
+
+    for start in range(0, len(rows), block_size):
+        block = rows[start : start + block_size]
+        positions, block_distances, block_max_distances = index.top_k(
+            index.embeddings[block], k + 1
+        )
+        # Drop each job from its own neighbours, keeping the ranking stable
+        order = np.argsort(positions == block[:, None], axis=1, kind="stable")[:, :k]
+        neighbours[start : start + len(block)] = np.take_along_axis(
+            positions, order, axis=1
+        )
+        distances[start : start + len(block)] = np.take_along_axis(
+            block_distances, order, axis=1
+        )
+        max_distances[start : start + len(block)] = block_max_distances
+
+    return neighbours, distances, max_distances
+
+
+def _graph_manifest(
+    total_jobs: int, k: int, corpus_version: Optional[Hashable]
+) -> Dict:
+    """Describe a graph for its manifest file."""
+    return {
+        "created_at": time.time(),
+        "total_jobs": total_jobs,
+        "k": k,
+        "corpus_version": corpus_version,
+    }
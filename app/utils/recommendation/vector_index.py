@@ -0,0 +1,566 @@
+"""
+In-process vector index for job recommendations.
+
+This module keeps collection embeddings in a single contiguous matrix, float32 or
+quantized, so that nearest-neighbour queries can be answered with one
+matrix-vector product instead of a round trip to the ChromaDB server. Large
+matrices can be split into row shards scored in parallel on a thread pool,
+since NumPy releases the GIL inside matrix products.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from app.utils.recommendation.quantization import (
+    SUPPORTED_DTYPES,
+    QuantizedMatrix,
+    evaluate_ranking,
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SPACES = ("l2", "cosine", "ip")
+
+# Collection metadata key repeating the distance space under a user key, since
+# `collection.modify` drops the `hnsw:space` key it is not allowed to write
+SPACE_METADATA_KEY = "distance_space"
+
+# Smallest shard worth handing to another thread
+MIN_SHARD_ROWS = 4096
+
+_scoring_executor: Optional[ThreadPoolExecutor] = None
+_scoring_executor_lock = threading.Lock()
+
+# Files written by `EmbeddingIndex.save`
+INDEX_INFO_FILE = "index.json"
+IDS_FILE = "ids.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+SCALES_FILE = "scales.npy"
+EXACT_EMBEDDINGS_FILE = "exact_embeddings.npy"
+SQUARED_NORMS_FILE = "squared_norms.npy"
+
+
+def _get_scoring_executor() -> ThreadPoolExecutor:
+    """Return the thread pool shared by every sharded index in the process."""
+    global _scoring_executor
+    with _scoring_executor_lock:
+        if _scoring_executor is None:
+            _scoring_executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1, thread_name_prefix="index-shard"
+            )
+        return _scoring_executor
+
+
+def collection_space(metadata: Optional[dict]) -> str:
+    """Return the distance space recorded in ChromaDB collection metadata."""
+    metadata = metadata or {}
+    return metadata.get("hnsw:space") or metadata.get(SPACE_METADATA_KEY) or "l2"
+
+
+def _spill_to_disk(matrix: np.ndarray, directory: Optional[str] = None) -> np.ndarray:
+    """
+    Copy a matrix to an unlinked temporary file and memory-map it read-only.
+
+    Args:
+        matrix: Matrix to spill
+        directory: Directory of the temporary file, or None for the system
+            default, which may be memory-backed, e.g. on Cloud Run
+
+    Returns:
+        np.ndarray: Read-only memory-mapped copy of the matrix
+    """
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=".npy", dir=directory or None)
+    os.close(fd)
+    spilled = np.lib.format.open_memmap(
+        path, mode="w+", dtype=matrix.dtype, shape=matrix.shape
+    )
+    spilled[:] = matrix
+    spilled.flush()
+    del spilled
+
+    # The mapping stays valid after the file is unlinked
+    mapped = np.load(path, mmap_mode="r")
+    os.unlink(path)
+    return mapped
+
+
+class EmbeddingIndex:
+    """
+    Exact or quantized in-memory index over a set of embeddings.
+
+    Distances follow the ChromaDB conventions for the collection space so that
+    results are interchangeable with `collection.query`:
+
+    - ``l2``: squared euclidean distance
+    - ``cosine``: 1 - cosine similarity
+    - ``ip``: 1 - inner product
+
+    With a float16 or int8 `dtype` the embeddings are scored on quantized data.
+    When `rescore_candidates` is set, the closest candidates of each query are
+    rescored exactly against float32 embeddings memory-mapped from a file in
+    `spill_dir`. With `shards` above 1, rows are scored in that many parallel
+    shards of at least `MIN_SHARD_ROWS` rows.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        embeddings: np.ndarray,
+        space: str = "l2",
+        dtype: str = "float32",
+        rescore_candidates: int = 0,
+        shards: int = 1,
+        spill_dir: Optional[str] = None,
+    ) -> None:
+        if space not in SUPPORTED_SPACES:
+            raise ValueError(f"Unsupported distance space: {space}")
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported index dtype: {dtype}")
+
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError(
+                f"Expected a ({len(ids)}, dim) matrix, got shape {matrix.shape}"
+            )
+
+        if space == "cosine":
+            # Normalise once so cosine distance becomes a plain dot product
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix /= norms
+
+        # Norms always come from the exact embeddings
+        self._initialize(
+            ids,
+            space,
+            dtype,
+            (matrix if dtype == "float32" else QuantizedMatrix.quantize(matrix, dtype)),
+            np.einsum("ij,ij->i", matrix, matrix),
+            rescore_candidates=rescore_candidates,
+            shards=shards,
+        )
+        if dtype != "float32":
+            self.quality_report = self._measure_quality(matrix)
+            if rescore_candidates > 0:
+                self._rescore_embeddings = _spill_to_disk(matrix, spill_dir)
+
+    def _initialize(
+        self,
+        ids: Sequence[str],
+        space: str,
+        dtype: str,
+        embeddings,
+        squared_norms: np.ndarray,
+        rescore_candidates: int = 0,
+        shards: int = 1,
+        rescore_embeddings: Optional[np.ndarray] = None,
+        quality_report: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """Set the state shared by indexes built in memory and loaded from disk."""
+        self.ids = np.asarray(ids, dtype=object)
+        self.space = space
+        self.dtype = dtype
+        self.rescore_candidates = rescore_candidates
+        self.shards = shards
+        self.quality_report = quality_report
+        self.embeddings = embeddings
+        self._squared_norms = squared_norms
+        self._rescore_embeddings = rescore_embeddings
+        self._id_to_row: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension of the index."""
+        return self.embeddings.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the embeddings used for scoring."""
+        return self.embeddings.nbytes + self._squared_norms.nbytes
+
+    def row_of(self, item_id: str) -> Optional[int]:
+        """Return the matrix row for an id, or None if it is not indexed."""
+        if self._id_to_row is None:
+            self._id_to_row = {job_id: row for row, job_id in enumerate(self.ids)}
+        return self._id_to_row.get(item_id)
+
+    def distances(self, query, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Compute the distance from the query to every indexed embedding."""
+        return self.distances_batch(
+            np.asarray(query, dtype=np.float32)[None, :], rows=rows
+        )[0]
+
+    def distances_batch(self, queries, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Compute a (queries, embeddings) distance matrix with one product.
+
+        Args:
+            queries: Query embeddings
+            rows: Sorted row indices to score, e.g. the jobs left by a filter,
+                or None for every row
+
+        Returns:
+            np.ndarray: Distances, with columns following `rows` when given
+        """
+        matrix = self._prepare_queries(queries)
+        total = len(self) if rows is None else len(rows)
+        distances = np.empty((len(matrix), total), dtype=np.float32)
+
+        def score_shard(bounds):
+            start, stop = bounds
+            distances[:, start:stop] = self._score_range(matrix, rows, start, stop)
+
+        self._map_shards(score_shard, total)
+        if self._rescore_embeddings is not None:
+            self._rescore(matrix, distances, rows)
+        return distances
+
+    def top_k(
+        self, queries, k: int, rows: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the `k` closest embeddings of each query without a full sort.
+
+        Every shard keeps only its own closest candidates, which are merged
+        into the final ranking. Ties are broken by position, like
+        `select_top_ranks`.
+
+        Args:
+            queries: Query embeddings
+            k: Number of neighbours per query
+            rows: Sorted row indices to search, or None for every row
+
+        Returns:
+            tuple: (queries, k) positions and distances sorted by ascending
+            distance, and the largest distance of each query over all rows.
+            Positions index into `rows` when given.
+        """
+        matrix = self._prepare_queries(queries)
+        total = len(self) if rows is None else len(rows)
+        k = min(k, total)
+        candidates = min(max(k, self.rescore_candidates), total)
+
+        def shard_top(bounds):
+            start, stop = bounds
+            shard_distances = self._score_range(matrix, rows, start, stop)
+            count = min(candidates, stop - start)
+            if count < stop - start:
+                positions = np.argpartition(shard_distances, count - 1, axis=1)[
+                    :, :count
+                ]
+            else:
+                positions = np.broadcast_to(
+                    np.arange(count), (len(matrix), count)
+                ).copy()
+            return (
+                positions + start,
+                np.take_along_axis(shard_distances, positions, axis=1),
+                shard_distances.max(axis=1, initial=-np.inf),
+            )
+
+        results = self._map_shards(shard_top, total)
+        positions = np.concatenate([result[0] for result in results], axis=1)
+        distances = np.concatenate([result[1] for result in results], axis=1)
+        max_distances = np.max([result[2] for result in results], axis=0)
+
+        if positions.shape[1] > candidates:
+            keep = np.argpartition(distances, candidates - 1, axis=1)[:, :candidates]
+            positions = np.take_along_axis(positions, keep, axis=1)
+            distances = np.take_along_axis(distances, keep, axis=1)
+
+        if self._rescore_embeddings is not None:
+            for query, query_positions in enumerate(positions):
+                matrix_rows = query_positions if rows is None else rows[query_positions]
+                query_matrix = matrix[query : query + 1]
+                distances[query] = self._to_distances(
+                    query_matrix @ self._rescore_embeddings[matrix_rows].T,
+                    query_matrix,
+                    self._squared_norms[matrix_rows],
+                )[0]
+
+        order = np.lexsort((positions, distances), axis=-1)[:, :k]
+        return (
+            np.take_along_axis(positions, order, axis=1),
+            np.take_along_axis(distances, order, axis=1),
+            max_distances,
+        )
+
+    def _shard_bounds(self, total: int) -> List[Tuple[int, int]]:
+        """Split `total` rows into contiguous shards."""
+        count = max(1, min(self.shards, total // MIN_SHARD_ROWS))
+        edges = np.linspace(0, total, count + 1).astype(int)
+        return list(zip(edges[:-1], edges[1:]))
+
+    def _map_shards(self, function, total: int) -> list:
+        """Apply a function to every shard, in parallel when there are several."""
+        bounds = self._shard_bounds(total)
+        if len(bounds) == 1:
+            return [function(bounds[0])]
+        return list(_get_scoring_executor().map(function, bounds))
+
+    def _score_range(
+        self, queries: np.ndarray, rows: Optional[np.ndarray], start: int, stop: int
+    ) -> np.ndarray:
+        """Compute approximate distances to rows [start, stop) of the selection."""
+        matrix_rows = slice(start, stop) if rows is None else rows[start:stop]
+        squared_norms = self._squared_norms[matrix_rows]
+        if isinstance(self.embeddings, QuantizedMatrix):
+            dots = self.embeddings.dot(
+                queries,
+                rows=np.arange(start, stop) if rows is None else matrix_rows,
+            )
+        else:
+            dots = queries @ self.embeddings[matrix_rows].T
+        return self._to_distances(dots, queries, squared_norms)
+
+    def _prepare_queries(self, queries) -> np.ndarray:
+        """Convert query embeddings to a float32 matrix in the index space."""
+        matrix = np.asarray(queries, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimension:
+            raise ValueError(
+                f"Expected a (n, {self.dimension}) query matrix, got shape "
+                f"{matrix.shape}"
+            )
+        if self.space == "cosine":
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix = matrix / norms
+        return matrix
+
+    def _to_distances(
+        self, dots: np.ndarray, queries: np.ndarray, squared_norms: np.ndarray
+    ) -> np.ndarray:
+        """Turn inner products into distances in the index space."""
+        if self.space == "l2":
+            query_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+            distances = squared_norms + query_norms - 2.0 * dots
+            return np.maximum(distances, 0.0, out=distances)
+        return 1.0 - dots
+
+    def _rescore(
+        self,
+        queries: np.ndarray,
+        distances: np.ndarray,
+        rows: Optional[np.ndarray] = None,
+    ) -> None:
+        """Replace the closest approximate distances with exact float32 ones."""
+        candidates = min(self.rescore_candidates, distances.shape[1])
+        if candidates == 0:
+            return
+
+        closest = np.argpartition(distances, candidates - 1, axis=1)[:, :candidates]
+        for row, columns in enumerate(closest):
+            # Sorted rows keep reads from the memory-mapped file sequential
+            columns = np.sort(columns)
+            matrix_rows = columns if rows is None else rows[columns]
+            query = queries[row : row + 1]
+            dots = query @ self._rescore_embeddings[matrix_rows].T
+            distances[row, columns] = self._to_distances(
+                dots, query, self._squared_norms[matrix_rows]
+            )[0]
+
+    def _measure_quality(self, matrix: np.ndarray, probes: int = 32) -> dict:
+        """Compare quantized against exact scoring on a sample of stored vectors."""
+        if len(matrix) == 0:
+            return {}
+
+        rng = np.random.default_rng(0)
+        sample = matrix[rng.choice(len(matrix), min(probes, len(matrix)), False)]
+        exact = self._to_distances(sample @ matrix.T, sample, self._squared_norms)
+        approximate = self._to_distances(
+            self.embeddings.dot(sample), sample, self._squared_norms
+        )
+        report = evaluate_ranking(exact, approximate, k=100)
+        logger.info(
+            "Quantized %s index keeps %s of exact ranking (%d -> %d bytes)",
+            self.dtype,
+            report,
+            matrix.nbytes,
+            self.embeddings.nbytes,
+        )
+        return report
+
+    def query(self, query) -> Tuple[List[str], np.ndarray]:
+        """
+        Rank every indexed embedding against the query.
+
+        Args:
+            query: Query embedding
+
+        Returns:
+            tuple: Ids and distances sorted by ascending distance
+        """
+        distances = self.distances(query)
+        order = np.argsort(distances, kind="stable")
+        return self.ids[order].tolist(), distances[order]
+
+    def save(self, path: str) -> None:
+        """
+        Write the index in its scoring layout so it can be memory-mapped.
+
+        A quantized index that rescores also writes its float32 embeddings, so
+        loading it can rescore without a copy of its own.
+
+        Args:
+            path: Directory to write the index files to
+        """
+        os.makedirs(path, exist_ok=True)
+        if isinstance(self.embeddings, QuantizedMatrix):
+            np.save(os.path.join(path, EMBEDDINGS_FILE), self.embeddings.values)
+            if self.embeddings.scales is not None:
+                np.save(os.path.join(path, SCALES_FILE), self.embeddings.scales)
+        else:
+            np.save(os.path.join(path, EMBEDDINGS_FILE), self.embeddings)
+        if self._rescore_embeddings is not None:
+            np.save(os.path.join(path, EXACT_EMBEDDINGS_FILE), self._rescore_embeddings)
+        np.save(os.path.join(path, SQUARED_NORMS_FILE), self._squared_norms)
+        with open(os.path.join(path, IDS_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.ids.tolist(), f)
+        with open(os.path.join(path, INDEX_INFO_FILE), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "space": self.space,
+                    "dtype": self.dtype,
+                    "count": len(self),
+                    "dimension": self.dimension,
+                    "quality_report": self.quality_report,
+                },
+                f,
+            )
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        shards: int = 1,
+        dtype: Optional[str] = None,
+        rescore_candidates: int = 0,
+    ):
+        """
+        Open an index written by `save` without copying its matrices.
+
+        The embeddings are memory-mapped read-only, so every worker on a host
+        shares the same page-cached data and opening the index is cheap.
+        Rescoring reads the exact embeddings of the index straight from their
+        memory-mapped file. An index is never converted on load, so one that
+        cannot be scored as requested is refused.
+
+        Args:
+            path: Directory holding the index files
+            shards: Number of parallel scoring shards
+            dtype: Storage to score with, or None for the stored one
+            rescore_candidates: Number of closest quantized candidates
+                rescored exactly, which needs float32 embeddings on disk
+
+        Returns:
+            EmbeddingIndex: Index ready for queries
+
+        Raises:
+            ValueError: If the index is stored in another `dtype`, or holds no
+                float32 embeddings to rescore with
+        """
+        with open(os.path.join(path, INDEX_INFO_FILE), encoding="utf-8") as f:
+            info = json.load(f)
+        with open(os.path.join(path, IDS_FILE), encoding="utf-8") as f:
+            ids = json.load(f)
+        dtype = dtype or info["dtype"]
+        if dtype != info["dtype"]:
+            raise ValueError(
+                f"Index at {path} is stored as {info['dtype']}, not {dtype}; "
+                f"export it as {dtype}"
+            )
+
+        values = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+        if dtype == "float32":
+            embeddings = values
+        else:
+            scales_path = os.path.join(path, SCALES_FILE)
+            embeddings = QuantizedMatrix(
+                values,
+                np.load(scales_path) if os.path.exists(scales_path) else None,
+            )
+
+        rescore_embeddings = None
+        if rescore_candidates > 0 and dtype != "float32":
+            exact_path = os.path.join(path, EXACT_EMBEDDINGS_FILE)
+            if not os.path.exists(exact_path):
+                raise ValueError(
+                    f"Index at {path} holds no float32 embeddings to rescore, "
+                    "export it with rescoring"
+                )
+            rescore_embeddings = np.load(exact_path, mmap_mode="r")
+
+        index = cls.__new__(cls)
+        index._initialize(
+            ids,
+            info["space"],
+            dtype,
+            embeddings,
+            np.load(os.path.join(path, SQUARED_NORMS_FILE), mmap_mode="r"),
+            rescore_candidates=rescore_candidates,
+            shards=shards,
+            rescore_embeddings=rescore_embeddings,
+            quality_report=info.get("quality_report"),
+        )
+        return index
+
+    @classmethod
+    async def from_collection(cls, collection, page_size: int = 1000, **kwargs):
+        """
+        Build an index from every embedding stored in a ChromaDB collection.
+
+        Args:
+            collection: Async ChromaDB collection
+            page_size: Number of records fetched per request
+            **kwargs: Index options such as `dtype`, `rescore_candidates`,
+                `shards` and `spill_dir`
+
+        Returns:
+            EmbeddingIndex: Index holding the collection embeddings
+        """
+        total = await collection.count()
+        logger.info(
+            "Loading %d embeddings from collection '%s' into memory",
+            total,
+            collection.name,
+        )
+
+        ids: List[str] = []
+        pages: List[np.ndarray] = []
+        for offset in range(0, total, page_size):
+            page = await collection.get(
+                include=["embeddings"], limit=page_size, offset=offset
+            )
+            ids.extend(page["ids"])
+            pages.append(np.asarray(page["embeddings"], dtype=np.float32))
+
+        embeddings = (
+            np.concatenate(pages) if pages else np.empty((0, 0), dtype=np.float32)
+        )
+        space = collection_space(collection.metadata)
+
+        index = cls(ids, embeddings, space=space, **kwargs)
+        logger.info(
+            "Loaded %s index for '%s' with %d embeddings "
+            "(dimension %d, space %s, %d bytes)",
+            index.dtype,
+            collection.name,
+            len(index),
+            index.dimension,
+            space,
+            index.nbytes,
+        )
+        return index
@@ -5,6 +5,7 @@ This module provides helper functions shared across different services.
 """
 
 import asyncio
+import hashlib
 import io
 import uuid
 import logging
@@ -100,3 +101,36 @@ async def change_link_storage_to_gs(link: str) -> str:
     return link.replace("https://storage.googleapis.com/", "gs://")
 
 
+async def get_cv_content_hash(storage_client, cv_link: str) -> str:
+    """
+    Compute a content hash identifying a CV file.
+
+    Objects in Google Cloud Storage are identified by the MD5 checksum kept in
+    their metadata, so the file does not have to be downloaded. Other links are
+    downloaded and hashed with SHA-256.
+
+    Args:
+        storage_client: Google Cloud Storage client
+        cv_link: gs:// link or public URL to the CV file
+
+    Returns:
+        str: Content hash prefixed with the algorithm name
+    """
+    if not cv_link.startswith("gs://"):
+        cv_content = await download_user_cv(cv_link)
+        return f"sha256:{hashlib.sha256(cv_content).hexdigest()}"
+
+    bucket_name, _, blob_name = cv_link.removeprefix("gs://").partition("/")
+
+    def fetch_hash():
+        blob = storage_client.bucket(bucket_name).get_blob(blob_name)
+        if blob is None:
+            raise FileNotFoundError(f"CV not found in storage: {cv_link}")
+        if blob.md5_hash:
+            return f"md5:{blob.md5_hash}"
+
+        # Composite objects have no MD5 checksum, hash the content instead
+        return f"sha256:{hashlib.sha256(blob.download_as_bytes()).hexdigest()}"
+
+    logger.info("Fetching content hash for %s", cv_link)
+    return await asyncio.to_thread(fetch_hash)
@@ -0,0 +1,319 @@
+"""
+Recall@k evaluation of approximate and quantized job retrieval.
+
+This module takes the exact ranking of the full-corpus `query_collection` flow
+as ground truth and measures how well alternative `EmbeddingIndex`
+configurations, quantized or sharded, keep it. For every configuration it
+reports recall@10/50/100, the error of the distances it returns, and its query
+latency next to that of the exact flow. Corpora are synthetic, or the job
+description embeddings of a float32 corpus snapshot written by
+`export_corpus_snapshot.py`.
+
+Run it from the repository root:
+
+    python -m benchmarks.recall_benchmark --sizes 30k --snapshot snapshot
+"""
+
+from typing import Dict, List, Sequence
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from app.utils.recommendation.corpus_snapshot import load_snapshot_index
+from app.utils.recommendation.recommendation_utils import query_collection
+from app.utils.recommendation.vector_index import EmbeddingIndex
+from benchmarks.synthetic import (
+    EMBEDDING_DIMENSION,
+    InMemoryCollection,
+    SyntheticCorpus,
+    parse_size,
+    report_metadata,
+    time_calls,
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = "3k,30k,300k"
+
+DEFAULT_KS = "10,50,100"
+
+# Configuration name -> `EmbeddingIndex` options compared with the exact flow
+CONFIGURATIONS: Dict[str, dict] = {
+    "float32": {"dtype": "float32"},
+    "float32-sharded": {"dtype": "float32", "shards": os.cpu_count() or 1},
+    "float16": {"dtype": "float16"},
+    "int8": {"dtype": "int8"},
+    "int8-rescore": {"dtype": "int8", "rescore_candidates": 200},
+    "int8-sharded": {"dtype": "int8", "shards": os.cpu_count() or 1},
+}
+
+
+def load_snapshot_corpus(path: str, queries: int, seed: int = 0):
+    """
+    Split the job description embeddings of a snapshot into corpus and queries.
+
+    Sampled jobs are held out of the corpus and used as queries, so no query
+    finds itself.
+
+    Args:
+        path: Directory of a float32 corpus snapshot
+        queries: Number of jobs held out as queries
+        seed: Seed of the sampled jobs
+
+    Returns:
+        tuple: Corpus ids, corpus embeddings and query embeddings
+    """
+    index = load_snapshot_index(path, "job_desc_req_documents")
+    if index.dtype != "float32" or index.space != "l2":
+        raise ValueError(
+            f"Ground truth needs a float32 l2 snapshot, got {index.dtype} "
+            f"{index.space}; export one with --dtype float32"
+        )
+
+    rng = np.random.default_rng(seed)
+    held_out = np.zeros(len(index), dtype=bool)
+    held_out[rng.choice(len(index), min(queries, len(index) - 1), False)] = True
+    embeddings = np.asarray(index.embeddings, dtype=np.float32)
+    return (
+        index.ids[~held_out].tolist(),
+        embeddings[~held_out],
+        embeddings[held_out],
+    )
+
+
+async def exact_rankings(collection, queries: np.ndarray, k: int):
+    """
+    Rank the corpus for every query with the full-corpus `query_collection` flow.
+
+    Args:
+        collection: Collection holding the corpus
+        queries: Query embeddings
+        k: Ranking depth
+
+    Returns:
+        tuple: Ranked ids of every query and the latency summary of the queries
+    """
+    rankings: List[List[str]] = []
+
+    async def query(number: int) -> None:
+        results = await query_collection(collection, queries[number].tolist(), k)
+        rankings.append(results["ids"][0])
+
+    summary = await time_calls(query, len(queries))
+    return rankings, summary
+
+
+async def evaluate_configuration(
+    ids: Sequence[str],
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    exact_ids: List[List[str]],
+    ks: Sequence[int],
+    options: dict,
+) -> dict:
+    """
+    Compare the ranking of one index configuration with the exact ranking.
+
+    Args:
+        ids: Corpus ids
+        embeddings: Corpus embeddings
+        queries: Query embeddings
+        exact_ids: Exact ranked ids of every query
+        ks: Ranking depths at which recall is measured
+        options: `EmbeddingIndex` options of the configuration
+
+    Returns:
+        dict: Build time, recall@k at every depth, the mean and max absolute
+        error of the returned distances, and the query latency summary
+    """
+    build_start_time = time.perf_counter()
+    index = EmbeddingIndex(ids, embeddings, **options)
+    build_seconds = time.perf_counter() - build_start_time
+
+    depth = max(ks)
+    rankings = []
+
+    async def query(number: int) -> None:
+        rankings.append(index.top_k(queries[number : number + 1], depth))
+
+    summary = await time_calls(query, len(queries))
+
+    recalls = {k: [] for k in ks}
+    errors = []
+    for query_embedding, expected, (positions, distances, _) in zip(
+        queries, exact_ids, rankings
+    ):
+        ranked_ids = index.ids[positions[0]].tolist()
+        for k in ks:
+            recalls[k].append(len(set(ranked_ids[:k]) & set(expected[:k])) / k)
+
+        # Squared euclidean distance, like the exact flow
+        exact_distances = np.sum(
+            (embeddings[positions[0]] - query_embedding) ** 2, axis=1
+        )
+        errors.append(np.abs(distances[0] - exact_distances))
+
+    errors = np.concatenate(errors)
+    return {
+        "build_seconds": build_seconds,
+        **{f"recall@{k}": float(np.mean(recalls[k])) for k in ks},
+        "mean_distance_error": float(errors.mean()),
+        "max_distance_error": float(errors.max()),
+        **summary,
+    }
+
+
+async def evaluate_dataset(
+    name: str,
+    ids: Sequence[str],
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    ks: Sequence[int],
+    configurations: Sequence[str],
+) -> List[dict]:
+    """Evaluate every configuration on one corpus against its exact ranking."""
+    logger.info(
+        "Ranking %d jobs exactly for %d queries on %s",
+        len(ids),
+        len(queries),
+        name,
+    )
+    collection = InMemoryCollection("job_desc_req_documents", ids, embeddings)
+    exact_ids, exact_summary = await exact_rankings(collection, queries, max(ks))
+
+    results = [
+        {
+            "dataset": name,
+            "size": len(ids),
+            "configuration": "exact",
+            **{f"recall@{k}": 1.0 for k in ks},
+            "mean_distance_error": 0.0,
+            "max_distance_error": 0.0,
+            **exact_summary,
+        }
+    ]
+    for configuration in configurations:
+        results.append(
+            {
+                "dataset": name,
+                "size": len(ids),
+                "configuration": configuration,
+                **await evaluate_configuration(
+                    ids,
+                    embeddings,
+                    queries,
+                    exact_ids,
+                    ks,
+                    CONFIGURATIONS[configuration],
+                ),
+            }
+        )
+
+    for result in results:
+        recalls = "  ".join(f"recall@{k} {result[f'recall@{k}']:.4f}" for k in ks)
+        print(
+            f"{name:<16} {result['configuration']:<16} {recalls}  "
+            f"distance error {result['mean_distance_error']:.2e} mean "
+            f"{result['max_distance_error']:.2e} max  "
+            f"p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms"
+        )
+    return results
+
+
+async def run_benchmark(args) -> dict:
+    """Evaluate every configuration on every corpus and return the JSON report."""
+    ks = [int(k) for k in args.ks.split(",")]
+    configurations = args.configurations.split(",")
+    results = []
+
+    for size in [parse_size(size) for size in args.sizes.split(",") if size]:
+        corpus = SyntheticCorpus(size, args.queries, args.dimension, seed=args.seed)
+        results.extend(
+            await evaluate_dataset(
+                f"synthetic-{size}",
+                corpus.job_ids,
+                corpus.job_desc_embeddings,
+                corpus.cv_embeddings,
+                ks,
+                configurations,
+            )
+        )
+        del corpus
+
+    if args.snapshot:
+        ids, embeddings, queries = load_snapshot_corpus(
+            args.snapshot, args.queries, args.seed
+        )
+        results.extend(
+            await evaluate_dataset(
+                "snapshot", ids, embeddings, queries, ks, configurations
+            )
+        )
+
+    return {
+        "benchmark": "recall",
+        **report_metadata(),
+        "config": {
+            "queries": args.queries,
+            "dimension": args.dimension,
+            "ks": ks,
+            "seed": args.seed,
+            "snapshot": args.snapshot,
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure recall@k of quantized and sharded job indexes."
+    )
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=(
+            f"Comma-separated synthetic corpus sizes, empty to skip them "
+            f"(default: {DEFAULT_SIZES})"
+        ),
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="Float32 corpus snapshot whose job embeddings are also evaluated",
+    )
+    parser.add_argument(
+        "--configurations",
+        default=",".join(CONFIGURATIONS),
+        help=f"Comma-separated configurations out of: {', '.join(CONFIGURATIONS)}",
+    )
+    parser.add_argument("--ks", default=DEFAULT_KS, help="Comma-separated depths")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=EMBEDDING_DIMENSION)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        default="benchmarks/results/recall.json",
+        help="Path of the JSON report",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        help="Log level of the service code, kept quiet to avoid timing log output",
+    )
+    args = parser.parse_args()
+
+    unknown = set(args.configurations.split(",")) - set(CONFIGURATIONS)
+    if unknown:
+        parser.error(f"Unknown configurations: {', '.join(sorted(unknown))}")
+    logging.getLogger("app").setLevel(args.log_level)
+
+    report = asyncio.run(run_benchmark(args))
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info("Wrote recall results to %s", args.output)
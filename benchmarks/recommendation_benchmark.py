@@ -0,0 +1,335 @@
+"""
+Recommendation path benchmark on synthetic corpora.
+
+This module generates synthetic job and CV corpora of increasing size and runs
+`get_recommendations` against them with ChromaDB queries, served by an
+in-process stand-in collection, and with the in-process job indexes. It also
+runs the pandas helpers `create_dataframe_from_results` and `merge_dataframes`.
+For every corpus size and scenario it reports p50/p95/p99 latency, throughput
+and peak resident memory. The results are written as JSON and can be compared
+against the results of another commit.
+
+Run it from the repository root:
+
+    python -m benchmarks.recommendation_benchmark --sizes 3k,30k
+"""
+
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+from fastapi.responses import JSONResponse
+
+from app.api.routes.recommendation_engine_services import get_recommendations
+from app.utils.recommendation.recommendation_utils import (
+    create_dataframe_from_results,
+    lookup_rows,
+    merge_dataframes,
+    query_collection,
+)
+from app.utils.recommendation.vector_index import EmbeddingIndex
+from benchmarks.synthetic import (
+    EMBEDDING_DIMENSION,
+    InMemoryCollection,
+    PeakRSSSampler,
+    SyntheticCorpus,
+    parse_size,
+    report_metadata,
+    time_calls,
+)
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = "3k,30k,300k,1m"
+
+# Scenario name -> in-process index options, None to score with collection
+# queries. "dataframe" runs the pandas helpers instead of the endpoint.
+SCENARIOS: Dict[str, Optional[dict]] = {
+    "dataframe": None,
+    "chroma": None,
+    "index": {"dtype": "float32"},
+    "index-int8": {"dtype": "int8"},
+    "index-sharded": {"dtype": "float32", "shards": os.cpu_count() or 1},
+}
+
+
+def build_state(corpus: SyntheticCorpus, index_options: Optional[dict]):
+    """
+    Build the application state read by `get_recommendations`.
+
+    Args:
+        corpus: Synthetic corpus served by the collections and indexes
+        index_options: `EmbeddingIndex` options, or None to leave the job
+            indexes unset so jobs are scored with collection queries
+
+    Returns:
+        SimpleNamespace: State with collections, indexes and no caches
+    """
+    state = SimpleNamespace(
+        job_desc_collection=InMemoryCollection(
+            "job_desc_req_documents", corpus.job_ids, corpus.job_desc_embeddings
+        ),
+        job_titles_collection=InMemoryCollection(
+            "job_titles_documents", corpus.job_ids, corpus.job_title_embeddings
+        ),
+        user_cv_embeddings_collection=InMemoryCollection(
+            "user_cv_embeddings", corpus.user_ids, corpus.cv_embeddings
+        ),
+        job_desc_index=None,
+        job_titles_index=None,
+        job_titles_rows=None,
+        job_filter_index=None,
+        recommendation_cache=None,
+        feed_store=None,
+    )
+    if index_options is not None:
+        state.job_desc_index = EmbeddingIndex(
+            corpus.job_ids, corpus.job_desc_embeddings, **index_options
+        )
+        state.job_titles_index = EmbeddingIndex(
+            corpus.job_ids, corpus.job_title_embeddings, **index_options
+        )
+        state.job_titles_rows = lookup_rows(
+            state.job_desc_index.ids, state.job_titles_index.ids
+        )
+    return state
+
+
+async def run_scenario(
+    corpus: SyntheticCorpus,
+    scenario: str,
+    mode: str,
+    queries: int,
+    warmup: int,
+    limit: int,
+) -> dict:
+    """
+    Build the state of a scenario and time its recommendation calls.
+
+    Args:
+        corpus: Synthetic corpus to score against
+        scenario: Name of a scenario in SCENARIOS
+        mode: "description" or "hybrid" title + description scoring
+        queries: Number of timed calls
+        warmup: Number of untimed calls made first
+        limit: Number of recommendations requested per call
+
+    Returns:
+        dict: Build time, latency summary and peak resident memory
+    """
+    with PeakRSSSampler() as sampler:
+        build_start_time = time.perf_counter()
+        state = build_state(corpus, SCENARIOS[scenario])
+        build_seconds = time.perf_counter() - build_start_time
+        request = SimpleNamespace(app=SimpleNamespace(state=state))
+
+        async def recommend(number: int) -> None:
+            response = await get_recommendations(
+                request,
+                user_id=corpus.user_ids[number % len(corpus.user_ids)],
+                limit=limit,
+                cursor=None,
+                mode=mode,
+                title_weight=0.6,
+                cv_scoring="whole",
+                working_location=None,
+                working_location_type=None,
+                employment_type=None,
+                experience_years=None,
+                category=None,
+                salary_min=None,
+                salary_max=None,
+                api_key=None,
+            )
+            if isinstance(response, JSONResponse):
+                raise RuntimeError(response.body.decode())
+
+        async def recommend_with_dataframes(number: int) -> None:
+            cv_embedding = corpus.cv_embeddings[number % len(corpus.user_ids)].tolist()
+            if mode == "hybrid":
+                job_desc_results, job_title_results = await asyncio.gather(
+                    query_collection(state.job_desc_collection, cv_embedding),
+                    query_collection(state.job_titles_collection, cv_embedding),
+                )
+                job_title_df = create_dataframe_from_results(
+                    job_title_results, "job_title"
+                )
+            else:
+                job_desc_results = await query_collection(
+                    state.job_desc_collection, cv_embedding
+                )
+                job_title_df = None
+            merge_dataframes(
+                create_dataframe_from_results(job_desc_results, "job_description"),
+                job_title_df,
+            ).head(limit)
+
+        summary = await time_calls(
+            recommend_with_dataframes if scenario == "dataframe" else recommend,
+            queries,
+            warmup,
+        )
+
+    return {
+        "build_seconds": build_seconds,
+        **summary,
+        "peak_rss_mb": sampler.peak_bytes / 2**20,
+    }
+
+
+def compare_results(results: List[dict], baseline: dict, max_regression: float):
+    """
+    Compare results with the results of another run.
+
+    Args:
+        results: Results of this run
+        baseline: JSON report of the other run
+        max_regression: Largest accepted relative increase of p95 latency
+
+    Returns:
+        list: Size, scenario and mode of every result regressing beyond
+        `max_regression`
+    """
+    baseline_results = {
+        (result["size"], result["scenario"], result["mode"]): result
+        for result in baseline["results"]
+    }
+    regressions = []
+    for result in results:
+        key = (result["size"], result["scenario"], result["mode"])
+        previous = baseline_results.get(key)
+        if previous is None:
+            continue
+        p95_change = result["p95_ms"] / previous["p95_ms"] - 1
+        throughput_change = result["throughput_qps"] / previous["throughput_qps"] - 1
+        print(
+            f"{key[0]:>9} {key[1]:<14} {key[2]:<12} "
+            f"p95 {previous['p95_ms']:9.2f} -> {result['p95_ms']:9.2f} ms "
+            f"({p95_change:+.1%}), throughput {throughput_change:+.1%}"
+        )
+        if p95_change > max_regression:
+            regressions.append(key)
+    return regressions
+
+
+async def run_benchmark(args) -> dict:
+    """Run every scenario on every corpus size and return the JSON report."""
+    results = []
+    for size in [parse_size(size) for size in args.sizes.split(",")]:
+        logger.info("Generating synthetic corpus of %d jobs", size)
+        corpus_start_time = time.perf_counter()
+        corpus = SyntheticCorpus(size, args.users, args.dimension, seed=args.seed)
+        logger.info(
+            "Generated %.0f MB of embeddings in %.2f seconds",
+            corpus.nbytes / 2**20,
+            time.perf_counter() - corpus_start_time,
+        )
+
+        for scenario in args.scenarios.split(","):
+            for mode in args.modes.split(","):
+                result = {
+                    "size": size,
+                    "scenario": scenario,
+                    "mode": mode,
+                    **await run_scenario(
+                        corpus, scenario, mode, args.queries, args.warmup, args.limit
+                    ),
+                    "corpus_mb": corpus.nbytes / 2**20,
+                }
+                results.append(result)
+                print(
+                    f"{size:>9} {scenario:<14} {mode:<12} "
+                    f"p50 {result['p50_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms  "
+                    f"p99 {result['p99_ms']:9.2f} ms  "
+                    f"{result['throughput_qps']:9.1f} q/s  "
+                    f"peak RSS {result['peak_rss_mb']:8.0f} MB"
+                )
+        del corpus
+
+    return {
+        "benchmark": "recommendations",
+        **report_metadata(),
+        "config": {
+            "users": args.users,
+            "dimension": args.dimension,
+            "queries": args.queries,
+            "warmup": args.warmup,
+            "limit": args.limit,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark recommendations on synthetic job and CV corpora."
+    )
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=f"Comma-separated job corpus sizes (default: {DEFAULT_SIZES})",
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help=f"Comma-separated scenarios out of: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--modes",
+        default="description,hybrid",
+        help="Comma-separated scoring modes: description, hybrid",
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--dimension", type=int, default=EMBEDDING_DIMENSION)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        default="benchmarks/results/recommendations.json",
+        help="Path of the JSON report",
+    )
+    parser.add_argument(
+        "--baseline", help="JSON report of another commit to compare against"
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Fail when p95 latency grows by more than this fraction of the baseline",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        help="Log level of the service code, kept quiet to avoid timing log output",
+    )
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    logging.getLogger("app").setLevel(args.log_level)
+
+    report = asyncio.run(run_benchmark(args))
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info("Wrote benchmark results to %s", args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(
+                report["results"], json.load(f), args.max_regression
+            )
+        if regressions:
+            logger.error("p95 latency regressed in %d results", len(regressions))
+            sys.exit(1)
@@ -0,0 +1,284 @@
+"""
+Synthetic corpora and measurement helpers for the benchmarks.
+
+This module generates clustered job and CV embeddings of any size, serves them
+through a stand-in for an async ChromaDB collection, and measures latency
+percentiles and the resident memory of the process, so the recommendation path
+can be benchmarked without a ChromaDB server or the embedding model.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Dimension of the `text-multilingual-embedding-002` embeddings
+EMBEDDING_DIMENSION = 768
+
+# Rows generated per block, bounding temporary memory on large corpora
+GENERATION_BLOCK_ROWS = 65536
+
+# Interval between resident memory samples
+RSS_SAMPLE_SECONDS = 0.01
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(text: str) -> int:
+    """Parse a corpus size such as "300k", "1m" or "3000"."""
+    text = text.strip().lower()
+    if text[-1:] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+class SyntheticCorpus:
+    """
+    Job description, job title and CV embeddings drawn around shared clusters.
+
+    Jobs are spread around `clusters` random centers, like postings of the same
+    field, titles lie close to their job description, and CVs are drawn around
+    the same centers, so rankings have structure instead of uniform noise.
+    """
+
+    def __init__(
+        self,
+        jobs: int,
+        users: int,
+        dimension: int = EMBEDDING_DIMENSION,
+        clusters: int = 64,
+        seed: int = 0,
+    ) -> None:
+        rng = np.random.default_rng(seed)
+        self.centers = rng.standard_normal((clusters, dimension), dtype=np.float32)
+        self.job_ids = [f"job{row}" for row in range(jobs)]
+        self.user_ids = [f"user{row}" for row in range(users)]
+        self.job_desc_embeddings = self._sample(rng, jobs, noise=0.8)
+        self.job_title_embeddings = np.empty_like(self.job_desc_embeddings)
+        for start in range(0, jobs, GENERATION_BLOCK_ROWS):
+            block = self.job_desc_embeddings[start : start + GENERATION_BLOCK_ROWS]
+            self.job_title_embeddings[start : start + len(block)] = block + 0.5 * (
+                rng.standard_normal(block.shape, dtype=np.float32)
+            )
+        self.cv_embeddings = self._sample(rng, users, noise=1.0)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by every embedding matrix of the corpus."""
+        return (
+            self.job_desc_embeddings.nbytes
+            + self.job_title_embeddings.nbytes
+            + self.cv_embeddings.nbytes
+        )
+
+    def _sample(self, rng, rows: int, noise: float) -> np.ndarray:
+        """Draw rows around random cluster centers, block by block."""
+        matrix = np.empty((rows, self.centers.shape[1]), dtype=np.float32)
+        for start in range(0, rows, GENERATION_BLOCK_ROWS):
+            stop = min(start + GENERATION_BLOCK_ROWS, rows)
+            clusters = rng.integers(0, len(self.centers), stop - start)
+            matrix[start:stop] = self.centers[clusters] + noise * rng.standard_normal(
+                (stop - start, matrix.shape[1]), dtype=np.float32
+            )
+        return matrix
+
+
+class InMemoryCollection:
+    """
+    Stand-in for an async ChromaDB collection in the `l2` space.
+
+    Implements the `count`, `get` and `query` calls made by the recommendation
+    path with exact brute-force search, returning results in the ChromaDB
+    layout. Documents are generated from the record ids.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ids: Sequence[str],
+        embeddings: np.ndarray,
+        metadata: Optional[dict] = None,
+    ) -> None:
+        self.name = name
+        self.metadata = metadata or {}
+        self.ids = list(ids)
+        self.embeddings = embeddings
+        self._rows: Dict[str, int] = {
+            record_id: row for row, record_id in enumerate(ids)
+        }
+        self._squared_norms = np.einsum("ij,ij->i", embeddings, embeddings)
+
+    async def count(self) -> int:
+        return len(self.ids)
+
+    async def get(
+        self,
+        ids=None,
+        include: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> dict:
+        if ids is not None:
+            ids = [ids] if isinstance(ids, str) else ids
+            rows = [
+                self._rows[record_id] for record_id in ids if record_id in self._rows
+            ]
+        else:
+            start = offset or 0
+            rows = list(
+                range(start, min(start + (limit or len(self.ids)), len(self.ids)))
+            )
+
+        include = include or []
+        return {
+            "ids": [self.ids[row] for row in rows],
+            "embeddings": self.embeddings[rows] if "embeddings" in include else None,
+            "documents": (
+                [self._document(row) for row in rows]
+                if "documents" in include
+                else None
+            ),
+            "metadatas": [None] * len(rows) if "metadatas" in include else None,
+        }
+
+    async def query(self, query_embeddings, n_results: int = 10, include=None) -> dict:
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        n_results = min(n_results, len(self.ids))
+        # Squared euclidean distance, as reported by ChromaDB for `l2`
+        distances = (
+            self._squared_norms[None, :]
+            - 2.0 * (queries @ self.embeddings.T)
+            + np.einsum("ij,ij->i", queries, queries)[:, None]
+        )
+
+        results = {"ids": [], "documents": [], "distances": []}
+        for row_distances in distances:
+            top = np.argpartition(row_distances, n_results - 1)[:n_results]
+            top = top[np.argsort(row_distances[top], kind="stable")]
+            results["ids"].append([self.ids[row] for row in top])
+            results["documents"].append([self._document(row) for row in top])
+            results["distances"].append(row_distances[top].tolist())
+        return results
+
+    def _document(self, row: int) -> str:
+        return f"Synthetic document of {self.ids[row]}"
+
+
+def current_rss_bytes() -> int:
+    """Return the resident set size of the process, or its peak without /proc."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakRSSSampler:
+    """
+    Context manager sampling the resident set size on a background thread.
+
+    Unlike `ru_maxrss`, which only grows over the life of the process, the peak
+    is measured within the block, so scenarios run one after another each get
+    their own peak.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS) -> None:
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self.peak_bytes = current_rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+
+def summarize_latencies(latencies: Sequence[float], elapsed: float) -> dict:
+    """
+    Summarize per-call latencies.
+
+    Args:
+        latencies: Duration of every timed call in seconds
+        elapsed: Wall time of all timed calls in seconds
+
+    Returns:
+        dict: Call count, mean and p50/p95/p99 latency in milliseconds, and
+        throughput in calls per second
+    """
+    milliseconds = np.asarray(latencies, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+    return {
+        "queries": len(milliseconds),
+        "mean_ms": float(milliseconds.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "throughput_qps": len(milliseconds) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+async def time_calls(call, count: int, warmup: int = 0) -> dict:
+    """
+    Time sequential calls of a coroutine function.
+
+    Args:
+        call: Coroutine function called with the call number
+        count: Number of timed calls
+        warmup: Number of untimed calls made first
+
+    Returns:
+        dict: Latency summary from `summarize_latencies`
+    """
+    for number in range(warmup):
+        await call(number)
+
+    latencies = []
+    start_time = time.perf_counter()
+    for number in range(warmup, warmup + count):
+        call_start = time.perf_counter()
+        await call(number)
+        latencies.append(time.perf_counter() - call_start)
+    return summarize_latencies(latencies, time.perf_counter() - start_time)
+
+
+def report_metadata() -> dict:
+    """Return the commit, time and environment a benchmark report was made on."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "created_at": time.time(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+    }
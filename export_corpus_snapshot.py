@@ -0,0 +1,73 @@
+"""
+Job corpus snapshot export entry point.
+
+This module exports the job collections from ChromaDB into a local snapshot
+that API workers memory-map at startup. Run it after every ingestion so the
+snapshot matches the current corpus version.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.api.core.core import (
+    create_chroma_client,
+    RECOMMENDATION_INDEX_DTYPE,
+    RECOMMENDATION_INDEX_RESCORE_CANDIDATES,
+    RECOMMENDATION_SNAPSHOT_PATH,
+)
+from app.utils.recommendation.corpus_snapshot import export_corpus_snapshot
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+async def export_snapshot(
+    output_path: str, dtype: str, rescore: bool, page_size: int
+) -> None:
+    """
+    Export the job collections into a corpus snapshot.
+
+    Args:
+        output_path: Directory of the snapshot
+        dtype: Storage of the embedding matrices (float32, float16 or int8)
+        rescore: Also write the float32 embeddings used for rescoring
+        page_size: Number of records fetched per request
+    """
+    chroma_client = await create_chroma_client()
+    manifest = await export_corpus_snapshot(
+        chroma_client, output_path, dtype=dtype, rescore=rescore, page_size=page_size
+    )
+    logger.info(
+        "Exported corpus version %s: %s",
+        manifest["corpus_version"],
+        manifest["collections"],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export the job collections into a memory-mappable snapshot."
+    )
+    parser.add_argument(
+        "--output",
+        default=RECOMMENDATION_SNAPSHOT_PATH or "snapshot",
+        help="Snapshot directory (defaults to RECOMMENDATION_SNAPSHOT_PATH)",
+    )
+    parser.add_argument(
+        "--dtype",
+        default=RECOMMENDATION_INDEX_DTYPE,
+        choices=["float32", "float16", "int8"],
+        help="Storage of the embedding matrices (defaults to RECOMMENDATION_INDEX_DTYPE)",
+    )
+    parser.add_argument(
+        "--rescore",
+        action=argparse.BooleanOptionalAction,
+        default=RECOMMENDATION_INDEX_RESCORE_CANDIDATES > 0,
+        help="Write the float32 embeddings used to rescore a quantized matrix "
+        "(defaults to on when RECOMMENDATION_INDEX_RESCORE_CANDIDATES is set)",
+    )
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(export_snapshot(args.output, args.dtype, args.rescore, args.page_size))
@@ -0,0 +1,186 @@
+"""
+Job collection ingestion entry point.
+
+This module loads job postings from MongoDB, a JSON export or the CSV exports
+under `data/`, and embeds and upserts them into the `job_titles_documents` and
+`job_desc_req_documents` collections. With `--sync` only new or changed jobs
+are embedded and closed jobs are deleted, so a nightly run scales with churn.
+The similar jobs graph is then updated for the changed jobs and the BM25 index
+is rebuilt. An interrupted run resumes from its checkpoint when started again
+with the same arguments.
+"""
+
+from typing import Optional
+import argparse
+import asyncio
+import logging
+
+from app.api.core.core import (
+    create_chroma_client,
+    gemini_client_vertex_ai,
+    JOB_SOURCE,
+    EMBEDDING_CACHE_PATH,
+    SIMILAR_JOBS_GRAPH_PATH,
+    LEXICAL_INDEX_PATH,
+)
+from app.utils.ingestion.checkpoint import IngestionCheckpoint
+from app.utils.ingestion.pipeline import (
+    CORPUS_VERSION_COLLECTION,
+    MAX_REMOVED_FRACTION,
+    fetch_content_hashes,
+    ingest_jobs,
+)
+from app.utils.ingestion.rate_limiter import AdaptiveRateLimiter
+from app.utils.recommendation.embedding_cache import EmbeddingCache
+from app.utils.recommendation.job_sources import load_jobs
+from app.utils.recommendation.lexical_index import BM25Index
+from app.utils.recommendation.similar_jobs import refresh_similar_jobs_graph
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+async def run_ingestion(
+    source: str,
+    checkpoint_path: str,
+    concurrency: int,
+    batch_size: int,
+    upsert_batch_size: int,
+    texts_per_minute: float,
+    sync: bool = False,
+    embedding_cache_path: Optional[str] = None,
+    similar_jobs_graph_path: Optional[str] = None,
+    similar_jobs_k: int = 50,
+    lexical_index_path: Optional[str] = None,
+    max_removed_fraction: float = MAX_REMOVED_FRACTION,
+    force: bool = False,
+) -> None:
+    """
+    Ingest every job of a source into the job collections.
+
+    Args:
+        source: "mongo", a JSON export or a data directory of CSV exports
+        checkpoint_path: Directory holding the progress of the run
+        concurrency: Maximum number of embedding requests in flight
+        batch_size: Number of texts per embedding request
+        upsert_batch_size: Number of records per upsert
+        texts_per_minute: Initial embedding rate, adapted to the quota
+        sync: Diff against the indexed jobs instead of rebuilding
+        embedding_cache_path: SQLite embedding cache, None to always call the model
+        similar_jobs_graph_path: Directory of the similar jobs graph, None to skip it
+        similar_jobs_k: Number of similar jobs kept per job
+        lexical_index_path: Directory of the BM25 index, None to skip it
+        max_removed_fraction: Largest share of the indexed jobs a sync deletes
+        force: Write the collections even if the source looks wrong
+    """
+    jobs = await asyncio.to_thread(load_jobs, source)
+    chroma_client = await create_chroma_client()
+    checkpoint = IngestionCheckpoint(checkpoint_path)
+    cache = EmbeddingCache(embedding_cache_path) if embedding_cache_path else None
+
+    counts = await ingest_jobs(
+        chroma_client,
+        gemini_client_vertex_ai,
+        jobs,
+        checkpoint,
+        rate_limiter=AdaptiveRateLimiter(texts_per_minute),
+        concurrency=concurrency,
+        batch_size=batch_size,
+        upsert_batch_size=upsert_batch_size,
+        sync=sync,
+        cache=cache,
+        max_removed_fraction=max_removed_fraction,
+        force=force,
+    )
+    logger.info("Ingestion completed: %s", counts)
+    checkpoint.clear()
+
+    if similar_jobs_graph_path:
+        await refresh_similar_jobs_graph(
+            chroma_client, similar_jobs_graph_path, k=similar_jobs_k
+        )
+
+    if lexical_index_path:
+        # Index the jobs as written, so keyword matches share the vector job ids
+        collection = await chroma_client.get_collection(name=CORPUS_VERSION_COLLECTION)
+        indexed = await fetch_content_hashes(collection)
+        lexical_index = await asyncio.to_thread(
+            BM25Index.build,
+            [job for job in jobs if job["id"] in indexed],
+            corpus_version=(collection.metadata or {}).get("corpus_version"),
+        )
+        await asyncio.to_thread(lexical_index.save, lexical_index_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Embed job postings and upsert them into ChromaDB."
+    )
+    parser.add_argument(
+        "--source",
+        default=JOB_SOURCE,
+        required=not JOB_SOURCE,
+        help='"mongo", a JSON export or a CSV data directory (defaults to JOB_SOURCE)',
+    )
+    parser.add_argument("--checkpoint", default=".ingestion_checkpoint")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--upsert-batch-size", type=int, default=500)
+    parser.add_argument("--texts-per-minute", type=float, default=600)
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Only embed new or changed jobs and delete removed ones",
+    )
+    parser.add_argument(
+        "--max-removed-fraction",
+        type=float,
+        default=MAX_REMOVED_FRACTION,
+        help="Largest share of the indexed jobs a sync may delete",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Write even if the source shares no ids with the collections or "
+        "a sync deletes more than --max-removed-fraction",
+    )
+    parser.add_argument(
+        "--embedding-cache",
+        default=EMBEDDING_CACHE_PATH or ".embedding_cache.sqlite",
+        help="SQLite embedding cache (defaults to EMBEDDING_CACHE_PATH)",
+    )
+    parser.add_argument(
+        "--no-embedding-cache",
+        action="store_true",
+        help="Always call the embedding model",
+    )
+    parser.add_argument(
+        "--similar-jobs-graph",
+        default=SIMILAR_JOBS_GRAPH_PATH,
+        help="Similar jobs graph directory (defaults to SIMILAR_JOBS_GRAPH_PATH)",
+    )
+    parser.add_argument("--similar-jobs-k", type=int, default=50)
+    parser.add_argument(
+        "--lexical-index",
+        default=LEXICAL_INDEX_PATH,
+        help="BM25 index directory (defaults to LEXICAL_INDEX_PATH)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        run_ingestion(
+            args.source,
+            args.checkpoint,
+            args.concurrency,
+            args.batch_size,
+            args.upsert_batch_size,
+            args.texts_per_minute,
+            args.sync,
+            None if args.no_embedding_cache else args.embedding_cache,
+            args.similar_jobs_graph,
+            args.similar_jobs_k,
+            args.lexical_index,
+            args.max_removed_fraction,
+            args.force,
+        )
+    )
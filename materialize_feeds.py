@@ -0,0 +1,142 @@
+"""
+Recommendation feed materialization entry point.
+
+This module walks every stored CV embedding, computes the top-N jobs for each
+user in blocked matrix products, sharded over `RECOMMENDATION_INDEX_SHARDS`
+threads, and writes them to the feed store served by the `/recommendations`
+endpoint. Run it on a schedule, e.g. nightly.
+"""
+
+import argparse
+import asyncio
+import logging
+
+import numpy as np
+
+from app.api.core.core import (
+    create_chroma_client,
+    RECOMMENDATION_FEED_STORE_PATH,
+    RECOMMENDATION_INDEX_SHARDS,
+)
+from app.utils.recommendation.cv_chunks import is_cv_chunk_id
+from app.utils.recommendation.feed_store import write_feed_store
+from app.utils.recommendation.recommendation_utils import distances_to_match_scores
+from app.utils.recommendation.vector_index import EmbeddingIndex
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+async def materialize_feeds(
+    output_path: str,
+    top_n: int,
+    page_size: int,
+    block_size: int,
+    shards: int = RECOMMENDATION_INDEX_SHARDS,
+) -> None:
+    """
+    Compute and store the top-N job feed of every user.
+
+    Args:
+        output_path: Directory of the feed store
+        top_n: Number of jobs kept per user
+        page_size: Number of CV embeddings fetched per request
+        block_size: Number of users scored per matrix product
+        shards: Number of parallel scoring shards
+    """
+    chroma_client = await create_chroma_client()
+    job_desc_collection = await chroma_client.get_collection(
+        name="job_desc_req_documents"
+    )
+    user_cv_embeddings_collection = await chroma_client.get_collection(
+        name="user_cv_embeddings"
+    )
+    job_desc_index = await EmbeddingIndex.from_collection(
+        job_desc_collection, shards=shards
+    )
+    corpus_version = (job_desc_collection.metadata or {}).get("corpus_version")
+
+    user_ids = []
+    cv_hashes = []
+    job_row_blocks = []
+    score_blocks = []
+    total_records = await user_cv_embeddings_collection.count()
+    for offset in range(0, total_records, page_size):
+        page = await user_cv_embeddings_collection.get(
+            include=["embeddings", "metadatas"], limit=page_size, offset=offset
+        )
+        # Feeds are ranked on the whole-CV embedding, skip CV section chunks
+        whole_cvs = [
+            row
+            for row, record_id in enumerate(page["ids"])
+            if not is_cv_chunk_id(record_id)
+        ]
+        page_user_ids = [page["ids"][row] for row in whole_cvs]
+        page_embeddings = np.asarray(page["embeddings"], dtype=np.float32)[whole_cvs]
+        # The API only serves a feed while the CV still has this hash
+        cv_hashes.extend(
+            (page["metadatas"][row] or {}).get("cv_hash") for row in whole_cvs
+        )
+
+        for start in range(0, len(page_user_ids), block_size):
+            block_embeddings = page_embeddings[start : start + block_size]
+            top_jobs, top_distances, max_distances = job_desc_index.top_k(
+                block_embeddings, top_n
+            )
+
+            job_row_blocks.append(top_jobs.astype(np.int32))
+            score_blocks.append(distances_to_match_scores(top_distances, max_distances))
+
+        user_ids.extend(page_user_ids)
+        logger.info(
+            "Materialized feeds for %d users from %d of %d CV records",
+            len(user_ids),
+            min(offset + page_size, total_records),
+            total_records,
+        )
+
+    top_n = min(top_n, len(job_desc_index))
+    write_feed_store(
+        output_path,
+        user_ids,
+        job_desc_index.ids.tolist(),
+        (
+            np.concatenate(job_row_blocks)
+            if job_row_blocks
+            else np.empty((0, top_n), dtype=np.int32)
+        ),
+        (
+            np.concatenate(score_blocks)
+            if score_blocks
+            else np.empty((0, top_n), dtype=np.float32)
+        ),
+        corpus_version=corpus_version,
+        cv_hashes=cv_hashes,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Precompute top-N job recommendations for every user."
+    )
+    parser.add_argument(
+        "--output",
+        default=RECOMMENDATION_FEED_STORE_PATH or "feeds",
+        help="Feed store directory (defaults to RECOMMENDATION_FEED_STORE_PATH)",
+    )
+    parser.add_argument("--top-n", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--block-size", type=int, default=256)
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=RECOMMENDATION_INDEX_SHARDS,
+        help="Parallel scoring shards (defaults to RECOMMENDATION_INDEX_SHARDS)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        materialize_feeds(
+            args.output, args.top_n, args.page_size, args.block_size, args.shards
+        )
+    )